@@ -0,0 +1,63 @@
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.database import get_read_db
+from app.core.api_key_auth import get_api_key
+from app.core.call_analytics import analytics_cache, query_call_stats
+from app.schemas.analytics import CallStatsBucketResponse
+
+router = APIRouter()
+
+
+@router.get("/calls", response_model=List[CallStatsBucketResponse])
+def get_call_stats(
+    granularity: str = Query("day", pattern="^(hour|day|week)$", description="Bucket size: hour, day or week"),
+    start: Optional[datetime] = Query(None, description="Only include buckets from this time"),
+    end: Optional[datetime] = Query(None, description="Only include buckets starting before this time"),
+    outcome: Optional[str] = Query(None, description="Filter by call outcome classification"),
+    sentiment: Optional[str] = Query(None, description="Filter by carrier sentiment classification"),
+    equipment_type: Optional[str] = Query(None, description="Filter by equipment type of the searched load"),
+    mc: Optional[str] = Query(None, description="Filter by carrier MC number"),
+    origin: Optional[str] = Query(None, description="Filter by lane origin"),
+    destination: Optional[str] = Query(None, description="Filter by lane destination"),
+    group_by_lane: bool = Query(False, description="Break each bucket down by origin and destination"),
+    db: Session = Depends(get_read_db),
+    api_key: str = Depends(get_api_key)
+):
+    """
+    Time-bucketed call analytics
+    
+    Returns booking rate, average agreed vs loadboard rate, negotiation rounds
+    and sentiment mix per hour, day or week, optionally per lane. Results are
+    read from aggregates maintained as calls are logged, and recent results
+    are cached briefly. Lane and carrier statistics come from separate
+    rollups, so a carrier filter cannot be combined with lane, outcome or
+    equipment filters, nor lane filters with an outcome filter. Lanes and
+    classifications are reported in lowercase.
+    """
+    cache_key = (granularity, start, end, outcome, sentiment, equipment_type, mc, origin, destination, group_by_lane)
+    cached = analytics_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    try:
+        stats = query_call_stats(
+            db,
+            granularity=granularity,
+            start=start,
+            end=end,
+            outcome=outcome,
+            sentiment=sentiment,
+            equipment_type=equipment_type,
+            mc_number=mc,
+            origin=origin,
+            destination=destination,
+            group_by_lane=group_by_lane,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    analytics_cache.set(cache_key, stats)
+    
+    return stats
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
+from app.config import settings
 from app.core.fmcsa_service import fmcsa_service
 from app.core.api_key_auth import get_api_key
 from app.database import get_db
@@ -30,4 +31,24 @@ async def verify_carrier(
     # Call FMCSA service to verify carrier
     verification_result = await fmcsa_service.verify_carrier(mc)
     
-    return verification_result 
\ No newline at end of file
+    return verification_result
+
+
+@router.get("/metrics")
+async def get_verification_metrics(api_key: str = Depends(get_api_key)):
+    """
+    Verification cache and refresh-ahead scheduler metrics
+    
+    Returns:
+        Cache hit ratio, upstream FMCSA call count, census index state, refresh lag and budget use
+    """
+    refresh = None
+    if settings.CARRIER_REFRESH_ENABLED:
+        from app.core.carrier_refresh import carrier_refresh_scheduler
+        refresh = carrier_refresh_scheduler.stats()
+    return {
+        "cache": await fmcsa_service.cache_op(fmcsa_service.cache.stats),
+        "upstream_calls": fmcsa_service.upstream_calls,
+        "census": fmcsa_service.census_stats(),
+        "refresh": refresh,
+    }
@@ -1,26 +1,122 @@
+import logging
+
 from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy.orm import Session
-from sqlalchemy import text
+from fastapi.responses import JSONResponse
 
-from app.database import get_db
+from app.config import settings
+from app.core.api_key_auth import get_api_key
+from app.core.call_analytics import analytics_cache
+from app.core.carrier_profiles import carrier_profiles
+from app.core.dashboard_feed import dashboard_feed
+from app.core.fmcsa_service import fmcsa_service
+from app.core.health_prober import health_prober, pool_stats
+from app.core.lane_stats import lane_stats
+from app.core.load_archival import load_archiver
+from app.core.load_cache import load_cache
+from app.core.load_facets import facet_cache
+from app.core.load_notifier import load_change_notifier
+from app.core.logging_config import queue_stats
+from app.core.startup import startup_timer
+from app.database import engine, read_routing_stats, replica_engine
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 
 @router.get("/health")
 async def health_check(request: Request):
     """Application health check"""
-    print(request.headers)
+    # Sampled via LOG_SAMPLE_RATES; headers are not logged since they carry the API key
+    logger.info(
+        "Health check",
+        extra={
+            "client": request.client.host if request.client else None,
+            "user_agent": request.headers.get("user-agent"),
+        },
+    )
     return {"status": "healthy", "message": "API is running"}
 
 
+@router.get("/health/live")
+async def liveness_check():
+    """Liveness: the process is serving requests. No I/O and no logging."""
+    return {"status": "alive"}
+
+
+@router.get("/health/ready")
+async def readiness_check():
+    """
+    Readiness from the background health prober
+
+    Answers from the last probe round instead of touching dependencies, so
+    probing as often as a load balancer likes costs nothing. 503 until the
+    first round completes, when a required dependency failed, or when the
+    prober has stopped reporting.
+    """
+    health_prober.start()
+    readiness = health_prober.readiness()
+    return JSONResponse(status_code=200 if readiness["ready"] else 503, content=readiness)
+
+
 @router.get("/health/db")
-async def database_health_check(db: Session = Depends(get_db)):
-    """Database health check"""
-    try:
-        # Try to execute a simple query
-        result = db.execute(text("SELECT 1"))
-        result.fetchone()
-        return {"status": "healthy", "message": "Database connection is working"}
-    except Exception as e:
-        raise HTTPException(status_code=503, detail=f"Database connection failed: {str(e)}") 
\ No newline at end of file
+async def database_health_check():
+    """Database health from the last probe round"""
+    health_prober.start()
+    result = health_prober.results.get("database")
+    if result is None:
+        result = (await health_prober.probe())["database"]
+    if not result["ok"]:
+        raise HTTPException(status_code=503, detail=f"Database connection failed: {result['error']}")
+    return {"status": "healthy", "message": "Database connection is working", "checked_at": result["checked_at"]}
+
+
+@router.get("/health/deep")
+async def deep_health_check(api_key: str = Depends(get_api_key)):
+    """
+    Diagnostics for operators
+
+    Returns:
+        Readiness and last probe latencies, connection pool occupancy, cache
+        sizes and hit ratios, queue depths of the log, capture and stream
+        pipelines, background job state and the startup report
+    """
+    databases = {"primary": pool_stats(engine), "read_routing": read_routing_stats()}
+    if replica_engine is not engine:
+        databases["replica"] = pool_stats(replica_engine)
+    # Optional subsystems are imported only when enabled and report None otherwise
+    traffic_capture = carrier_refresh = compression = None
+    if settings.TRAFFIC_CAPTURE_ENABLED:
+        from app.core.traffic_capture import traffic_capture_writer
+        traffic_capture = traffic_capture_writer.stats()
+    if settings.CARRIER_REFRESH_ENABLED:
+        from app.core.carrier_refresh import carrier_refresh_scheduler
+        carrier_refresh = carrier_refresh_scheduler.stats()
+    if settings.COMPRESSION_ENABLED:
+        from app.core.compression import compression_stats
+        compression = dict(compression_stats)
+    return {
+        **health_prober.readiness(),
+        "prober": health_prober.stats(),
+        "databases": databases,
+        "caches": {
+            "loads": load_cache.stats(),
+            "load_facets": facet_cache.stats(),
+            "analytics": analytics_cache.stats(),
+            "verification": await fmcsa_service.cache_op(fmcsa_service.cache.stats),
+            "lane_stats": lane_stats.stats(),
+            "carrier_profiles": carrier_profiles.stats(),
+        },
+        "queues": {
+            "logging": queue_stats(),
+            "traffic_capture": traffic_capture,
+            "load_stream": load_change_notifier.stats(),
+            "dashboard_stream": dashboard_feed.stats(),
+        },
+        "background": {
+            "carrier_refresh": carrier_refresh,
+            "load_archive": load_archiver.stats(),
+            "fmcsa_upstream_calls": fmcsa_service.upstream_calls,
+        },
+        "compression": compression,
+        "startup": startup_timer.report(),
+    }
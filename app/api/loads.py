@@ -1,40 +1,68 @@
-from typing import List, Optional
+import json
+from typing import List, Optional, Tuple
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.core.api_key_auth import get_api_key
+from app.core.broadcast import stream_subscription
+from app.core.carrier_profiles import carrier_profiles, rank_loads
+from app.core.lane_stats import lane_stats
+from app.core.load_facets import facet_cache, filter_matcher, query_facets
+from app.core.load_booking import book_load
+from app.core.load_cache import load_cache, load_records
+from app.core.load_archival import load_archiver, load_is_open
+from app.core.load_notifier import load_change_notifier
+from app.core.load_search import apply_text_search
+from app.config import settings
 from app.models.load import Load as LoadModel
-from app.schemas.load import Load, LoadSearchParams
+from app.schemas.load import Load, LoadBookingRequest, LoadBookingResponse, LoadFacets, LoadSearchParams, RateGuidance
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[Load])
-def search_loads(
-    origin_city: Optional[str] = Query(None, description="Filter by origin city"),
-    destination_city: Optional[str] = Query(None, description="Filter by destination city"),
-    equipment_type: Optional[str] = Query(None, description="Filter by equipment type"),
-    pickup_date: Optional[str] = Query(None, description="Filter by pickup date (YYYY-MM-DD)"),
-    max_weight: Optional[float] = Query(None, description="Maximum weight filter"),
-    min_rate: Optional[float] = Query(None, description="Minimum rate filter"),
-    max_rate: Optional[float] = Query(None, description="Maximum rate filter"),
-    limit: int = Query(10, description="Maximum number of results to return", le=100),
-    db: Session = Depends(get_db),
-    api_key: str = Depends(get_api_key)
-):
+def parse_datetime_bound(value: str, name: str) -> Tuple[datetime, bool]:
     """
-    Search for loads based on criteria
+    Parse a YYYY-MM-DD or ISO 8601 datetime query parameter
     
-    This endpoint allows the AI to search for loads that match specific criteria
-    provided by the carrier during the call.
+    Returns:
+        Tuple of the parsed datetime and whether only a date was given
     """
-    query = db.query(LoadModel)
-    
-    # Apply filters
-    filters = []
+    try:
+        if len(value) == 10:
+            return datetime.strptime(value, "%Y-%m-%d"), True
+        return datetime.fromisoformat(value), False
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name} format. Use YYYY-MM-DD or YYYY-MM-DDTHH:MM")
+
+
+def upper_bound_filter(column, value: str, name: str):
+    """Inclusive upper bound; a bare date covers that whole day"""
+    bound, date_only = parse_datetime_bound(value, name)
+    if date_only:
+        return column < bound + timedelta(days=1)
+    return column <= bound
+
+
+def load_filters(
+    origin_city: Optional[str],
+    destination_city: Optional[str],
+    equipment_type: Optional[str],
+    pickup_date: Optional[str],
+    pickup_from: Optional[str],
+    pickup_to: Optional[str],
+    delivery_by: Optional[str],
+    max_weight: Optional[float],
+    min_rate: Optional[float],
+    max_rate: Optional[float],
+) -> list:
+    """Filter expressions for the load search parameters, shared by search_loads and get_load_facets"""
+    # Apply filters; booked loads and loads past their pickup are never offered,
+    # even before the archival job moves them off the board
+    filters = [load_is_open()]
     
     if origin_city:
         filters.append(LoadModel.origin.ilike(f"%{origin_city}%"))
@@ -47,17 +75,20 @@ def search_loads(
     
     if pickup_date:
         try:
-            pickup_date_obj = datetime.strptime(pickup_date, "%Y-%m-%d").date()
-            filters.append(LoadModel.pickup_datetime >= pickup_date_obj)
-            # Also filter for same day or next day
-            next_day = datetime.combine(pickup_date_obj, datetime.min.time()).replace(
-                day=pickup_date_obj.day + 1
-            ) if pickup_date_obj.day < 28 else datetime.combine(pickup_date_obj, datetime.min.time()).replace(
-                month=pickup_date_obj.month + 1, day=1
-            )
-            filters.append(LoadModel.pickup_datetime < next_day)
+            pickup_day = datetime.strptime(pickup_date, "%Y-%m-%d")
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid pickup_date format. Use YYYY-MM-DD")
+        filters.append(LoadModel.pickup_datetime >= pickup_day)
+        filters.append(LoadModel.pickup_datetime < pickup_day + timedelta(days=1))
+    
+    if pickup_from:
+        filters.append(LoadModel.pickup_datetime >= parse_datetime_bound(pickup_from, "pickup_from")[0])
+    
+    if pickup_to:
+        filters.append(upper_bound_filter(LoadModel.pickup_datetime, pickup_to, "pickup_to"))
+    
+    if delivery_by:
+        filters.append(upper_bound_filter(LoadModel.delivery_datetime, delivery_by, "delivery_by"))
     
     if max_weight and max_weight > 0:
         filters.append(LoadModel.weight <= max_weight)
@@ -68,34 +99,245 @@ def search_loads(
     if max_rate and max_rate > 0:
         filters.append(LoadModel.loadboard_rate <= max_rate)
     
+    return filters
+
+
+@router.get("/", response_model=List[Load])
+def search_loads(
+    origin_city: Optional[str] = Query(None, description="Filter by origin city"),
+    destination_city: Optional[str] = Query(None, description="Filter by destination city"),
+    equipment_type: Optional[str] = Query(None, description="Filter by equipment type"),
+    pickup_date: Optional[str] = Query(None, description="Filter by pickup date (YYYY-MM-DD)"),
+    pickup_from: Optional[str] = Query(None, description="Earliest pickup (YYYY-MM-DD or YYYY-MM-DDTHH:MM)"),
+    pickup_to: Optional[str] = Query(None, description="Latest pickup, inclusive (YYYY-MM-DD or YYYY-MM-DDTHH:MM)"),
+    delivery_by: Optional[str] = Query(None, description="Latest delivery, inclusive (YYYY-MM-DD or YYYY-MM-DDTHH:MM)"),
+    max_weight: Optional[float] = Query(None, description="Maximum weight filter"),
+    min_rate: Optional[float] = Query(None, description="Minimum rate filter"),
+    max_rate: Optional[float] = Query(None, description="Maximum rate filter"),
+    q: Optional[str] = Query(None, description="Full-text search over load notes and commodity type"),
+    mc: Optional[str] = Query(None, description="Calling carrier's MC number; ranks loads by fit with its call history"),
+    limit: int = Query(10, description="Maximum number of results to return", le=100),
+    db: Session = Depends(get_read_db),
+    api_key: str = Depends(get_api_key)
+):
+    """
+    Search for loads based on criteria
+    
+    This endpoint allows the AI to search for loads that match specific criteria
+    provided by the carrier during the call. The optional `q` phrase searches
+    notes and commodity type, ranking the best matches first. With `mc`, the
+    first CARRIER_RANKING_CANDIDATES matches are re-ranked by the carrier's
+    booked lanes, accepted rates and equipment, blended with text relevance
+    when `q` is given.
+    """
+    filters = load_filters(
+        origin_city, destination_city, equipment_type, pickup_date, pickup_from, pickup_to,
+        delivery_by, max_weight, min_rate, max_rate,
+    )
+    query = db.query(LoadModel)
+    
     # Apply all filters
-    if filters:
-        query = query.filter(and_(*filters))
+    query = query.filter(and_(*filters))
+    
+    # Rank text matches first when a search phrase is given
+    if q and q.strip():
+        query = apply_text_search(query, q.strip(), db.get_bind().dialect.name)
     
-    # Order by pickup date and rate
+    # Order by pickup date and rate, served directly by ix_loads_available_pickup_rate
     query = query.order_by(LoadModel.pickup_datetime, LoadModel.loadboard_rate.desc())
     
+    # Re-rank a wider candidate window for the calling carrier
+    mc = mc.strip() if mc else None
+    if mc:
+        candidates = query.limit(max(limit, settings.CARRIER_RANKING_CANDIDATES)).all()
+        # Keep text relevance in the score; without a phrase the default order carries no relevance
+        relevance_weight = settings.CARRIER_RANKING_RELEVANCE_WEIGHT if q and q.strip() else 0.0
+        return rank_loads(carrier_profiles.get(db, mc), candidates, relevance_weight)[:limit]
+    
     # Apply limit
     loads = query.limit(limit).all()
     
     return loads
 
 
+@router.get("/stream")
+async def stream_load_changes(
+    origin_city: Optional[str] = Query(None, description="Only stream loads from this origin city"),
+    destination_city: Optional[str] = Query(None, description="Only stream loads to this destination city"),
+    equipment_type: Optional[str] = Query(None, description="Only stream loads for this equipment type"),
+    api_key: str = Depends(get_api_key)
+):
+    """
+    Stream load board changes as server-sent events
+    
+    Pushes `insert`, `rate_change`, `update` and `remove` events so the AI can
+    notice new or repriced loads during a call without polling search_loads;
+    a load that is booked or deleted produces `remove`. An `overflow` event
+    means some events were dropped for this client and it should search
+    again to resynchronize.
+    """
+    await load_change_notifier.ensure_started()
+    subscription = load_change_notifier.subscribe(
+        equipment_type=equipment_type,
+        origin_city=origin_city,
+        destination_city=destination_city,
+    )
+    
+    return StreamingResponse(
+        stream_subscription(
+            load_change_notifier.broadcaster,
+            subscription,
+            heartbeat_seconds=settings.LOAD_STREAM_HEARTBEAT_SECONDS,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/batch", response_model=List[Load])
+def get_loads_batch(
+    ids: str = Query(..., description="Comma-separated load IDs"),
+    db: Session = Depends(get_read_db),
+    api_key: str = Depends(get_api_key)
+):
+    """
+    Get details for several loads in one call
+    
+    Resolves cached loads from the load cache and the rest with a single
+    query, falling back to the archive. Loads are returned in the order
+    requested; unknown IDs are omitted.
+    """
+    load_ids = list(dict.fromkeys(load_id.strip() for load_id in ids.split(",") if load_id.strip()))
+    if not load_ids:
+        raise HTTPException(status_code=400, detail="ids must contain at least one load ID")
+    if len(load_ids) > settings.LOAD_BATCH_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.LOAD_BATCH_MAX_IDS} load IDs per request")
+    
+    records = load_records(db, load_ids)
+    return Response(content=b"[" + b",".join(records) + b"]", media_type="application/json")
+
+
+@router.get("/facets", response_model=LoadFacets)
+def get_load_facets(
+    origin_city: Optional[str] = Query(None, description="Filter by origin city"),
+    destination_city: Optional[str] = Query(None, description="Filter by destination city"),
+    equipment_type: Optional[str] = Query(None, description="Filter by equipment type"),
+    pickup_date: Optional[str] = Query(None, description="Filter by pickup date (YYYY-MM-DD)"),
+    pickup_from: Optional[str] = Query(None, description="Earliest pickup (YYYY-MM-DD or YYYY-MM-DDTHH:MM)"),
+    pickup_to: Optional[str] = Query(None, description="Latest pickup, inclusive (YYYY-MM-DD or YYYY-MM-DDTHH:MM)"),
+    delivery_by: Optional[str] = Query(None, description="Latest delivery, inclusive (YYYY-MM-DD or YYYY-MM-DDTHH:MM)"),
+    max_weight: Optional[float] = Query(None, description="Maximum weight filter"),
+    min_rate: Optional[float] = Query(None, description="Minimum rate filter"),
+    max_rate: Optional[float] = Query(None, description="Maximum rate filter"),
+    q: Optional[str] = Query(None, description="Full-text search over load notes and commodity type"),
+    db: Session = Depends(get_read_db),
+    api_key: str = Depends(get_api_key)
+):
+    """
+    Count available loads by equipment type, origin state, destination state and pickup day
+    
+    Takes the same filters as search_loads, so the AI can tell a carrier what
+    is on the board before searching. Results come from one grouped query
+    per distinct filter set and are cached until a load they could count
+    changes.
+    """
+    q = q.strip() if q else None
+    cache_key = (
+        origin_city, destination_city, equipment_type, pickup_date, pickup_from, pickup_to,
+        delivery_by, max_weight, min_rate, max_rate, q,
+    )
+    cached = facet_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    generation = facet_cache.generation
+    filters = load_filters(
+        origin_city, destination_city, equipment_type, pickup_date, pickup_from, pickup_to,
+        delivery_by, max_weight, min_rate, max_rate,
+    )
+    facets = query_facets(db, filters, q)
+    matcher = filter_matcher(origin_city, destination_city, equipment_type, max_weight, min_rate, max_rate)
+    facet_cache.set(cache_key, facets, generation, matcher)
+    
+    return facets
+
+
+@router.get("/metrics")
+def get_load_cache_metrics(api_key: str = Depends(get_api_key)):
+    """
+    Load cache and board metrics
+    
+    Returns:
+        Hit ratio, entry count, invalidations and approximate memory use,
+        plus facet cache stats under "facets" and board size and archive
+        throughput as of the last archival run under "archive"
+    """
+    return {**load_cache.stats(), "facets": facet_cache.stats(), "archive": load_archiver.stats()}
+
+
 @router.get("/{load_id}", response_model=Load)
 def get_load_details(
     load_id: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     api_key: str = Depends(get_api_key)
 ):
     """
     Get specific load details by load_id
     
     This endpoint allows the AI to get detailed information about a specific load
-    identified by its load_id.
+    identified by its load_id. Repeated lookups are served from the load cache.
+    Loads moved to the archive are still returned, with status booked or expired.
+    """
+    records = load_records(db, [load_id])
+    
+    if not records:
+        raise HTTPException(status_code=404, detail="Load not found")
+    
+    return Response(content=records[0], media_type="application/json")
+
+
+@router.get("/{load_id}/rate-guidance", response_model=RateGuidance)
+def get_rate_guidance(
+    load_id: str,
+    db: Session = Depends(get_read_db),
+    api_key: str = Depends(get_api_key)
+):
+    """
+    Negotiation guidance for a load from past calls on its lane
+    
+    Served from precomputed lane statistics: agreed rate and initial offer
+    percentiles, acceptance rate by rate per mile and average negotiation
+    rounds for the same origin, destination and equipment type. Lanes with
+    too few calls fall back to all lanes with the same equipment type.
     """
-    load = db.query(LoadModel).filter(LoadModel.load_id == load_id).first()
+    records = load_records(db, [load_id])
     
-    if not load:
+    if not records:
         raise HTTPException(status_code=404, detail="Load not found")
     
-    return load 
\ No newline at end of file
+    return lane_stats.guidance(db, json.loads(records[0]))
+
+
+@router.post("/{load_id}/book", response_model=LoadBookingResponse)
+def book_load_for_carrier(
+    load_id: str,
+    booking: LoadBookingRequest,
+    db: Session = Depends(get_db),
+    api_key: str = Depends(get_api_key)
+):
+    """
+    Reserve a load for a carrier
+    
+    Exactly one of several simultaneous bookings for the same load succeeds;
+    the others get 409 Conflict. Booked loads drop out of search_loads.
+    """
+    load = book_load(db, load_id, booking.mc_number, booking.agreed_rate)
+    
+    return LoadBookingResponse(
+        load_id=load.load_id,
+        status=load.status,
+        booked_by_mc=load.booked_by_mc,
+        booked_rate=load.booked_rate,
+        booked_at=load.booked_at,
+        version=load.version
+    )
@@ -1,25 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, Query
-from fastapi.responses import HTMLResponse
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import HTMLResponse, StreamingResponse
+from sqlalchemy.orm import Session, selectinload, undefer
 from typing import List, Optional
 from datetime import datetime
+import json
+import logging
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.core.api_key_auth import get_api_key
+from app.core.broadcast import stream_subscription
+from app.core.dashboard_feed import dashboard_feed
+from app.core.call_analytics import record_call
+from app.core.carrier_profiles import carrier_profiles
+from app.core.lane_stats import lane_stats
+from app.core.offer_stats import offer_state, record_offers
+from app.core.call_log_retention import (
+    archived_payload,
+    archived_payloads,
+    call_log_record,
+    iter_archived_call_logs,
+    month_start,
+)
 from app.models.call_log import CallLog
-from app.schemas.carrier import CallOutcome, CallOutcomeResponse
+from app.schemas.carrier import (
+    CallOutcome,
+    CallOutcomeResponse,
+    CarrierOfferBatch,
+    CarrierOfferLog,
+    CarrierOfferResponse,
+    LoadOfferState,
+)
 from app.config import settings
 
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 
 @router.post("/log", response_model=CallOutcomeResponse)
 def log_call_outcome(
     call_outcome: CallOutcome,
     db: Session = Depends(get_db),
-    api_key: str = Depends(get_api_key),
-    request: Request = None
+    api_key: str = Depends(get_api_key)
 ):
     """
     Log the outcome of a call with a carrier
@@ -29,8 +51,10 @@ def log_call_outcome(
     """
     # Validate that required fields are provided
     if not call_outcome.happyrobot_run_id:
-        print(call_outcome)
-        print(request.body)
+        logger.warning(
+            "Call outcome missing happyrobot_run_id",
+            extra={"mc_number": call_outcome.mc_number, "load_id": call_outcome.load_id},
+        )
         raise HTTPException(status_code=400, detail="happyrobot_run_id is required")
     
     if not call_outcome.call_outcome_classification:
@@ -55,13 +79,23 @@ def log_call_outcome(
         fmcsa_verified_eligible=call_outcome.fmcsa_verified_eligible == "ACTIVE",
         initial_carrier_offer=float(call_outcome.initial_carrier_offer) if call_outcome.initial_carrier_offer else None,
         negotiation_rounds=int(call_outcome.negotiation_rounds) if call_outcome.negotiation_rounds else 0,
-        raw_extracted_data_json=call_outcome.raw_extracted_data
+        raw_extracted_data=call_outcome.raw_extracted_data
     )
     
     db.add(db_call_log)
+    db.flush()
+    
+    # Update time-bucketed analytics in the same transaction
+    record_call(db, db_call_log)
+    
     db.commit()
     db.refresh(db_call_log)
     
+    # Push the new row and updated counters to live dashboards
+    dashboard_feed.record(db_call_log, render_call_log_row(db_call_log))
+    lane_stats.notify_new_call()
+    carrier_profiles.notify_new_call()
+    
     return CallOutcomeResponse(
         status=201,
         message="Call outcome logged successfully",
@@ -69,6 +103,64 @@ def log_call_outcome(
     )
 
 
+@router.post("/offer", response_model=CarrierOfferResponse)
+def log_carrier_offer(
+    offer: CarrierOfferLog,
+    db: Session = Depends(get_db),
+    api_key: str = Depends(get_api_key)
+):
+    """
+    Log an offer made by a carrier during negotiation
+    
+    The offer is appended to carrier_offers and folded into the load's
+    running offer statistics, readable from GET /offer/{load_id}.
+    """
+    record_offers(db, [offer])
+    db.commit()
+    
+    return CarrierOfferResponse(status=201, message="Offer logged successfully", offers_logged=1)
+
+
+@router.post("/offer/batch", response_model=CarrierOfferResponse)
+def log_carrier_offers_batch(
+    batch: CarrierOfferBatch,
+    db: Session = Depends(get_db),
+    api_key: str = Depends(get_api_key)
+):
+    """
+    Log several carrier offers in one request and one transaction
+    """
+    if not batch.offers:
+        raise HTTPException(status_code=400, detail="offers must contain at least one offer")
+    if len(batch.offers) > settings.OFFER_BATCH_MAX_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {settings.OFFER_BATCH_MAX_SIZE} offers per request")
+    
+    count = record_offers(db, batch.offers)
+    db.commit()
+    
+    return CarrierOfferResponse(status=201, message=f"{count} offers logged successfully", offers_logged=count)
+
+
+@router.get("/offer/{load_id}", response_model=LoadOfferState)
+def get_load_offer_state(
+    load_id: str,
+    db: Session = Depends(get_db),
+    api_key: str = Depends(get_api_key)
+):
+    """
+    Current offer state for a load
+    
+    Offer count, lowest/highest/average/last offer and their spread against
+    the loadboard rate, read from a single pre-aggregated row. Served from
+    the primary so an offer logged moments ago is always included.
+    """
+    state = offer_state(db, load_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Load not found")
+    
+    return state
+
+
 def validate_api_key_query(api_key: Optional[str] = Query(None, description="API key for authentication")):
     """
     Validate API key from query parameter
@@ -101,7 +193,7 @@ def validate_api_key_query(api_key: Optional[str] = Query(None, description="API
     clean_api_key = api_key.strip()
     
     if clean_api_key != expected_api_key:
-        print(f"Invalid API Key: {clean_api_key} != {expected_api_key}")
+        logger.warning("Invalid API key", extra={"key_prefix": clean_api_key[:4], "key_length": len(clean_api_key)})
         raise HTTPException(
             status_code=401,
             detail="Invalid API Key",
@@ -130,10 +222,76 @@ def safe_date_format(date_value):
         return 'N/A'
 
 
+LIVE_DASHBOARD_SCRIPT = """
+    <script>
+        (function () {
+            var apiKey = new URLSearchParams(window.location.search).get("api_key");
+            var source = new EventSource("dashboard/stream?api_key=" + encodeURIComponent(apiKey));
+            var status = document.getElementById("live-status");
+            var rows = document.getElementById("call-log-rows");
+            var limit = __LIMIT__;
+
+            source.onopen = function () { status.textContent = "Live updates connected"; };
+            source.onerror = function () { status.textContent = "Live updates reconnecting..."; };
+
+            source.addEventListener("call", function (e) {
+                var event = JSON.parse(e.data);
+                rows.insertAdjacentHTML("afterbegin", event.row_html);
+                while (rows.rows.length > limit) {
+                    rows.deleteRow(rows.rows.length - 1);
+                }
+                var summary = event.summary;
+                if (!summary) { return; }
+                document.getElementById("stat-total-calls").textContent = summary.total_calls;
+                document.getElementById("stat-booked-calls").textContent = summary.booked_calls;
+                document.getElementById("stat-booking-rate").textContent = summary.booking_rate + "%";
+                document.getElementById("stat-avg-negotiation-rounds").textContent = summary.avg_negotiation_rounds;
+            });
+
+            // Events were dropped for this viewer, fall back to a full reload
+            source.addEventListener("overflow", function () { window.location.reload(); });
+        })();
+    </script>
+"""
+
+
+def render_call_log_row(log: CallLog) -> str:
+    """Render a single call log as a dashboard table row"""
+    # Format outcome classification
+    outcome_class = "outcome-other"
+    if log.call_outcome_classification and "book" in log.call_outcome_classification.lower():
+        outcome_class = "outcome-booked"
+    elif log.call_outcome_classification and ("reject" in log.call_outcome_classification.lower() or "no" in log.call_outcome_classification.lower()):
+        outcome_class = "outcome-rejected"
+    
+    # Format sentiment
+    sentiment_class = "sentiment-neutral"
+    if log.carrier_sentiment_classification:
+        if "positive" in log.carrier_sentiment_classification.lower():
+            sentiment_class = "sentiment-positive"
+        elif "negative" in log.carrier_sentiment_classification.lower():
+            sentiment_class = "sentiment-negative"
+    
+    return f"""
+                    <tr>
+                        <td>{safe_date_format(log.called_at)}</td>
+                        <td>{log.mc_number or 'N/A'}</td>
+                        <td>{log.searched_load_id or 'N/A'}</td>
+                        <td><span class="{outcome_class}">{log.call_outcome_classification or 'N/A'}</span></td>
+                        <td><span class="{sentiment_class}">{log.carrier_sentiment_classification or 'N/A'}</span></td>
+                        <td>{safe_currency_format(log.initial_carrier_offer)}</td>
+                        <td>{safe_currency_format(log.agreed_rate)}</td>
+                        <td>{log.negotiation_rounds or 0}</td>
+                        <td>{'✅' if log.fmcsa_verified_eligible else '❌'}</td>
+                    </tr>
+    """
+
+
 @router.get("/dashboard", response_class=HTMLResponse)
 def get_dashboard(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     limit: Optional[int] = Query(50, description="Maximum number of call logs to display"),
+    live: bool = Query(True, description="Receive new calls and counters over a live stream"),
     api_key: str = Depends(validate_api_key_query)
 ):
     """
@@ -141,24 +299,18 @@ def get_dashboard(
     
     Returns an HTML dashboard with call log data.
     Requires API key as query parameter: /dashboard?api_key=your_key
+    In live mode the page subscribes to /dashboard/stream and applies new
+    rows and counters as they are logged instead of reloading.
     """
     # Get recent call logs
     call_logs = db.query(CallLog).order_by(CallLog.created_at.desc()).limit(limit).all()
     
-    # Generate summary statistics with safe calculations
-    total_calls = db.query(CallLog).count()
-    booked_calls = db.query(CallLog).filter(CallLog.call_outcome_classification.ilike('%book%')).count()
-    
-    # Calculate average negotiation rounds safely
-    avg_negotiation_rounds = db.query(CallLog).filter(CallLog.negotiation_rounds.isnot(None)).with_entities(CallLog.negotiation_rounds).all()
-    if avg_negotiation_rounds and len(avg_negotiation_rounds) > 0:
-        valid_rounds = [r[0] for r in avg_negotiation_rounds if r[0] is not None]
-        avg_rounds = sum(valid_rounds) / len(valid_rounds) if valid_rounds else 0.0
-    else:
-        avg_rounds = 0.0
-    
-    # Calculate booking rate safely
-    booking_rate = round((booked_calls / total_calls * 100) if total_calls > 0 else 0.0, 1)
+    # Summary statistics come from running counters rather than a table scan
+    summary = dashboard_feed.summary(db)
+    total_calls = summary["total_calls"]
+    booked_calls = summary["booked_calls"]
+    booking_rate = summary["booking_rate"]
+    avg_rounds = summary["avg_negotiation_rounds"]
     
     # Build HTML response
     html_content = f"""
@@ -291,19 +443,19 @@ def get_dashboard(
             
             <div class="stats">
                 <div class="stat-card">
-                    <div class="stat-value">{total_calls}</div>
+                    <div class="stat-value" id="stat-total-calls">{total_calls}</div>
                     <div class="stat-label">Total Calls</div>
                 </div>
                 <div class="stat-card">
-                    <div class="stat-value">{booked_calls}</div>
+                    <div class="stat-value" id="stat-booked-calls">{booked_calls}</div>
                     <div class="stat-label">Booked Calls</div>
                 </div>
                 <div class="stat-card">
-                    <div class="stat-value">{booking_rate}%</div>
+                    <div class="stat-value" id="stat-booking-rate">{booking_rate}%</div>
                     <div class="stat-label">Booking Rate</div>
                 </div>
                 <div class="stat-card">
-                    <div class="stat-value">{round(avg_rounds, 1)}</div>
+                    <div class="stat-value" id="stat-avg-negotiation-rounds">{round(avg_rounds, 1)}</div>
                     <div class="stat-label">Avg Negotiation Rounds</div>
                 </div>
             </div>
@@ -323,38 +475,11 @@ def get_dashboard(
                             <th>FMCSA Verified</th>
                         </tr>
                     </thead>
-                    <tbody>
+                    <tbody id="call-log-rows">
     """
     
     for log in call_logs:
-        # Format outcome classification
-        outcome_class = "outcome-other"
-        if log.call_outcome_classification and "book" in log.call_outcome_classification.lower():
-            outcome_class = "outcome-booked"
-        elif log.call_outcome_classification and ("reject" in log.call_outcome_classification.lower() or "no" in log.call_outcome_classification.lower()):
-            outcome_class = "outcome-rejected"
-        
-        # Format sentiment
-        sentiment_class = "sentiment-neutral"
-        if log.carrier_sentiment_classification:
-            if "positive" in log.carrier_sentiment_classification.lower():
-                sentiment_class = "sentiment-positive"
-            elif "negative" in log.carrier_sentiment_classification.lower():
-                sentiment_class = "sentiment-negative"
-        
-        html_content += f"""
-                        <tr>
-                            <td>{safe_date_format(log.called_at)}</td>
-                            <td>{log.mc_number or 'N/A'}</td>
-                            <td>{log.searched_load_id or 'N/A'}</td>
-                            <td><span class="{outcome_class}">{log.call_outcome_classification or 'N/A'}</span></td>
-                            <td><span class="{sentiment_class}">{log.carrier_sentiment_classification or 'N/A'}</span></td>
-                            <td>{safe_currency_format(log.initial_carrier_offer)}</td>
-                            <td>{safe_currency_format(log.agreed_rate)}</td>
-                            <td>{log.negotiation_rounds or 0}</td>
-                            <td>{'✅' if log.fmcsa_verified_eligible else '❌'}</td>
-                        </tr>
-        """
+        html_content += render_call_log_row(log)
     
     html_content += """
                     </tbody>
@@ -365,9 +490,10 @@ def get_dashboard(
                 <strong>Last Updated:</strong> """ + datetime.now().strftime('%Y-%m-%d %H:%M:%S') + """<br>
                 <strong>Records Shown:</strong> """ + str(len(call_logs)) + """ of """ + str(total_calls) + """ total calls<br>
                 <strong>Limit:</strong> """ + str(limit) + """ records per page<br>
-                <strong>🔄 Refresh:</strong> Reload the page to get the latest data
+                <strong>🔄 Refresh:</strong> """ + ('<span id="live-status">Live updates connecting...</span>' if live else 'Reload the page to get the latest data') + """
             </div>
         </div>
+    """ + (LIVE_DASHBOARD_SCRIPT.replace("__LIMIT__", str(limit)) if live else "") + """
     </body>
     </html>
     """
@@ -375,9 +501,39 @@ def get_dashboard(
     return html_content
 
 
+@router.get("/dashboard/stream")
+async def stream_dashboard(
+    api_key: str = Depends(validate_api_key_query)
+):
+    """
+    Live dashboard feed as server-sent events
+    
+    Each `call` event carries the rendered row for a newly logged call and
+    the updated summary counters, for calls logged by any worker. Requires
+    API key as query parameter.
+    """
+    # Subscribe first so the watcher never sees an empty audience and stops
+    subscription = dashboard_feed.broadcaster.subscribe()
+    try:
+        await dashboard_feed.ensure_started(render_call_log_row)
+    except Exception:
+        dashboard_feed.broadcaster.unsubscribe(subscription)
+        raise
+    
+    return StreamingResponse(
+        stream_subscription(
+            dashboard_feed.broadcaster,
+            subscription,
+            heartbeat_seconds=settings.LOAD_STREAM_HEARTBEAT_SECONDS,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/logs", response_model=List[dict])
 def get_call_logs(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     api_key: str = Depends(get_api_key),
     limit: Optional[int] = 50,
     offset: Optional[int] = 0
@@ -389,22 +545,73 @@ def get_call_logs(
     """
     call_logs = db.query(CallLog).order_by(CallLog.created_at.desc()).offset(offset).limit(limit).all()
     
-    logs_data = []
-    for log in call_logs:
-        logs_data.append({
-            "id": log.id,
-            "happyrobot_run_id": log.happyrobot_run_id,
-            "mc_number": log.mc_number,
-            "called_at": log.called_at.isoformat() if log.called_at else None,
-            "searched_load_id": log.searched_load_id,
-            "initial_carrier_offer": log.initial_carrier_offer,
-            "negotiation_rounds": log.negotiation_rounds,
-            "agreed_rate": log.agreed_rate,
-            "call_outcome_classification": log.call_outcome_classification,
-            "carrier_sentiment_classification": log.carrier_sentiment_classification,
-            "fmcsa_verified_eligible": log.fmcsa_verified_eligible,
-            "created_at": log.created_at.isoformat() if log.created_at else None,
-            "updated_at": log.updated_at.isoformat() if log.updated_at else None
-        })
-    
-    return logs_data 
\ No newline at end of file
+    return [call_log_record(log) for log in call_logs]
+
+
+@router.get("/logs/export")
+def export_call_logs(
+    db: Session = Depends(get_read_db),
+    api_key: str = Depends(get_api_key),
+    start: Optional[datetime] = Query(None, description="Only export calls from this time"),
+    end: Optional[datetime] = Query(None, description="Only export calls before this time"),
+    include_payload: bool = Query(False, description="Include raw extracted data for each call")
+):
+    """
+    Export call logs as JSON lines
+    
+    Streams archived call logs from the compressed archive files followed by
+    the call logs still in the database, oldest first. Payloads that were
+    moved to the archive are filled back in when requested.
+    """
+    def generate():
+        for record in iter_archived_call_logs(start, end):
+            if not include_payload:
+                record.pop("raw_extracted_data", None)
+            yield json.dumps(record) + "\n"
+        
+        query = db.query(CallLog).order_by(CallLog.called_at)
+        if include_payload:
+            query = query.options(selectinload(CallLog.payload), undefer(CallLog.raw_extracted_data_json))
+        if start is not None:
+            query = query.filter(CallLog.called_at >= start)
+        if end is not None:
+            query = query.filter(CallLog.called_at < end)
+        
+        payload_month, payloads = None, {}
+        for log in query.yield_per(500):
+            record = call_log_record(log, include_payload=include_payload)
+            if include_payload and record["raw_extracted_data"] is None and log.called_at is not None:
+                if month_start(log.called_at) != payload_month:
+                    payload_month = month_start(log.called_at)
+                    payloads = archived_payloads(payload_month)
+                record["raw_extracted_data"] = payloads.get(log.id)
+            yield json.dumps(record) + "\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+@router.get("/logs/{run_id}/raw")
+def get_call_log_raw_data(
+    run_id: str,
+    db: Session = Depends(get_read_db),
+    api_key: str = Depends(get_api_key)
+):
+    """
+    Get the raw extracted data for a single call
+    
+    List endpoints never load payloads; this endpoint decompresses the payload
+    for one call, falling back to the payload archive for older calls.
+    """
+    call_log = db.query(CallLog).filter(CallLog.happyrobot_run_id == run_id).first()
+    
+    if not call_log:
+        raise HTTPException(status_code=404, detail="Call log not found")
+    
+    raw_extracted_data = call_log.raw_extracted_data
+    if raw_extracted_data is None and call_log.called_at is not None:
+        raw_extracted_data = archived_payload(month_start(call_log.called_at), call_log.id)
+    
+    return {
+        "happyrobot_run_id": call_log.happyrobot_run_id,
+        "raw_extracted_data": raw_extracted_data,
+    }
@@ -1,4 +1,4 @@
-from typing import List, Union
+from typing import Dict, List, Optional, Union
 from pydantic import AnyHttpUrl, field_validator
 from pydantic_settings import BaseSettings
 
@@ -13,6 +13,19 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    DATABASE_REPLICA_URL: Optional[str] = None  # Read-only handlers use this when set
+    READ_YOUR_WRITES_SECONDS: float = 5.0  # Pin a client to the primary this long after a write (0 disables)
+
+    # Startup
+    FAST_BOOT: bool = False  # Verify the Alembic revision instead of running DDL on boot (run `alembic upgrade head` on deploy)
+    FAST_BOOT_DB_PREWARM_CONNECTIONS: int = 2  # Pool connections opened before the first request
+    FAST_BOOT_PREWARM_HTTP: bool = True  # Open the FMCSA connection in the background on boot
+    FAST_BOOT_DEFER_SECONDS: float = 30.0  # Delay before optional background jobs start
+    
+    # Health probes
+    HEALTH_PROBE_INTERVAL_SECONDS: float = 10.0  # Background dependency checks; /health/ready serves the last result
+    HEALTH_PROBE_TIMEOUT_SECONDS: float = 3.0
+    HEALTH_READY_REQUIRES_FMCSA: bool = False  # Verification falls back to the cache and census when FMCSA is down
     
     # API Security
     API_KEY: str
@@ -21,6 +34,119 @@ class Settings(BaseSettings):
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = ["*"]
 
+    # Traffic capture for replay (see benchmarks/replay_traffic.py)
+    TRAFFIC_CAPTURE_ENABLED: bool = False
+    TRAFFIC_CAPTURE_PATH: str = "data/traffic_capture.jsonl"
+    TRAFFIC_CAPTURE_SAMPLE_RATE: float = 1.0
+    TRAFFIC_CAPTURE_MAX_BODY_BYTES: int = 65536
+    TRAFFIC_CAPTURE_MAX_FILE_BYTES: int = 256 * 1024 * 1024  # Capture stops once the file reaches this size
+    TRAFFIC_CAPTURE_QUEUE_SIZE: int = 10000
+    TRAFFIC_CAPTURE_EXCLUDED_PATHS: List[str] = ["/api/v1/loads/stream", "/api/v1/offers/dashboard/stream"]  # Long-lived streams
+    TRAFFIC_CAPTURE_REDACT_FIELDS: List[str] = [
+        "api_key", "apikey", "authorization", "password", "token", "webkey",
+        "phone", "phone_number", "caller_phone", "email", "transcript",
+    ]  # JSON body keys replaced with __REDACTED__, matched case-insensitively
+
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # "json" or "text"
+    LOG_QUEUE_SIZE: int = 10000  # Records buffered for the writer thread before new ones are dropped
+    LOG_SAMPLE_RATES: Dict[str, float] = {"app.api.health": 0.01}  # Fraction of sub-WARNING records kept
+
+    # Load change stream (SSE)
+    LOAD_STREAM_POLL_INTERVAL_SECONDS: float = 2.0
+    LOAD_STREAM_BUFFER_SIZE: int = 100
+    LOAD_STREAM_HEARTBEAT_SECONDS: float = 15.0
+
+    # Load record cache (GET /loads/{load_id} and /loads/batch)
+    LOAD_CACHE_MAX_ENTRIES: int = 2000
+    LOAD_CACHE_TTL_SECONDS: float = 60.0
+    LOAD_BATCH_MAX_IDS: int = 100
+
+    # Carrier-personalized ranking (GET /loads/?mc=)
+    CARRIER_RANKING_CANDIDATES: int = 100  # Loads retrieved in default order, then re-ranked for the carrier
+    CARRIER_RANKING_RELEVANCE_WEIGHT: float = 0.5  # Share of the carrier ranking score kept for text relevance when q is given
+    CARRIER_PROFILE_MAX_ENTRIES: int = 5000
+    CARRIER_PROFILE_LOOKBACK_DAYS: int = 180
+    CARRIER_PROFILE_REFRESH_SECONDS: float = 30.0  # Pick up calls logged by other workers at least this often
+    CARRIER_PROFILE_REBUILD_SECONDS: float = 3600.0  # Rebuild a profile this long after it was built
+    CARRIER_PROFILE_LOOKBACK_IDS: int = 200  # Ids below the newest seen that each catch-up rereads for calls that committed late
+
+    # Load facet counts (GET /loads/facets)
+    LOAD_FACETS_CACHE_TTL_SECONDS: float = 30.0  # Bounds staleness for load changes made by other processes
+    LOAD_FACETS_CACHE_MAX_ENTRIES: int = 256
+
+    # Carrier offers
+    OFFER_BATCH_MAX_SIZE: int = 500
+
+    # Live dashboard
+    DASHBOARD_STREAM_BUFFER_SIZE: int = 200
+    DASHBOARD_SUMMARY_RESYNC_SECONDS: float = 60.0
+    DASHBOARD_STREAM_POLL_INTERVAL_SECONDS: float = 1.0  # How often streaming workers check for calls logged elsewhere
+    DASHBOARD_STREAM_LOOKBACK_IDS: int = 200  # Ids below the newest seen that each poll rechecks for calls that committed late
+
+    # Call analytics
+    ANALYTICS_CACHE_TTL_SECONDS: float = 30.0
+    ANALYTICS_CACHE_MAX_ENTRIES: int = 256
+
+    # Lane rate statistics (GET /loads/{load_id}/rate-guidance)
+    LANE_STATS_LOOKBACK_DAYS: int = 180
+    LANE_STATS_REFRESH_SECONDS: float = 30.0  # Pick up calls logged by other workers at least this often
+    LANE_STATS_REBUILD_SECONDS: float = 3600.0  # Full rebuild, dropping calls that left the window
+    LANE_STATS_LOOKBACK_IDS: int = 200  # Ids below the newest seen that each catch-up rereads for calls that committed late
+    LANE_STATS_MIN_SAMPLES: int = 5  # Fewer calls on a lane falls back to all lanes with its equipment type
+    LANE_STATS_RPM_BAND: float = 0.25  # Width of the rate-per-mile acceptance bands, in dollars
+
+    # Call log retention
+    CALL_LOG_ARCHIVE_DIR: str = "archive"
+    CALL_LOG_RETENTION_MONTHS: int = 12  # Whole rows older than this move to archive files
+    CALL_LOG_PAYLOAD_RETENTION_MONTHS: int = 3  # Raw payloads older than this move to archive files
+    CALL_LOG_PARTITION_MONTHS_AHEAD: int = 2
+    CALL_LOG_ARCHIVE_BATCH_SIZE: int = 1000  # Call logs archived per transaction
+
+    # Load expiry and archival
+    LOAD_ARCHIVE_ENABLED: bool = True
+    LOAD_ARCHIVE_INTERVAL_SECONDS: float = 300.0
+    LOAD_ARCHIVE_BATCH_SIZE: int = 1000  # Loads moved per transaction
+    LOAD_EXPIRY_GRACE_HOURS: float = 2.0  # Unbooked loads leave search, booking and the board this long after pickup (local time)
+    LOAD_ARCHIVE_BOOKED_AFTER_HOURS: float = 24.0  # Booked loads stay on the board this long after booking
+    LOAD_ARCHIVE_BOARD_RESYNC_SECONDS: float = 3600.0  # Recount board and archive sizes; in between they follow the rows moved
+
+    # Raw call payload storage
+    PAYLOAD_COMPRESSION: str = "zlib"  # "zlib" or "zstd" (requires zstandard)
+    PAYLOAD_COMPRESSION_LEVEL: int = 6
+
+    # Carrier verification cache
+    VERIFICATION_CACHE_TTL_SECONDS: float = 86400.0
+    VERIFICATION_CACHE_MAX_ENTRIES: int = 10000
+    VERIFICATION_CACHE_BACKEND: str = "memory"  # "memory" (per process) or "sqlite" (shared by all workers on the host)
+    VERIFICATION_CACHE_PATH: str = "data/verification_cache.db"  # Used by the sqlite backend
+
+    # Refresh-ahead for frequent carriers
+    CARRIER_REFRESH_ENABLED: bool = True
+    CARRIER_REFRESH_INTERVAL_SECONDS: float = 300.0
+    CARRIER_REFRESH_TOP_N: int = 200
+    CARRIER_REFRESH_LOOKBACK_DAYS: int = 30
+    CARRIER_REFRESH_AHEAD_SECONDS: float = 3600.0  # Refresh entries expiring within this window
+    CARRIER_REFRESH_BUDGET_PER_MINUTE: float = 30.0  # Max upstream FMCSA calls per minute
+
+    # Offline FMCSA census snapshot
+    FMCSA_CENSUS_INDEX_PATH: str = "data/fmcsa_census.idx"
+    FMCSA_CENSUS_MODE: str = "fallback"  # "first", "fallback" (when the API fails) or "off"
+
+    # Response compression
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # Bytes; smaller responses are sent as-is
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4  # Used when the optional brotli package is installed
+    # Latency-sensitive agent endpoints that are never compressed
+    COMPRESSION_EXCLUDED_PATHS: List[str] = [
+        "/health",
+        "/api/v1/auth",
+        "/api/v1/carriers/find",
+        "/api/v1/offers/log",
+    ]
+
     @field_validator("BACKEND_CORS_ORIGINS")
     @classmethod
     def assemble_cors_origins(cls, v: Union[str, List[str]]) -> Union[List[str], str]:
@@ -1,7 +1,11 @@
+import logging
+
 from fastapi import HTTPException, status, Depends
 from fastapi.security.api_key import APIKeyHeader
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
 # API Key authentication
 api_key_header = APIKeyHeader(name="Authorization", auto_error=False)
 
@@ -38,8 +42,7 @@ async def get_api_key(api_key: str = Depends(api_key_header)):
     clean_api_key = api_key.replace("Bearer", "").replace("ApiKey", "").strip()
     
     if clean_api_key != expected_api_key:
-        print(f"Invalid API Key: '{clean_api_key}' != '{expected_api_key}'")
-        print(f"Lengths: {len(clean_api_key)} vs {len(expected_api_key)}")
+        logger.warning("Invalid API key", extra={"key_prefix": clean_api_key[:4], "key_length": len(clean_api_key)})
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid API Key",
@@ -0,0 +1,146 @@
+import asyncio
+import json
+import threading
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Set
+
+
+class Subscription:
+    """A single subscriber with a bounded buffer of pending events"""
+
+    def __init__(self, maxsize: int, predicate: Optional[Callable[[Dict[str, Any]], bool]] = None):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.predicate = predicate
+        self.dropped = 0
+
+    def offer(self, event: Dict[str, Any]) -> None:
+        """
+        Queue an event for this subscriber
+
+        When the buffer is full the oldest event is discarded, so a slow
+        consumer can never hold back the publisher or other subscribers.
+        """
+        if self.predicate is not None and not self.predicate(event):
+            return
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Wait for the next event, returning None if the timeout expires"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class Broadcaster:
+    """In-process fan-out of events to many subscribers"""
+
+    def __init__(self, buffer_size: int = 100):
+        self.buffer_size = buffer_size
+        self._subscribers: Set[Subscription] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self.published = 0
+
+    def subscribe(self, predicate: Optional[Callable[[Dict[str, Any]], bool]] = None) -> Subscription:
+        """Register a new subscriber (must be called from the event loop)"""
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(self.buffer_size, predicate)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscriber"""
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        """
+        Deliver an event to every subscriber
+
+        Safe to call from the event loop or from a worker thread (sync
+        endpoints run in the threadpool).
+        """
+        if not self._subscribers or self._loop is None:
+            return
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is self._loop:
+            self._deliver(event)
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._deliver, event)
+
+    def _deliver(self, event: Dict[str, Any]) -> None:
+        self.published += 1
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.offer(event)
+
+    def stats(self) -> Dict[str, Any]:
+        """Current subscriber and buffer statistics"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        return {
+            "subscribers": len(subscribers),
+            "published": self.published,
+            "buffered": sum(s.queue.qsize() for s in subscribers),
+            "dropped": sum(s.dropped for s in subscribers),
+            "buffer_size": self.buffer_size,
+        }
+
+
+def format_sse(event_type: str, data: Dict[str, Any], event_id: Optional[int] = None) -> str:
+    """Encode a single server-sent event"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def stream_subscription(
+    broadcaster: Broadcaster,
+    subscription: Subscription,
+    heartbeat_seconds: float = 15.0,
+) -> AsyncIterator[str]:
+    """
+    Yield server-sent events for a subscription until the client disconnects
+
+    ``StreamingResponse`` cancels the generator on disconnect, which releases
+    the subscription. Emits a comment line as a keep-alive when idle, and an
+    ``overflow`` event whenever the subscriber's buffer had to drop events so
+    the client knows to re-fetch its view.
+    """
+    event_id = 0
+    reported_drops = 0
+    try:
+        while True:
+            event = await subscription.get(timeout=heartbeat_seconds)
+            if subscription.dropped > reported_drops:
+                event_id += 1
+                yield format_sse("overflow", {"dropped": subscription.dropped - reported_drops}, event_id)
+                reported_drops = subscription.dropped
+
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+
+            event_id += 1
+            yield format_sse(event["type"], event, event_id)
+    finally:
+        broadcaster.unsubscribe(subscription)
@@ -0,0 +1,370 @@
+import argparse
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Type
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.dashboard_feed import is_booked
+from app.database import SessionLocal, dialect_insert
+from app.models.call_log import CallLog
+from app.models.call_stats import (
+    BUCKET_KEY_COLUMNS,
+    CARRIER_BUCKET_KEY_COLUMNS,
+    LANE_BUCKET_KEY_COLUMNS,
+    CallStatsBucket,
+    CallStatsCarrierBucket,
+    CallStatsLaneBucket,
+)
+from app.models.load import Load, LoadArchive, find_any_load, join_any_load
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = ("hour", "day", "week")
+
+MEASURE_COLUMNS = [
+    "calls",
+    "booked_calls",
+    "agreed_rate_sum",
+    "agreed_rate_count",
+    "loadboard_rate_sum",
+    "loadboard_rate_count",
+    "negotiation_rounds_sum",
+    "negotiation_rounds_count",
+]
+
+# Rollups from narrowest to widest key, with the key columns each one upserts on.
+# A query is answered from the first rollup whose key has every dimension it uses.
+ROLLUPS: List[Tuple[Type, List[str]]] = [
+    (CallStatsBucket, BUCKET_KEY_COLUMNS),
+    (CallStatsLaneBucket, LANE_BUCKET_KEY_COLUMNS),
+    (CallStatsCarrierBucket, CARRIER_BUCKET_KEY_COLUMNS),
+]
+
+
+def bucket_start(moment: datetime, granularity: str) -> datetime:
+    """Truncate a timestamp to the start of its hour, day or ISO week"""
+    if granularity == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return day
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+
+def _measures(call_log: CallLog, load: Optional[Load]) -> Dict[str, Any]:
+    """Per-call contribution to every measure column"""
+    has_agreed_rate = call_log.agreed_rate is not None
+    has_loadboard_rate = has_agreed_rate and load is not None and load.loadboard_rate is not None
+    return {
+        "calls": 1,
+        "booked_calls": 1 if is_booked(call_log.call_outcome_classification) else 0,
+        "agreed_rate_sum": call_log.agreed_rate if has_agreed_rate else 0.0,
+        "agreed_rate_count": 1 if has_agreed_rate else 0,
+        "loadboard_rate_sum": load.loadboard_rate if has_loadboard_rate else 0.0,
+        "loadboard_rate_count": 1 if has_loadboard_rate else 0,
+        "negotiation_rounds_sum": call_log.negotiation_rounds or 0,
+        "negotiation_rounds_count": 1 if call_log.negotiation_rounds is not None else 0,
+    }
+
+
+def normalize_dimension(value: Optional[str]) -> str:
+    """
+    Canonical form of a dimension value: trimmed, single-spaced and lowercase
+
+    Applied when buckets are written and to query filters, so filters are
+    plain equality matches the unique indexes can serve.
+    """
+    return " ".join((value or "").split()).lower()
+
+
+def _dimensions(call_log: CallLog, load: Optional[Load]) -> Dict[str, str]:
+    return {
+        column: normalize_dimension(value)
+        for column, value in {
+            "origin": load.origin if load is not None else None,
+            "destination": load.destination if load is not None else None,
+            "equipment_type": load.equipment_type if load is not None else None,
+            "mc_number": call_log.mc_number,
+            "call_outcome_classification": call_log.call_outcome_classification,
+            "carrier_sentiment_classification": call_log.carrier_sentiment_classification,
+        }.items()
+    }
+
+
+def _bucket_key(key_columns: List[str], granularity: str, start: datetime, dimensions: Dict[str, str]) -> Tuple:
+    values = {"granularity": granularity, "bucket_start": start, **dimensions}
+    return tuple(values[column] for column in key_columns)
+
+
+def record_call(db: Session, call_log: CallLog) -> None:
+    """
+    Fold a newly logged call into the hour, day and week buckets of every rollup
+
+    Runs inside the caller's transaction, so the aggregates commit (or roll
+    back) together with the call log itself. The call log must be flushed so
+    that ``called_at`` is populated.
+    """
+    load = None
+    if call_log.searched_load_id:
+        load = find_any_load(db, call_log.searched_load_id)
+
+    dimensions = _dimensions(call_log, load)
+    measures = _measures(call_log, load)
+    called_at = call_log.called_at or datetime.utcnow()
+
+    for model, key_columns in ROLLUPS:
+        table = model.__table__
+        # One multi-row upsert per rollup covers all three granularities
+        rows = [
+            dict(zip(key_columns, _bucket_key(key_columns, granularity, bucket_start(called_at, granularity), dimensions)), **measures)
+            for granularity in GRANULARITIES
+        ]
+        stmt = dialect_insert(db, table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={column: table.c[column] + stmt.excluded[column] for column in MEASURE_COLUMNS},
+        )
+        db.execute(stmt)
+
+
+def backfill(db: Session, since: Optional[datetime] = None, batch_size: int = 1000) -> int:
+    """
+    Rebuild aggregates from raw call logs
+
+    Args:
+        db: Database session
+        since: Only rebuild calls from this moment on (aligned down to the start of its week)
+        batch_size: Rows fetched per round trip
+
+    Returns:
+        int: Number of call logs aggregated
+    """
+    if since is not None:
+        since = bucket_start(since, "week")
+
+    for model, _ in ROLLUPS:
+        delete_query = db.query(model)
+        if since is not None:
+            delete_query = delete_query.filter(model.bucket_start >= since)
+        delete_query.delete(synchronize_session=False)
+
+    query = join_any_load(db.query(CallLog, Load, LoadArchive), CallLog.searched_load_id)
+    if since is not None:
+        query = query.filter(CallLog.called_at >= since)
+
+    buckets: Dict[Type, Dict[Tuple, Dict[str, Any]]] = {model: {} for model, _ in ROLLUPS}
+    processed = 0
+    for call_log, load, archived_load in query.yield_per(batch_size):
+        load = load or archived_load
+        if call_log.called_at is None:
+            continue
+        dimensions = _dimensions(call_log, load)
+        measures = _measures(call_log, load)
+        for granularity in GRANULARITIES:
+            start = bucket_start(call_log.called_at, granularity)
+            for model, key_columns in ROLLUPS:
+                key = _bucket_key(key_columns, granularity, start, dimensions)
+                totals = buckets[model].setdefault(key, dict.fromkeys(MEASURE_COLUMNS, 0))
+                for column, value in measures.items():
+                    totals[column] += value
+        processed += 1
+
+    written = 0
+    for model, key_columns in ROLLUPS:
+        rows = [dict(zip(key_columns, key), **totals) for key, totals in buckets[model].items()]
+        for start in range(0, len(rows), batch_size):
+            db.execute(model.__table__.insert(), rows[start:start + batch_size])
+        written += len(rows)
+    db.commit()
+    analytics_cache.clear()
+
+    logger.info(f"Backfilled call analytics from {processed} call logs into {written} buckets")
+    return processed
+
+
+def choose_rollup(dimensions: Set[str]) -> Type:
+    """
+    The narrowest rollup whose key has every dimension in ``dimensions``
+
+    Raises:
+        ValueError: If no rollup covers that combination of dimensions
+    """
+    for model, key_columns in ROLLUPS:
+        if dimensions <= set(key_columns):
+            return model
+    raise ValueError(f"Call stats cannot be filtered by {', '.join(sorted(dimensions))} together")
+
+
+def query_call_stats(
+    db: Session,
+    granularity: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    outcome: Optional[str] = None,
+    sentiment: Optional[str] = None,
+    equipment_type: Optional[str] = None,
+    mc_number: Optional[str] = None,
+    origin: Optional[str] = None,
+    destination: Optional[str] = None,
+    group_by_lane: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Read time-bucketed call statistics from the pre-aggregated buckets
+
+    Lane filters and grouping are served by the lane rollup and carrier
+    filters by the carrier rollup; other filters by the main one. Filters
+    match case-insensitively, since bucket values are normalized when
+    written. Results are ordered by bucket and, when grouped by lane, by
+    origin and destination.
+
+    Raises:
+        ValueError: If the filters span dimensions no single rollup keeps,
+            e.g. a carrier together with a lane or an outcome
+    """
+    filters = {
+        "call_outcome_classification": outcome,
+        "carrier_sentiment_classification": sentiment,
+        "equipment_type": equipment_type,
+        "mc_number": mc_number,
+        "origin": origin,
+        "destination": destination,
+    }
+    filters = {column: normalize_dimension(value) for column, value in filters.items() if value}
+    dimensions = set(filters) | ({"origin", "destination"} if group_by_lane else set())
+    model = choose_rollup(dimensions)
+
+    group_columns = [model.bucket_start]
+    if group_by_lane:
+        group_columns += [model.origin, model.destination]
+    group_columns.append(model.carrier_sentiment_classification)
+
+    query = db.query(
+        *group_columns,
+        *[func.sum(getattr(model, column)).label(column) for column in MEASURE_COLUMNS],
+    ).filter(model.granularity == granularity)
+
+    if start is not None:
+        query = query.filter(model.bucket_start >= bucket_start(start, granularity))
+    if end is not None:
+        query = query.filter(model.bucket_start < end)
+    for column, value in filters.items():
+        query = query.filter(getattr(model, column) == value)
+
+    query = query.group_by(*group_columns).order_by(*group_columns)
+
+    # Fold the per-sentiment rows into one result per bucket (and lane)
+    results: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+    for row in query:
+        key = (row.bucket_start, row.origin, row.destination) if group_by_lane else (row.bucket_start,)
+        result = results.get(key)
+        if result is None:
+            result = results[key] = {
+                "bucket_start": row.bucket_start,
+                "origin": (row.origin or None) if group_by_lane else None,
+                "destination": (row.destination or None) if group_by_lane else None,
+                "totals": dict.fromkeys(MEASURE_COLUMNS, 0),
+                "sentiment_mix": defaultdict(int),
+            }
+        for column in MEASURE_COLUMNS:
+            result["totals"][column] += getattr(row, column) or 0
+        result["sentiment_mix"][row.carrier_sentiment_classification or "unknown"] += row.calls or 0
+
+    return [_summarize(result) for result in results.values()]
+
+
+def _summarize(result: Dict[str, Any]) -> Dict[str, Any]:
+    totals = result["totals"]
+
+    def average(sum_column: str, count_column: str) -> Optional[float]:
+        return round(totals[sum_column] / totals[count_column], 2) if totals[count_column] else None
+
+    return {
+        "bucket_start": result["bucket_start"],
+        "origin": result["origin"],
+        "destination": result["destination"],
+        "calls": totals["calls"],
+        "booked_calls": totals["booked_calls"],
+        "booking_rate": round(totals["booked_calls"] / totals["calls"] * 100, 1) if totals["calls"] else 0.0,
+        "avg_agreed_rate": average("agreed_rate_sum", "agreed_rate_count"),
+        "avg_loadboard_rate": average("loadboard_rate_sum", "loadboard_rate_count"),
+        "avg_negotiation_rounds": average("negotiation_rounds_sum", "negotiation_rounds_count"),
+        "sentiment_mix": dict(result["sentiment_mix"]),
+    }
+
+
+class AnalyticsCache:
+    """Small LRU of recent analytics results with a time-to-live"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Tuple, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+# Singleton instance
+analytics_cache = AnalyticsCache(
+    max_entries=settings.ANALYTICS_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.ANALYTICS_CACHE_TTL_SECONDS,
+)
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Maintain pre-aggregated call analytics")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    backfill_parser = subparsers.add_parser("backfill", help="Rebuild aggregates from call_logs")
+    backfill_parser.add_argument("--since", help="Only rebuild from this date (YYYY-MM-DD)")
+    args = parser.parse_args(argv)
+
+    if args.command == "backfill":
+        since = datetime.strptime(args.since, "%Y-%m-%d") if args.since else None
+        db = SessionLocal()
+        try:
+            processed = backfill(db, since=since)
+            print(f"Aggregated {processed} call logs")
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
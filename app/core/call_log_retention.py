@@ -0,0 +1,503 @@
+import argparse
+import gzip
+import json
+import logging
+import os
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import null, or_, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, selectinload, undefer
+
+from app.config import settings
+from app.database import SessionLocal, engine, partitioned_tables
+from app.models.call_log import CallLog, CallLogPayload
+
+logger = logging.getLogger(__name__)
+
+ROWS_PREFIX = "call_logs"
+PAYLOADS_PREFIX = "call_log_payloads"
+# First month each archive kind has not finished yet, so later runs skip older months
+WATERMARKS_FILE = "watermarks.json"
+# Sidecar listing each gzip member of an archive with its byte range and id range
+INDEX_SUFFIX = ".idx"
+
+
+def month_start(moment: datetime) -> datetime:
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(month: datetime) -> str:
+    return f"call_logs_y{month.year:04d}m{month.month:02d}"
+
+
+def call_log_record(log: CallLog, include_payload: bool = False) -> Dict[str, Any]:
+    """Serialize a call log the way the logs and export endpoints return it"""
+    record = {
+        "id": log.id,
+        "happyrobot_run_id": log.happyrobot_run_id,
+        "mc_number": log.mc_number,
+        "called_at": log.called_at.isoformat() if log.called_at else None,
+        "searched_load_id": log.searched_load_id,
+        "initial_carrier_offer": log.initial_carrier_offer,
+        "negotiation_rounds": log.negotiation_rounds,
+        "agreed_rate": log.agreed_rate,
+        "call_outcome_classification": log.call_outcome_classification,
+        "carrier_sentiment_classification": log.carrier_sentiment_classification,
+        "fmcsa_verified_eligible": log.fmcsa_verified_eligible,
+        "created_at": log.created_at.isoformat() if log.created_at else None,
+        "updated_at": log.updated_at.isoformat() if log.updated_at else None,
+    }
+    if include_payload:
+        record["raw_extracted_data"] = log.raw_extracted_data
+    return record
+
+
+# --- Postgres partitioning -------------------------------------------------
+
+def is_partitioned(bind: Engine) -> bool:
+    return "call_logs" in partitioned_tables(bind)
+
+
+def _create_partition(conn, month: datetime) -> None:
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF call_logs "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    ))
+
+
+def convert_to_partitioned(bind: Engine) -> None:
+    """
+    Rebuild call_logs as a table partitioned by month on ``called_at`` (Postgres only)
+
+    Postgres requires the partition key in every unique constraint, so the
+    primary key becomes ``(id, called_at)`` and run ID uniqueness is enforced
+    per partition (``log_call_outcome`` already checks it before inserting).
+    Existing rows are copied in a single transaction.
+    """
+    if bind.dialect.name != "postgresql":
+        raise RuntimeError("call_logs partitioning is only supported on PostgreSQL")
+    if is_partitioned(bind):
+        logger.info("call_logs is already partitioned")
+        return
+
+    with bind.begin() as conn:
+        conn.execute(text("ALTER TABLE call_logs RENAME TO call_logs_unpartitioned"))
+        # Keep the id sequence alive when the old table is dropped
+        conn.execute(text("ALTER SEQUENCE call_logs_id_seq OWNED BY NONE"))
+        conn.execute(text("UPDATE call_logs_unpartitioned SET called_at = coalesce(created_at, now()) WHERE called_at IS NULL"))
+        conn.execute(text(
+            "CREATE TABLE call_logs (LIKE call_logs_unpartitioned INCLUDING DEFAULTS) PARTITION BY RANGE (called_at)"
+        ))
+        conn.execute(text("ALTER TABLE call_logs ALTER COLUMN called_at SET NOT NULL"))
+        conn.execute(text("ALTER TABLE call_logs ADD PRIMARY KEY (id, called_at)"))
+        conn.execute(text("CREATE UNIQUE INDEX ix_call_logs_run_id_called_at ON call_logs (happyrobot_run_id, called_at)"))
+        conn.execute(text("CREATE INDEX ix_call_logs_part_run_id ON call_logs (happyrobot_run_id)"))
+        conn.execute(text("CREATE INDEX ix_call_logs_part_mc_number ON call_logs (mc_number)"))
+        conn.execute(text("CREATE INDEX ix_call_logs_part_created_at ON call_logs (created_at)"))
+        conn.execute(text("CREATE TABLE call_logs_default PARTITION OF call_logs DEFAULT"))
+
+        oldest = conn.execute(text("SELECT min(called_at) FROM call_logs_unpartitioned")).scalar()
+        month = month_start(oldest or datetime.utcnow())
+        last = add_months(month_start(datetime.utcnow()), settings.CALL_LOG_PARTITION_MONTHS_AHEAD)
+        while month <= last:
+            _create_partition(conn, month)
+            month = add_months(month, 1)
+
+        conn.execute(text("INSERT INTO call_logs SELECT * FROM call_logs_unpartitioned"))
+        conn.execute(text("DROP TABLE call_logs_unpartitioned"))
+    logger.info("Converted call_logs to monthly partitions")
+
+
+def ensure_partitions(bind: Engine, months_ahead: Optional[int] = None) -> None:
+    """Create partitions for the current month and the next few months"""
+    if not is_partitioned(bind):
+        return
+    months_ahead = settings.CALL_LOG_PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    current = month_start(datetime.utcnow())
+    with bind.begin() as conn:
+        for offset in range(months_ahead + 1):
+            _create_partition(conn, add_months(current, offset))
+
+
+# --- Archiving ---------------------------------------------------------------
+
+def _archive_path(prefix: str, month: datetime) -> str:
+    return os.path.join(settings.CALL_LOG_ARCHIVE_DIR, f"{prefix}-{month.year:04d}-{month.month:02d}.jsonl.gz")
+
+
+def _append_archive(prefix: str, month: datetime, records: List[Dict[str, Any]]) -> None:
+    """Append records to a month's archive file and fsync it before the database is touched"""
+    os.makedirs(settings.CALL_LOG_ARCHIVE_DIR, exist_ok=True)
+    # Appending adds a new gzip member; gzip readers treat members as one stream
+    path = _archive_path(prefix, month)
+    with open(path, "ab") as raw:
+        offset = raw.tell()
+        with gzip.GzipFile(fileobj=raw, mode="ab") as archive:
+            for record in records:
+                archive.write((json.dumps(record, default=str) + "\n").encode("utf-8"))
+        raw.flush()
+        os.fsync(raw.fileno())
+        end = raw.tell()
+    # Written after the data, so a member missing from the index only costs a full scan
+    ids = [record["id"] for record in records]
+    with open(path + INDEX_SUFFIX, "a") as index:
+        index.write(json.dumps({"offset": offset, "end": end, "first_id": min(ids), "last_id": max(ids)}) + "\n")
+
+
+def _read_archive(prefix: str, month: datetime) -> Iterator[Dict[str, Any]]:
+    path = _archive_path(prefix, month)
+    if not os.path.exists(path):
+        return
+    with gzip.open(path, "rt", encoding="utf-8") as archive:
+        for line in archive:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _read_watermark(prefix: str) -> Optional[datetime]:
+    path = os.path.join(settings.CALL_LOG_ARCHIVE_DIR, WATERMARKS_FILE)
+    try:
+        with open(path) as f:
+            value = json.load(f).get(prefix)
+    except (OSError, ValueError):
+        return None
+    return datetime.strptime(value, "%Y-%m") if value else None
+
+
+def _write_watermark(prefix: str, month: datetime) -> None:
+    """Record that every month before ``month`` is archived"""
+    path = os.path.join(settings.CALL_LOG_ARCHIVE_DIR, WATERMARKS_FILE)
+    try:
+        with open(path) as f:
+            watermarks = json.load(f)
+    except (OSError, ValueError):
+        watermarks = {}
+    watermarks[prefix] = f"{month:%Y-%m}"
+    os.makedirs(settings.CALL_LOG_ARCHIVE_DIR, exist_ok=True)
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(watermarks, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def _month_range(db: Session, before: datetime, after: Optional[datetime] = None) -> List[datetime]:
+    """
+    Months to archive before ``before``
+
+    Starts at ``after`` (the watermark of months already archived) if given,
+    otherwise at the month of the oldest call log.
+    """
+    if after is None:
+        oldest = db.query(CallLog.called_at).filter(CallLog.called_at < before).order_by(CallLog.called_at).first()
+        if oldest is None or oldest[0] is None:
+            return []
+        after = oldest[0]
+    months = []
+    month = month_start(after)
+    while month < before:
+        months.append(month)
+        month = add_months(month, 1)
+    return months
+
+
+def _month_batches(db: Session, month: datetime, batch_size: int, *criteria) -> Iterator[List[CallLog]]:
+    """
+    Yield a month's call logs matching ``criteria`` in batches of up to ``batch_size``, by id
+
+    Each batch starts after the last id of the previous one, so callers may
+    delete or update the rows they were given before asking for the next.
+    """
+    month_filter = (CallLog.called_at >= month) & (CallLog.called_at < add_months(month, 1))
+    last_id = 0
+    while True:
+        logs = (
+            db.query(CallLog)
+            .options(selectinload(CallLog.payload), undefer(CallLog.raw_extracted_data_json))
+            .filter(month_filter, CallLog.id > last_id, *criteria)
+            .order_by(CallLog.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not logs:
+            return
+        last_id = logs[-1].id
+        yield logs
+
+
+def archive_old_rows(
+    db: Session,
+    now: Optional[datetime] = None,
+    dry_run: bool = False,
+    batch_size: Optional[int] = None,
+) -> int:
+    """
+    Move whole call logs older than ``CALL_LOG_RETENTION_MONTHS`` to archive files
+
+    Rows are archived in id-ordered batches of ``batch_size``, each appended
+    to the month's file and deleted in its own transaction. Partitioned
+    tables instead detach and drop the month's partition once all of it is
+    archived. Months before the rows watermark are skipped.
+
+    Returns:
+        int: Number of call logs archived
+    """
+    batch_size = batch_size or settings.CALL_LOG_ARCHIVE_BATCH_SIZE
+    cutoff = add_months(month_start(now or datetime.utcnow()), -settings.CALL_LOG_RETENTION_MONTHS)
+    partitioned = is_partitioned(db.get_bind())
+    archived = 0
+
+    for month in _month_range(db, cutoff, _read_watermark(ROWS_PREFIX)):
+        name = partition_name(month)
+        detach = partitioned and db.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar()
+        moved_payloads = None
+        month_archived = 0
+        for logs in _month_batches(db, month, batch_size):
+            month_archived += len(logs)
+            if dry_run:
+                continue
+
+            records = [call_log_record(log, include_payload=True) for log in logs]
+            if any(record["raw_extracted_data"] is None for record in records):
+                # Fill in payloads that were already moved to the payload archive
+                if moved_payloads is None:
+                    moved_payloads = archived_payloads(month)
+                for record in records:
+                    if record["raw_extracted_data"] is None and record["id"] in moved_payloads:
+                        record["raw_extracted_data"] = moved_payloads[record["id"]]
+            _append_archive(ROWS_PREFIX, month, records)
+
+            ids = [log.id for log in logs]
+            db.query(CallLogPayload).filter(CallLogPayload.call_log_id.in_(ids)).delete(synchronize_session=False)
+            if not detach:
+                db.query(CallLog).filter(CallLog.id.in_(ids)).delete(synchronize_session=False)
+            db.commit()
+
+        if dry_run:
+            if month_archived:
+                logger.info(f"Would archive {month_archived} call logs from {month:%Y-%m}")
+            archived += month_archived
+            continue
+        if detach:
+            db.execute(text(f"ALTER TABLE call_logs DETACH PARTITION {name}"))
+            db.execute(text(f"DROP TABLE {name}"))
+            db.commit()
+        _write_watermark(ROWS_PREFIX, add_months(month, 1))
+
+        archived += month_archived
+        if month_archived:
+            logger.info(f"Archived {month_archived} call logs from {month:%Y-%m}")
+    return archived
+
+
+def archive_old_payloads(
+    db: Session,
+    now: Optional[datetime] = None,
+    dry_run: bool = False,
+    batch_size: Optional[int] = None,
+) -> int:
+    """
+    Move raw extracted payloads older than ``CALL_LOG_PAYLOAD_RETENTION_MONTHS``
+    to archive files, keeping the call log rows themselves
+
+    Only rows that still hold a payload are read, in id-ordered batches of
+    ``batch_size`` committed one at a time. Months before the payloads
+    watermark are skipped.
+
+    Returns:
+        int: Number of payloads archived
+    """
+    batch_size = batch_size or settings.CALL_LOG_ARCHIVE_BATCH_SIZE
+    cutoff = add_months(month_start(now or datetime.utcnow()), -settings.CALL_LOG_PAYLOAD_RETENTION_MONTHS)
+    has_payload = or_(
+        CallLog.raw_extracted_data_json.isnot(None),
+        CallLog.id.in_(select(CallLogPayload.call_log_id)),
+    )
+    archived = 0
+
+    for month in _month_range(db, cutoff, _read_watermark(PAYLOADS_PREFIX)):
+        month_archived = 0
+        for logs in _month_batches(db, month, batch_size, has_payload):
+            # Legacy JSON null may be stored as the literal 'null', so check the decoded value
+            rows = [(log.id, log.happyrobot_run_id, log.raw_extracted_data) for log in logs]
+            rows = [row for row in rows if row[2] is not None]
+            month_archived += len(rows)
+            if dry_run:
+                continue
+
+            if rows:
+                _append_archive(PAYLOADS_PREFIX, month, [
+                    {"id": log_id, "happyrobot_run_id": run_id, "raw_extracted_data": payload}
+                    for log_id, run_id, payload in rows
+                ])
+            ids = [log.id for log in logs]
+            db.query(CallLogPayload).filter(CallLogPayload.call_log_id.in_(ids)).delete(synchronize_session=False)
+            db.query(CallLog).filter(CallLog.id.in_(ids)).update(
+                {CallLog.raw_extracted_data_json: null()}, synchronize_session=False
+            )
+            db.commit()
+
+        if dry_run:
+            if month_archived:
+                logger.info(f"Would archive {month_archived} payloads from {month:%Y-%m}")
+            archived += month_archived
+            continue
+        _write_watermark(PAYLOADS_PREFIX, add_months(month, 1))
+
+        archived += month_archived
+        if month_archived:
+            logger.info(f"Archived {month_archived} payloads from {month:%Y-%m}")
+    return archived
+
+
+def compress_legacy_payloads(db: Session, batch_size: int = 500) -> int:
+    """
+    Move payloads still stored inline in ``raw_extracted_data_json`` into
+    compressed ``call_log_payloads`` rows
+
+    Returns:
+        int: Number of payloads moved
+    """
+    moved = 0
+    last_id = 0
+    while True:
+        logs = (
+            db.query(CallLog)
+            .options(selectinload(CallLog.payload), undefer(CallLog.raw_extracted_data_json))
+            .filter(CallLog.id > last_id, CallLog.raw_extracted_data_json.isnot(None))
+            .order_by(CallLog.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not logs:
+            break
+        for log in logs:
+            if log.payload is None and log.raw_extracted_data_json is not None:
+                log.raw_extracted_data = log.raw_extracted_data_json
+                moved += 1
+            log.raw_extracted_data_json = null()
+        last_id = logs[-1].id
+        db.commit()
+    logger.info(f"Compressed {moved} legacy call log payloads")
+    return moved
+
+
+def iter_archived_call_logs(start: Optional[datetime] = None, end: Optional[datetime] = None) -> Iterator[Dict[str, Any]]:
+    """Yield archived call log records in month order, restricted to ``[start, end)``"""
+    if not os.path.isdir(settings.CALL_LOG_ARCHIVE_DIR):
+        return
+    months = []
+    for filename in os.listdir(settings.CALL_LOG_ARCHIVE_DIR):
+        if filename.startswith(f"{ROWS_PREFIX}-") and filename.endswith(".jsonl.gz"):
+            months.append(datetime.strptime(filename[len(ROWS_PREFIX) + 1:-len(".jsonl.gz")], "%Y-%m"))
+
+    seen = set()
+    for month in sorted(months):
+        if (end is not None and month >= end) or (start is not None and add_months(month, 1) <= start):
+            continue
+        for record in _read_archive(ROWS_PREFIX, month):
+            # A retried archive run may have appended the same rows twice
+            if record["id"] in seen:
+                continue
+            seen.add(record["id"])
+            called_at = datetime.fromisoformat(record["called_at"]) if record.get("called_at") else None
+            if called_at is not None:
+                if (start is not None and called_at < start) or (end is not None and called_at >= end):
+                    continue
+            yield record
+
+
+def archived_payloads(month: datetime) -> Dict[int, Any]:
+    """Payloads moved out of a month's call logs, by call log ID"""
+    return {record["id"]: record["raw_extracted_data"] for record in _read_archive(PAYLOADS_PREFIX, month)}
+
+
+def _read_member(path: str, offset: int) -> bytes:
+    """Decompress the single gzip member starting at ``offset``"""
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    data = []
+    with open(path, "rb") as raw:
+        raw.seek(offset)
+        while not decompressor.eof:
+            chunk = raw.read(64 * 1024)
+            if not chunk:
+                break
+            data.append(decompressor.decompress(chunk))
+    return b"".join(data)
+
+
+def archived_payload(month: datetime, call_log_id: int) -> Any:
+    """
+    One call's payload from a month's payload archive, or None
+
+    Only the archive members whose id range covers the call are decompressed,
+    found through the archive's index. Archives written before the index
+    existed, or with members missing from it, are streamed until the call
+    turns up. Records are written with ``id`` first, so other lines are skipped on
+    a byte prefix check without being decoded.
+    """
+    path = _archive_path(PAYLOADS_PREFIX, month)
+    if not os.path.exists(path):
+        return None
+    prefix = (json.dumps({"id": call_log_id})[:-1] + ",").encode("utf-8")
+
+    try:
+        with open(path + INDEX_SUFFIX) as index:
+            members = [json.loads(line) for line in index if line.strip()]
+    except (OSError, ValueError):
+        members = []
+    for member in members:
+        if member["first_id"] <= call_log_id <= member["last_id"]:
+            for line in _read_member(path, member["offset"]).splitlines():
+                if line.startswith(prefix):
+                    return json.loads(line)["raw_extracted_data"]
+    if members and max(member["end"] for member in members) == os.path.getsize(path):
+        # The index covers the whole file, so the call is not archived here
+        return None
+
+    with gzip.open(path, "rb") as archive:
+        for line in archive:
+            if line.startswith(prefix):
+                return json.loads(line)["raw_extracted_data"]
+    return None
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Partition and archive call_logs")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("partition", help="Convert call_logs to monthly partitions (PostgreSQL)")
+    subparsers.add_parser("maintain", help="Create upcoming monthly partitions")
+    archive_parser = subparsers.add_parser("archive", help="Archive old call logs and payloads")
+    archive_parser.add_argument("--dry-run", action="store_true")
+    subparsers.add_parser("compress-payloads", help="Move inline payloads to compressed call_log_payloads rows")
+    args = parser.parse_args(argv)
+
+    if args.command == "partition":
+        convert_to_partitioned(engine)
+    elif args.command == "maintain":
+        ensure_partitions(engine)
+    elif args.command == "archive":
+        db = SessionLocal()
+        try:
+            payloads = archive_old_payloads(db, dry_run=args.dry_run)
+            rows = archive_old_rows(db, dry_run=args.dry_run)
+            print(f"Archived {payloads} payloads and {rows} call logs")
+        finally:
+            db.close()
+        ensure_partitions(engine)
+    elif args.command == "compress-payloads":
+        db = SessionLocal()
+        try:
+            print(f"Compressed {compress_legacy_payloads(db)} payloads")
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
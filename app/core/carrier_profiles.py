@@ -0,0 +1,259 @@
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.dashboard_feed import is_booked
+from app.core.lane_stats import lane_key
+from app.models.call_log import CallLog
+from app.models.load import Load, LoadArchive, any_load_column, join_any_load
+
+logger = logging.getLogger(__name__)
+
+# Score = weighted lane, equipment and rate fit, each in [0, 1]
+LANE_WEIGHT = 0.5
+EQUIPMENT_WEIGHT = 0.3
+RATE_WEIGHT = 0.2
+# How much a call that did not book counts towards lane and equipment affinity, relative to a booking
+UNBOOKED_CALL_WEIGHT = 0.25
+
+
+class CarrierProfile:
+    """
+    What one carrier has called about, booked and accepted
+
+    Booked calls weigh fully and other calls ``UNBOOKED_CALL_WEIGHT`` towards
+    the lane, origin, destination and equipment counters. The accepted rate
+    per mile is the mean over booked calls with an agreed rate and known miles.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.bookings = 0
+        self.weight = 0.0
+        self.lanes: Counter = Counter()
+        self.origins: Counter = Counter()
+        self.destinations: Counter = Counter()
+        self.equipment: Counter = Counter()
+        self.accepted_rpm_sum = 0.0
+        self.accepted_rpm_count = 0
+        # Ids of folded calls the store may read again; see CarrierProfileStore.catch_up
+        self.recent_ids: Set[int] = set()
+        self.built_at = time.monotonic()
+
+    def add(self, row: Sequence) -> None:
+        """Fold in one (mc, origin, destination, equipment, miles, loadboard_rate, agreed_rate, outcome, id) row"""
+        _, origin, destination, equipment, miles, _, agreed_rate, outcome, call_id = row
+        origin, destination, equipment = lane_key(origin, destination, equipment)
+        booked = is_booked(outcome)
+        weight = 1.0 if booked else UNBOOKED_CALL_WEIGHT
+        self.calls += 1
+        self.bookings += booked
+        self.weight += weight
+        self.lanes[(origin, destination)] += weight
+        self.origins[origin] += weight
+        self.destinations[destination] += weight
+        self.equipment[equipment] += weight
+        if booked and agreed_rate and miles:
+            self.accepted_rpm_sum += agreed_rate / miles
+            self.accepted_rpm_count += 1
+        self.recent_ids.add(call_id)
+
+    def forget_ids_through(self, floor: int) -> None:
+        """Drop remembered call ids at or below ``floor``, which catch-ups no longer read"""
+        self.recent_ids = {call_id for call_id in self.recent_ids if call_id > floor}
+
+    @property
+    def accepted_rate_per_mile(self) -> Optional[float]:
+        return self.accepted_rpm_sum / self.accepted_rpm_count if self.accepted_rpm_count else None
+
+    def score(self, load: Any) -> float:
+        """How well a load fits this carrier, from 0 to 1"""
+        if not self.weight:
+            return 0.0
+        origin, destination, equipment = lane_key(load.origin, load.destination, load.equipment_type)
+        lane = (
+            2 * self.lanes.get((origin, destination), 0.0) + self.origins.get(origin, 0.0) + self.destinations.get(destination, 0.0)
+        ) / (4 * self.weight)
+        equipment_fit = self.equipment.get(equipment, 0.0) / self.weight
+        rate_fit = 0.0
+        accepted = self.accepted_rate_per_mile
+        if accepted and load.miles:
+            # Loads paying at least the carrier's usual rate per mile score fully
+            rate_fit = min(1.0, load.loadboard_rate / load.miles / accepted)
+        return LANE_WEIGHT * lane + EQUIPMENT_WEIGHT * equipment_fit + RATE_WEIGHT * rate_fit
+
+
+def rank_loads(profile: Optional[CarrierProfile], loads: List[Any], relevance_weight: float = 0.0) -> List[Any]:
+    """
+    Order loads by fit with the carrier's profile, best first
+
+    The sort is stable, so loads the profile cannot tell apart keep their
+    original order, and carriers without history get the list unchanged.
+
+    Args:
+        profile: The carrier's profile, or None
+        loads: Loads in their incoming order, e.g. best text matches first
+        relevance_weight: Share of the score, from 0 to 1, taken by a load's
+            position in ``loads`` (1 for the first, falling linearly), so a
+            text search's relevance order is blended in rather than replaced
+
+    Returns:
+        The loads reordered
+    """
+    if profile is None or not profile.calls:
+        return loads
+    scores = {
+        id(load): (1 - relevance_weight) * profile.score(load) + relevance_weight * (1 - position / len(loads))
+        for position, load in enumerate(loads)
+    }
+    return sorted(loads, key=lambda load: -scores[id(load)])
+
+
+class CarrierProfileStore:
+    """
+    Carrier profiles built on first use and kept current incrementally
+
+    A carrier's profile is built from its calls in the lookback window (one
+    indexed query on ``mc_number``) the first time it is asked for, and held
+    in an LRU. After that, calls logged since the last one seen are fetched
+    as a primary key range scan and folded into the profiles that are
+    loaded; this runs before a read whenever a call was logged locally or
+    ``refresh_seconds`` have passed, so calls logged through other workers
+    count within that interval. Ids are assigned before commit, so a call
+    can become visible after a higher id: each catch-up rereads the last
+    ``lookback_ids`` ids below the newest one seen, and profiles remember
+    the ids in that range they already hold. Queries run without the lock,
+    which is only taken to merge. Profiles are rebuilt after
+    ``rebuild_seconds`` so calls that left the window drop out.
+    """
+
+    def __init__(self, max_entries: int, lookback_days: int, refresh_seconds: float, rebuild_seconds: float, lookback_ids: int):
+        self.max_entries = max_entries
+        self.lookback_days = lookback_days
+        self.lookback_ids = lookback_ids
+        self.refresh_seconds = refresh_seconds
+        self.rebuild_seconds = rebuild_seconds
+        self._profiles: "OrderedDict[str, CarrierProfile]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_id: Optional[int] = None
+        self._refreshed_at = 0.0
+        self._stale = False
+        self.hits = 0
+        self.builds = 0
+        self.catch_ups = 0
+        self.evictions = 0
+
+    def _query(self):
+        since = datetime.utcnow() - timedelta(days=self.lookback_days)
+        statement = select(
+            CallLog.mc_number,
+            *(any_load_column(name) for name in ("origin", "destination", "equipment_type", "miles", "loadboard_rate")),
+            CallLog.agreed_rate, CallLog.call_outcome_classification, CallLog.id,
+        ).select_from(CallLog)
+        # Archived loads keep contributing their calls
+        return (
+            join_any_load(statement, CallLog.searched_load_id)
+            .where(CallLog.called_at >= since)
+            .where(or_(Load.id.isnot(None), LoadArchive.id.isnot(None)))
+        )
+
+    def get(self, db: Session, mc_number: str) -> CarrierProfile:
+        """
+        The carrier's profile, built from its call history if not loaded
+
+        Args:
+            db: Session used to build the profile and catch up on new calls
+            mc_number: Carrier MC number
+
+        Returns:
+            The profile; empty for carriers without calls in the window
+        """
+        self._ensure_current(db)
+        with self._lock:
+            profile = self._profiles.get(mc_number)
+            if profile is not None and time.monotonic() - profile.built_at < self.rebuild_seconds:
+                self._profiles.move_to_end(mc_number)
+                self.hits += 1
+                return profile
+
+        profile = CarrierProfile()
+        for row in db.connection().execute(self._query().where(CallLog.mc_number == mc_number)):
+            profile.add(row)
+        with self._lock:
+            # Calls the build missed (committed late or logged meanwhile) are folded in by a later catch-up
+            profile.forget_ids_through(self._last_id - self.lookback_ids)
+            self._profiles[mc_number] = profile
+            self._profiles.move_to_end(mc_number)
+            self.builds += 1
+            while len(self._profiles) > self.max_entries:
+                self._profiles.popitem(last=False)
+                self.evictions += 1
+        return profile
+
+    def notify_new_call(self) -> None:
+        """A call was logged; fold it in before the next read"""
+        self._stale = True
+
+    def _ensure_current(self, db: Session) -> None:
+        if self._last_id is None:
+            # Profiles built from here on include everything logged so far
+            self._last_id = db.query(func.coalesce(func.max(CallLog.id), 0)).scalar()
+            self._refreshed_at = time.monotonic()
+        elif self._stale or time.monotonic() - self._refreshed_at >= self.refresh_seconds:
+            self.catch_up(db)
+
+    def catch_up(self, db: Session) -> int:
+        """Fold calls logged since the lookback below the last one seen into loaded profiles; returns how many were new"""
+        with self._lock:
+            floor = self._last_id - self.lookback_ids
+            self._refreshed_at = time.monotonic()
+            self._stale = False
+        rows = db.connection().execute(self._query().where(CallLog.id > floor).order_by(CallLog.id)).all()
+        with self._lock:
+            # Profiles only remember ids above the current floor, which a concurrent catch-up may have raised
+            floor = max(floor, self._last_id - self.lookback_ids)
+            folded = set()
+            for row in rows:
+                profile = self._profiles.get(row[0])
+                # A profile built after this call was logged, or a catch-up before this one, already has it
+                if profile is not None and row[-1] > floor and row[-1] not in profile.recent_ids:
+                    profile.add(row)
+                    folded.add(row[0])
+            if rows:
+                self._last_id = max(self._last_id, rows[-1][-1])
+            floor = self._last_id - self.lookback_ids
+            for mc_number in folded:
+                self._profiles[mc_number].forget_ids_through(floor)
+            if folded:
+                self.catch_ups += 1
+            return len(folded)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.builds
+        return {
+            "profiles": len(self._profiles),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "builds": self.builds,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "catch_ups": self.catch_ups,
+            "evictions": self.evictions,
+            "last_call_id": self._last_id,
+        }
+
+
+# Singleton instance
+carrier_profiles = CarrierProfileStore(
+    max_entries=settings.CARRIER_PROFILE_MAX_ENTRIES,
+    lookback_days=settings.CARRIER_PROFILE_LOOKBACK_DAYS,
+    refresh_seconds=settings.CARRIER_PROFILE_REFRESH_SECONDS,
+    rebuild_seconds=settings.CARRIER_PROFILE_REBUILD_SECONDS,
+    lookback_ids=settings.CARRIER_PROFILE_LOOKBACK_IDS,
+)
@@ -0,0 +1,190 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func
+
+from app.config import settings
+from app.core.fmcsa_service import FMCSAService, fmcsa_service
+from app.database import ReadSessionLocal
+from app.models.call_log import CallLog
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Rate budget that refills continuously up to a per-minute capacity"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.tokens = per_minute
+        self._updated = time.monotonic()
+
+    def try_acquire(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class CarrierRefreshScheduler:
+    """
+    Re-verify frequently seen carriers before their cached verification expires
+
+    Every interval, ranks MC numbers by call volume over a lookback window and
+    re-verifies the top N whose cache entry is missing or inside the
+    refresh-ahead window, spending at most the configured upstream budget.
+    """
+
+    def __init__(
+        self,
+        service: FMCSAService,
+        interval_seconds: float,
+        top_n: int,
+        lookback_days: int,
+        refresh_ahead_seconds: float,
+        budget_per_minute: float,
+    ):
+        self.service = service
+        self.interval_seconds = interval_seconds
+        self.top_n = top_n
+        self.lookback_days = lookback_days
+        self.refresh_ahead_seconds = refresh_ahead_seconds
+        self.budget = TokenBucket(budget_per_minute)
+        self._task: Optional[asyncio.Task] = None
+        self.metrics: Dict[str, Any] = {
+            "runs": 0,
+            "last_run_at": None,
+            "last_run_duration_ms": None,
+            "tracked_carriers": 0,
+            "refreshed_total": 0,
+            "refresh_failures_total": 0,
+            "deferred_by_budget_total": 0,
+            "budget_used_last_run": 0,
+            # How long past the start of its refresh window an entry was refreshed
+            "avg_refresh_lag_seconds": None,
+            "max_refresh_lag_seconds": None,
+            # Top carriers whose entry had already expired, i.e. a caller could have missed the cache
+            "expired_before_refresh_total": 0,
+        }
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Carrier refresh scheduler started (top {self.top_n}, every {self.interval_seconds}s)")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Carrier refresh run failed: {str(e)}")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def run_once(self) -> int:
+        """Refresh due carriers once, returning how many were re-verified"""
+        started = time.perf_counter()
+        carriers = await asyncio.to_thread(self._top_carriers)
+        now = time.time()
+
+        due = []
+        for mc_number in carriers:
+            entry = await self.service.cache_op(self.service.cache.peek, mc_number)
+            if entry is None:
+                # Carriers answered by the census snapshot never reach the cache
+                if self.service.census_mode == "first" and self.service.census_lookup(mc_number):
+                    continue
+                due.append((mc_number, None))
+            elif entry.expires_at - now <= self.refresh_ahead_seconds:
+                due.append((mc_number, entry.expires_at))
+        # Soonest expiry first; carriers never verified go last
+        due.sort(key=lambda item: item[1] if item[1] is not None else float("inf"))
+
+        refreshed, budget_used, lags = 0, 0, []
+        for mc_number, expires_at in due:
+            if not self.budget.try_acquire():
+                self.metrics["deferred_by_budget_total"] += len(due) - budget_used
+                break
+            budget_used += 1
+            result = await self.service.verify_carrier(mc_number, force_refresh=True)
+            if result.status == "FAIL":
+                self.metrics["refresh_failures_total"] += 1
+                continue
+            refreshed += 1
+            if expires_at is not None:
+                lags.append(max(0.0, time.time() - (expires_at - self.refresh_ahead_seconds)))
+                if expires_at <= time.time():
+                    self.metrics["expired_before_refresh_total"] += 1
+
+        self.metrics.update({
+            "runs": self.metrics["runs"] + 1,
+            "last_run_at": datetime.utcnow().isoformat(),
+            "last_run_duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "tracked_carriers": len(carriers),
+            "refreshed_total": self.metrics["refreshed_total"] + refreshed,
+            "budget_used_last_run": budget_used,
+            "avg_refresh_lag_seconds": round(sum(lags) / len(lags), 1) if lags else None,
+            "max_refresh_lag_seconds": round(max(lags), 1) if lags else None,
+        })
+        return refreshed
+
+    def _top_carriers(self) -> List[str]:
+        """Most frequent MC numbers in recent call logs, normalized like the cache keys"""
+        since = datetime.utcnow() - timedelta(days=self.lookback_days)
+        db = ReadSessionLocal()
+        try:
+            rows = (
+                db.query(CallLog.mc_number, func.count(CallLog.id).label("calls"))
+                .filter(CallLog.called_at >= since, CallLog.mc_number.isnot(None), CallLog.mc_number != "")
+                .group_by(CallLog.mc_number)
+                .order_by(func.count(CallLog.id).desc())
+                .limit(self.top_n)
+                .all()
+            )
+        finally:
+            db.close()
+
+        carriers = []
+        for row in rows:
+            mc_number = self.service.clean_mc_number(row.mc_number)
+            if mc_number and mc_number not in carriers:
+                carriers.append(mc_number)
+        return carriers
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "top_n": self.top_n,
+            "refresh_ahead_seconds": self.refresh_ahead_seconds,
+            "budget_per_minute": self.budget.capacity,
+            "budget_available": round(self.budget.tokens, 1),
+            **self.metrics,
+        }
+
+
+# Singleton instance
+carrier_refresh_scheduler = CarrierRefreshScheduler(
+    service=fmcsa_service,
+    interval_seconds=settings.CARRIER_REFRESH_INTERVAL_SECONDS,
+    top_n=settings.CARRIER_REFRESH_TOP_N,
+    lookback_days=settings.CARRIER_REFRESH_LOOKBACK_DAYS,
+    refresh_ahead_seconds=settings.CARRIER_REFRESH_AHEAD_SECONDS,
+    budget_per_minute=settings.CARRIER_REFRESH_BUDGET_PER_MINUTE,
+)
@@ -0,0 +1,285 @@
+import argparse
+import bisect
+import csv
+import io
+import logging
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# File layout (little-endian):
+#   header
+#   mc keys      uint32[mc_count]   sorted
+#   mc offsets   uint32[mc_count]   record offset for each mc key
+#   dot keys     uint32[dot_count]  sorted
+#   dot offsets  uint32[dot_count]
+#   records      RECORD + name bytes, one per carrier (blank codes are spaces)
+MAGIC = b"FMCSACX1"
+VERSION = 1
+HEADER = struct.Struct("<8sIIIddQQQQQ")
+RECORD = struct.Struct("<II3sH")  # mc, dot, status/allowed/safety codes, name length
+MAX_KEY = 2 ** 32 - 1
+
+# Candidate CSV headers for each field, in order of preference
+COLUMN_CANDIDATES = {
+    "mc": ["MC_NUMBER", "MC_MX_FF_NUMBER", "DOCKET_NUMBER", "DOCKET1", "mcNumber"],
+    "dot": ["DOT_NUMBER", "USDOT_NUMBER", "dotNumber"],
+    "name": ["LEGAL_NAME", "legalName", "NAME"],
+    "status": ["STATUS_CODE", "statusCode", "ACT_STAT", "STATUS"],
+    "allowed": ["ALLOWED_TO_OPERATE", "allowedToOperate"],
+    "safety": ["SAFETY_RATING", "safetyRating"],
+}
+
+
+class CensusRecord(NamedTuple):
+    mc_number: Optional[str]
+    dot_number: Optional[str]
+    legal_name: str
+    status_code: str
+    allowed_to_operate: str
+    safety_rating: str
+
+
+class CensusIndex:
+    """
+    Read-only, memory-mapped FMCSA census snapshot
+
+    Keys are binary searched in place, so lookups touch a handful of pages
+    and resident memory stays proportional to what is actually queried.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, mc_count, dot_count, snapshot_ts, imported_ts,
+         mc_keys, mc_offsets, dot_keys, dot_offsets, records) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"{path} is not a census index (version {VERSION})")
+        if sys.byteorder != "little":
+            self._mm.close()
+            raise ValueError("Census index requires a little-endian host")
+
+        view = memoryview(self._mm)
+        self._mc_keys = view[mc_keys:mc_keys + 4 * mc_count].cast("I")
+        self._mc_offsets = view[mc_offsets:mc_offsets + 4 * mc_count].cast("I")
+        self._dot_keys = view[dot_keys:dot_keys + 4 * dot_count].cast("I")
+        self._dot_offsets = view[dot_offsets:dot_offsets + 4 * dot_count].cast("I")
+        self._records = records
+        self.mc_count = mc_count
+        self.dot_count = dot_count
+        self.snapshot_ts = snapshot_ts
+        self.imported_ts = imported_ts
+        self.mtime = os.stat(path).st_mtime
+
+    @property
+    def snapshot_age_seconds(self) -> float:
+        return max(0.0, time.time() - self.snapshot_ts)
+
+    def lookup_mc(self, mc_number: str) -> Optional[CensusRecord]:
+        return self._lookup(self._mc_keys, self._mc_offsets, mc_number)
+
+    def lookup_dot(self, dot_number: str) -> Optional[CensusRecord]:
+        return self._lookup(self._dot_keys, self._dot_offsets, dot_number)
+
+    def _lookup(self, keys, offsets, number: str) -> Optional[CensusRecord]:
+        key = parse_key(number)
+        if key is None:
+            return None
+        i = bisect.bisect_left(keys, key)
+        if i == len(keys) or keys[i] != key:
+            return None
+        return self._read_record(self._records + offsets[i])
+
+    def _read_record(self, position: int) -> CensusRecord:
+        mc, dot, codes, name_length = RECORD.unpack_from(self._mm, position)
+        start = position + RECORD.size
+        codes = codes.decode("ascii")
+        return CensusRecord(
+            mc_number=str(mc) if mc else None,
+            dot_number=str(dot) if dot else None,
+            legal_name=self._mm[start:start + name_length].decode("utf-8", errors="ignore"),
+            status_code=codes[0].strip(),
+            allowed_to_operate=codes[1].strip(),
+            safety_rating=codes[2].strip(),
+        )
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "path": self.path,
+            "mc_keys": self.mc_count,
+            "dot_keys": self.dot_count,
+            "size_bytes": len(self._mm),
+            "snapshot_at": datetime.utcfromtimestamp(self.snapshot_ts).isoformat(),
+            "snapshot_age_seconds": round(self.snapshot_age_seconds),
+        }
+
+    def close(self) -> None:
+        for view in (self._mc_keys, self._mc_offsets, self._dot_keys, self._dot_offsets):
+            view.release()
+        self._mm.close()
+
+
+def parse_key(number: Optional[str]) -> Optional[int]:
+    """Numeric key for an MC/DOT number ("MC-012345" -> 12345), or None"""
+    if not number:
+        return None
+    digits = "".join(ch for ch in str(number) if ch.isdigit())
+    if not digits:
+        return None
+    key = int(digits)
+    return key if 0 < key <= MAX_KEY else None
+
+
+def _code(value: Optional[str]) -> str:
+    """Single-letter status code, as FMCSA abbreviates them (SUSPENDED -> S)"""
+    value = (value or "").strip().upper()
+    return value[:1] if value.isascii() else ""
+
+
+def resolve_columns(fieldnames: List[str], overrides: Dict[str, Optional[str]]) -> Dict[str, Optional[str]]:
+    columns = {}
+    for field, candidates in COLUMN_CANDIDATES.items():
+        if overrides.get(field):
+            if overrides[field] not in fieldnames:
+                raise ValueError(f"Column {overrides[field]!r} not found in census file")
+            columns[field] = overrides[field]
+        else:
+            columns[field] = next((c for c in candidates if c in fieldnames), None)
+    if not columns["mc"] and not columns["dot"]:
+        raise ValueError("Census file has neither an MC nor a DOT number column")
+    return columns
+
+
+def build_index(
+    csv_path: str,
+    output_path: str,
+    snapshot_at: Optional[datetime] = None,
+    columns: Optional[Dict[str, Optional[str]]] = None,
+) -> Dict[str, int]:
+    """
+    Import a census CSV into a sorted, memory-mappable index file
+
+    The file is written next to the output path and renamed into place, so a
+    running service never maps a half-written index. Census dumps without an
+    allowed-to-operate column get it derived from the status code (active
+    carriers are allowed), which keeps the verification rules applicable.
+
+    Args:
+        csv_path: Census snapshot CSV
+        output_path: Index file to create or replace
+        snapshot_at: When the snapshot was taken (defaults to the CSV mtime)
+        columns: Optional CSV header overrides for mc, dot, name, status, allowed, safety
+
+    Returns:
+        Counts of imported rows and indexed keys
+    """
+    snapshot_ts = snapshot_at.timestamp() if snapshot_at else os.stat(csv_path).st_mtime
+    records = io.BytesIO()
+    mc_entries: Dict[int, int] = {}
+    dot_entries: Dict[int, int] = {}
+    rows = skipped = 0
+
+    with open(csv_path, newline="", encoding="utf-8", errors="replace") as f:
+        reader = csv.DictReader(f)
+        cols = resolve_columns(reader.fieldnames or [], columns or {})
+        for row in reader:
+            rows += 1
+            mc = parse_key(row.get(cols["mc"])) if cols["mc"] else None
+            dot = parse_key(row.get(cols["dot"])) if cols["dot"] else None
+            if mc is None and dot is None:
+                skipped += 1
+                continue
+
+            status = _code(row.get(cols["status"])) if cols["status"] else ""
+            if cols["allowed"]:
+                allowed = _code(row.get(cols["allowed"]))
+            else:
+                allowed = "Y" if status == "A" else "N"
+            safety = _code(row.get(cols["safety"])) if cols["safety"] else ""
+            name = (row.get(cols["name"]) or "UNKNOWN").strip().encode("utf-8")[:65535] if cols["name"] else b"UNKNOWN"
+            codes = (status or " ") + (allowed or " ") + (safety or " ")
+
+            offset = records.tell()
+            records.write(RECORD.pack(mc or 0, dot or 0, codes.encode("ascii"), len(name)))
+            records.write(name)
+            # Later rows win, so a snapshot with repeated carriers keeps the newest line
+            if mc is not None:
+                mc_entries[mc] = offset
+            if dot is not None:
+                dot_entries[dot] = offset
+
+    if records.tell() > MAX_KEY:
+        raise ValueError("Census records exceed the 4 GiB index limit")
+
+    mc_keys = array("I", sorted(mc_entries))
+    mc_offsets = array("I", (mc_entries[k] for k in mc_keys))
+    dot_keys = array("I", sorted(dot_entries))
+    dot_offsets = array("I", (dot_entries[k] for k in dot_keys))
+    if sys.byteorder != "little":
+        for values in (mc_keys, mc_offsets, dot_keys, dot_offsets):
+            values.byteswap()
+
+    position = HEADER.size
+    layout = []
+    for values in (mc_keys, mc_offsets, dot_keys, dot_offsets):
+        layout.append(position)
+        position += len(values) * 4
+
+    tmp_path = f"{output_path}.tmp"
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(tmp_path, "wb") as out:
+        out.write(HEADER.pack(MAGIC, VERSION, len(mc_keys), len(dot_keys), snapshot_ts, time.time(), *layout, position))
+        for values in (mc_keys, mc_offsets, dot_keys, dot_offsets):
+            values.tofile(out)
+        out.write(records.getbuffer())
+        out.flush()
+        os.fsync(out.fileno())
+    os.replace(tmp_path, output_path)
+
+    logger.info(f"Imported census snapshot {csv_path}: {len(mc_keys)} MC and {len(dot_keys)} DOT keys")
+    return {"rows": rows, "skipped": skipped, "mc_keys": len(mc_keys), "dot_keys": len(dot_keys)}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from app.config import settings
+
+    parser = argparse.ArgumentParser(description="Import and query the offline FMCSA census index")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    import_parser = subparsers.add_parser("import", help="Build the index from a census CSV snapshot")
+    import_parser.add_argument("csv_path")
+    import_parser.add_argument("--output", default=settings.FMCSA_CENSUS_INDEX_PATH)
+    import_parser.add_argument("--snapshot-date", type=datetime.fromisoformat,
+                               help="When the snapshot was taken (ISO date, defaults to the file mtime)")
+    for field in COLUMN_CANDIDATES:
+        import_parser.add_argument(f"--{field}-column", dest=f"{field}_column", help=f"CSV header for the {field} field")
+    lookup_parser = subparsers.add_parser("lookup", help="Look up a carrier in the index")
+    lookup_parser.add_argument("number")
+    lookup_parser.add_argument("--dot", action="store_true", help="Treat the number as a DOT number")
+    lookup_parser.add_argument("--index", default=settings.FMCSA_CENSUS_INDEX_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == "import":
+        overrides = {field: getattr(args, f"{field}_column") for field in COLUMN_CANDIDATES}
+        counts = build_index(args.csv_path, args.output, args.snapshot_date, overrides)
+        print(f"Imported {counts['rows']} rows ({counts['skipped']} without MC/DOT) into {args.output}: "
+              f"{counts['mc_keys']} MC keys, {counts['dot_keys']} DOT keys")
+    elif args.command == "lookup":
+        index = CensusIndex(args.index)
+        try:
+            record = index.lookup_dot(args.number) if args.dot else index.lookup_mc(args.number)
+            print(record._asdict() if record else "Not found")
+        finally:
+            index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+import zlib
+from typing import Dict, Iterable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # Optional dependency, gzip is always available
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+# Responses compressed or left alone for being under the threshold, and bytes before/after compression
+compression_stats: Dict[str, int] = {
+    "compressed": 0,
+    "skipped_small": 0,
+    "bytes_in": 0,
+    "bytes_out": 0,
+}
+
+
+def negotiate_encoding(accept_encoding: str, available: Iterable[str]) -> Optional[str]:
+    """
+    Pick the best available content coding from an Accept-Encoding header
+
+    Honours q-values (q=0 refuses a coding) and ``*``; on equal weight the
+    first available coding wins, so brotli is preferred over gzip.
+    """
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding.strip()] = q
+
+    best, best_q = None, 0.0
+    for coding in available:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+            self._zlib = None
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._brotli.process(data) if self._brotli else self._zlib.compress(data)
+
+    def finish(self) -> bytes:
+        return self._brotli.finish() if self._brotli else self._zlib.flush()
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with brotli or gzip, negotiated via Accept-Encoding
+
+    Bodies are buffered only until ``minimum_size`` bytes are seen: smaller
+    responses go out untouched, larger ones are compressed, and streaming
+    responses are compressed chunk by chunk without being buffered whole.
+    Excluded paths (latency-sensitive agent endpoints), server-sent events,
+    already-encoded and non-text responses are passed through.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        excluded_paths: Iterable[str] = (),
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.excluded_paths = tuple(path.rstrip("/") for path in excluded_paths)
+        self.encodings = ("br", "gzip") if brotli is not None else ("gzip",)
+
+    def is_excluded(self, path: str) -> bool:
+        path = path.rstrip("/")
+        return any(path == excluded or path.startswith(excluded + "/") for excluded in self.excluded_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.is_excluded(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """Per-request state: buffer, decide, then compress or pass through"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start_message: Optional[Message] = None
+        self.buffer = bytearray()
+        self.mode = "pending"  # pending -> passthrough | compress
+        self.compressor: Optional[_Compressor] = None
+        self.started = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            if not self._eligible(Headers(raw=message["headers"])):
+                self.mode = "passthrough"
+                await self._send(message)
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        if self.mode == "passthrough":
+            await self._send(message)
+        elif self.mode == "compress":
+            await self._send_compressed(message.get("body", b""), message.get("more_body", False))
+        else:
+            self.buffer += message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if len(self.buffer) >= self.middleware.minimum_size:
+                await self._start_compressing(streaming=more_body)
+                await self._send_compressed(bytes(self.buffer), more_body)
+                self.buffer = bytearray()
+            elif not more_body:
+                # Whole body is under the threshold: send it as it was
+                compression_stats["skipped_small"] += 1
+                await self._send(self.start_message)
+                await self._send({"type": "http.response.body", "body": bytes(self.buffer), "more_body": False})
+
+    def _eligible(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").lower()
+        if content_type.startswith("text/event-stream"):
+            return False
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    async def _start_compressing(self, streaming: bool) -> None:
+        self.mode = "compress"
+        self.compressor = _Compressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+        headers = MutableHeaders(scope=self.start_message)
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        del headers["Content-Length"]
+        if streaming:
+            await self._send(self.start_message)
+            self.started = True
+
+    async def _send_compressed(self, body: bytes, more_body: bool) -> None:
+        data = self.compressor.compress(body)
+        if not more_body:
+            data += self.compressor.finish()
+            compression_stats["compressed"] += 1
+        compression_stats["bytes_in"] += len(body)
+        compression_stats["bytes_out"] += len(data)
+
+        if not self.started:
+            # Single-message body, so the compressed length is known up front
+            MutableHeaders(scope=self.start_message)["Content-Length"] = str(len(data))
+            await self._send(self.start_message)
+            self.started = True
+        if data or not more_body:
+            await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
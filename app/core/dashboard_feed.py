@@ -0,0 +1,230 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.broadcast import Broadcaster
+from app.database import SessionLocal
+from app.models.call_log import CallLog
+
+logger = logging.getLogger(__name__)
+
+
+def is_booked(outcome: Optional[str]) -> bool:
+    """Mirror of the dashboard's ``ilike('%book%')`` booking test"""
+    return bool(outcome) and "book" in outcome.lower()
+
+
+class DashboardFeed:
+    """
+    Running dashboard counters plus a live feed of newly logged calls
+
+    Counters are loaded from the database once and then updated in place as
+    calls are logged, so neither page loads nor live viewers rescan
+    ``call_logs``. While anyone is streaming, a watcher polls ``call_logs``
+    by id and publishes calls logged by other worker processes too; calls
+    logged by this process are published as soon as they commit. Ids are
+    handed out before commit, so a call can become visible after a higher
+    id; each poll rescans the last ``lookback_ids`` ids below the newest one
+    seen and skips ids already published. The watcher stops once the last
+    viewer leaves. Counters are also resynchronized periodically.
+    """
+
+    def __init__(self, buffer_size: int, resync_seconds: float, poll_interval: float, lookback_ids: int):
+        self.broadcaster = Broadcaster(buffer_size=buffer_size)
+        self.resync_seconds = resync_seconds
+        self.poll_interval = poll_interval
+        self.lookback_ids = lookback_ids
+        self._lock = threading.Lock()
+        self._counters: Optional[Dict[str, float]] = None
+        # Highest call log id included in the loaded counters
+        self._counted_through = 0
+        self._loaded_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._start_lock = asyncio.Lock()
+        self._render_row: Optional[Callable[[CallLog], str]] = None
+        # Highest call log id the watcher has seen, and ids published within the lookback
+        self._watermark: Optional[int] = None
+        self._published: Set[int] = set()
+
+    async def ensure_started(self, render_row: Callable[[CallLog], str]) -> None:
+        """Start the watcher on first use, rendering rows with ``render_row``"""
+        async with self._start_lock:
+            if self._task is None or self._task.done():
+                self._render_row = render_row
+                await asyncio.to_thread(self._prime)
+                self._task = asyncio.create_task(self._run())
+                logger.info(f"Dashboard call watcher started (polling every {self.poll_interval}s)")
+
+    async def stop(self) -> None:
+        """Stop the watcher"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._reset()
+
+    def summary(self, db: Session) -> Dict[str, Any]:
+        """Current summary statistics, loading them from the database if stale"""
+        with self._lock:
+            stale = self._counters is None or time.monotonic() - self._loaded_at > self.resync_seconds
+        if stale:
+            self._load(db)
+        with self._lock:
+            return self._summarize()
+
+    def record(self, call_log: CallLog, row_html: str) -> None:
+        """
+        Push a call log committed by this process to live viewers
+
+        The row is always published. Its summary is left out while the
+        counters have not been loaded yet; the next page view loads them.
+        """
+        with self._lock:
+            if self._watermark is not None:
+                if call_log.id in self._published:
+                    # The watcher got to it between the commit and now, and published it
+                    return
+                self._published.add(call_log.id)
+            summary = self._apply(call_log)
+        self._publish(call_log, row_html, summary)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.sleep(self.poll_interval)
+                if not self.broadcaster.subscriber_count:
+                    self._reset()
+                    logger.info("Dashboard call watcher stopped (no viewers)")
+                    return
+                for call_log, row_html, summary in await asyncio.to_thread(self._poll):
+                    self._publish(call_log, row_html, summary)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Dashboard call watcher error: {str(e)}")
+
+    def _prime(self) -> None:
+        """Start watching from the newest call already logged, treating the lookback as published"""
+        db = SessionLocal()
+        try:
+            watermark = db.query(func.coalesce(func.max(CallLog.id), 0)).scalar()
+            seen = {row[0] for row in db.query(CallLog.id).filter(CallLog.id > watermark - self.lookback_ids)}
+        finally:
+            db.close()
+        with self._lock:
+            self._watermark = watermark
+            self._published = {call_log_id for call_log_id in self._published if call_log_id > watermark} | seen
+
+    def _reset(self) -> None:
+        with self._lock:
+            self._watermark = None
+            self._published.clear()
+
+    def _poll(self) -> List[tuple]:
+        """Collect calls within the lookback or past the watermark that were not published yet"""
+        with self._lock:
+            if self._watermark is None:
+                return []
+            floor = self._watermark - self.lookback_ids
+        db = SessionLocal()
+        try:
+            call_log_ids = [row[0] for row in db.query(CallLog.id).filter(CallLog.id > floor).order_by(CallLog.id)]
+            with self._lock:
+                unseen = [call_log_id for call_log_id in call_log_ids if call_log_id not in self._published]
+            call_logs = []
+            if unseen:
+                call_logs = db.query(CallLog).filter(CallLog.id.in_(unseen)).order_by(CallLog.id).all()
+            new = []
+            with self._lock:
+                if self._watermark is None:
+                    return []
+                for call_log in call_logs:
+                    if call_log.id in self._published:
+                        # Logged by this process and published since the id scan
+                        continue
+                    self._published.add(call_log.id)
+                    new.append((call_log, self._render_row(call_log), self._apply(call_log)))
+                if call_log_ids:
+                    self._watermark = max(self._watermark, call_log_ids[-1])
+                floor = self._watermark - self.lookback_ids
+                self._published = {call_log_id for call_log_id in self._published if call_log_id > floor}
+            return new
+        finally:
+            db.close()
+
+    def _apply(self, call_log: CallLog) -> Optional[Dict[str, Any]]:
+        """Add a call to the counters (lock held), returning the new summary or None if not loaded"""
+        if self._counters is None:
+            return None
+        if call_log.id > self._counted_through:
+            self._counters["total_calls"] += 1
+            if is_booked(call_log.call_outcome_classification):
+                self._counters["booked_calls"] += 1
+            if call_log.negotiation_rounds is not None:
+                self._counters["rounds_sum"] += call_log.negotiation_rounds
+                self._counters["rounds_count"] += 1
+        return self._summarize()
+
+    def _publish(self, call_log: CallLog, row_html: str, summary: Optional[Dict[str, Any]]) -> None:
+        self.broadcaster.publish({
+            "type": "call",
+            "call_log_id": call_log.id,
+            "row_html": row_html,
+            "summary": summary,
+        })
+
+    def _load(self, db: Session) -> None:
+        counted_through, total_calls, booked_calls, rounds_sum, rounds_count = db.query(
+            func.coalesce(func.max(CallLog.id), 0),
+            func.count(CallLog.id),
+            func.coalesce(func.sum(case((CallLog.call_outcome_classification.ilike('%book%'), 1), else_=0)), 0),
+            func.coalesce(func.sum(CallLog.negotiation_rounds), 0),
+            func.count(CallLog.negotiation_rounds),
+        ).one()
+        with self._lock:
+            self._counters = {
+                "total_calls": total_calls,
+                "booked_calls": booked_calls,
+                "rounds_sum": rounds_sum,
+                "rounds_count": rounds_count,
+            }
+            self._counted_through = counted_through
+            self._loaded_at = time.monotonic()
+
+    def _summarize(self) -> Dict[str, Any]:
+        counters = self._counters
+        total_calls = int(counters["total_calls"])
+        booked_calls = int(counters["booked_calls"])
+        avg_rounds = counters["rounds_sum"] / counters["rounds_count"] if counters["rounds_count"] else 0.0
+        return {
+            "total_calls": total_calls,
+            "booked_calls": booked_calls,
+            "booking_rate": round((booked_calls / total_calls * 100) if total_calls > 0 else 0.0, 1),
+            "avg_negotiation_rounds": round(avg_rounds, 1),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "mode": "polling",
+            "watermark": self._watermark,
+            **self.broadcaster.stats(),
+        }
+
+
+# Singleton instance
+dashboard_feed = DashboardFeed(
+    buffer_size=settings.DASHBOARD_STREAM_BUFFER_SIZE,
+    resync_seconds=settings.DASHBOARD_SUMMARY_RESYNC_SECONDS,
+    poll_interval=settings.DASHBOARD_STREAM_POLL_INTERVAL_SECONDS,
+    lookback_ids=settings.DASHBOARD_STREAM_LOOKBACK_IDS,
+)
@@ -1,11 +1,56 @@
+import asyncio
 import httpx
 import logging
-from typing import Optional, Dict, Any
+import os
+import time
+from typing import Any, Callable, Dict, Optional, TypeVar
 from app.schemas.carrier import CarrierVerificationResponse
 from app.config import settings
+from app.core.census_index import CensusIndex
+from app.core.verification_cache import create_verification_cache
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+
+def carrier_status(status_code: Optional[str], allowed_to_operate: Optional[str], safety_rating: Optional[str]) -> str:
+    """
+    Map FMCSA status indicators to a verification status
+    
+    Shared by the live API and the offline census index so both sources
+    reach the same verdict for the same carrier record.
+    
+    Args:
+        status_code: Carrier status code (A, S, I, ...)
+        allowed_to_operate: Y/N operating authority flag
+        safety_rating: Safety rating (S, C, U, ...)
+        
+    Returns:
+        ACTIVE, SUSPENDED, INACTIVE or FAIL
+    """
+    status_code = (status_code or '').upper()
+    allowed_to_operate = (allowed_to_operate or '').upper()
+    safety_rating = (safety_rating or '').upper()
+    
+    # Check various status indicators
+    if status_code == 'A' and allowed_to_operate == 'Y':
+        # Active carrier, check safety rating
+        if safety_rating in ['S', 'SATISFACTORY', '', 'NONE']:  # S = Satisfactory
+            return "ACTIVE"
+        elif safety_rating in ['U', 'UNSATISFACTORY']:
+            return "FAIL"  # Unsatisfactory safety rating
+        else:
+            return "ACTIVE"  # Default to active if safety rating is unclear
+    elif status_code in ['S', 'SUSPENDED']:
+        return "SUSPENDED"
+    elif status_code in ['I', 'INACTIVE']:
+        return "INACTIVE"
+    elif allowed_to_operate == 'N':
+        return "SUSPENDED"
+    else:
+        return "FAIL"  # Unknown or problematic status
+
 
 class FMCSAService:
     """Service to interact with FMCSA API for carrier verification"""
@@ -13,61 +58,251 @@ class FMCSAService:
     def __init__(self):
         self.base_url = "https://mobile.fmcsa.dot.gov/qc/services/carriers"
         self.timeout = 30.0
+        self.cache = create_verification_cache(
+            settings.VERIFICATION_CACHE_BACKEND,
+            ttl_seconds=settings.VERIFICATION_CACHE_TTL_SECONDS,
+            max_entries=settings.VERIFICATION_CACHE_MAX_ENTRIES,
+            path=settings.VERIFICATION_CACHE_PATH,
+        )
+        self.upstream_calls = 0
+        self.census_mode = settings.FMCSA_CENSUS_MODE
+        self.census_path = settings.FMCSA_CENSUS_INDEX_PATH
+        self.census_hits = 0
+        self._census: Optional[CensusIndex] = None
+        self._census_checked_at: Optional[float] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
     
-    async def verify_carrier(self, mc_number: str) -> CarrierVerificationResponse:
+    @property
+    def client(self) -> httpx.AsyncClient:
         """
-        Verify carrier eligibility using FMCSA API
+        Shared HTTP client, so FMCSA calls reuse pooled keep-alive connections
+        
+        Created on first use and again if the event loop changed, since pooled
+        connections belong to the loop that opened them.
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            self._client = self._new_client()
+            self._client_loop = loop
+        return self._client
+    
+    def _new_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            timeout=self.timeout,
+            headers={
+                "User-Agent": "HappyRobot-CarrierVerification/1.0",
+                "Accept": "application/json",
+            },
+        )
+    
+    async def prewarm(self, timeout: float = 5.0) -> bool:
+        """
+        Open a connection to FMCSA ahead of the first verification
+        
+        Returns:
+            True if the host answered, False if it could not be reached
+        """
+        try:
+            await self.ping(timeout)
+            return True
+        except httpx.HTTPError as e:
+            logger.warning(f"FMCSA connection prewarm failed: {e!r}")
+            return False
+    
+    async def ping(self, timeout: float) -> None:
+        """
+        Send a HEAD request to the FMCSA host
+        
+        Any HTTP response counts as reachable.
+        
+        Raises:
+            httpx.HTTPError: If the host could not be reached in time
+        """
+        if self._client is None:
+            # Building the client loads the TLS trust store; keep that off the event loop
+            client = await asyncio.to_thread(self._new_client)
+            if self._client is None:
+                self._client = client
+                self._client_loop = asyncio.get_running_loop()
+            else:
+                await client.aclose()
+        await self.client.head(self.base_url, timeout=timeout)
+    
+    async def aclose(self) -> None:
+        """Close the shared HTTP client"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    @staticmethod
+    def clean_mc_number(mc_number: str) -> str:
+        """Normalize an MC number (remove 'MC' prefix if present)"""
+        return mc_number.upper().replace('MC', '').strip()
+    
+    async def cache_op(self, method: Callable[..., T], *args: Any) -> T:
+        """
+        Call a verification cache method without blocking the event loop
+        
+        Backends doing file I/O (the shared sqlite cache) run in a worker
+        thread; the in-memory cache is called directly.
+        
+        Args:
+            method: Bound method of ``self.cache``, e.g. ``self.cache.get``
+            *args: Arguments for the method
+            
+        Returns:
+            Whatever the method returns
+        """
+        if self.cache.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+    
+    async def verify_carrier(self, mc_number: str, force_refresh: bool = False) -> CarrierVerificationResponse:
+        """
+        Verify carrier eligibility, answering from the verification cache when possible
         
         Args:
             mc_number: Motor Carrier number to verify
+            force_refresh: Skip the cache and query FMCSA (used by the refresh-ahead scheduler)
             
         Returns:
             CarrierVerificationResponse with verification details
         """
+        clean_mc = self.clean_mc_number(mc_number)
+        
+        if not force_refresh:
+            if self.census_mode == "first":
+                census_result = self.census_lookup(clean_mc)
+                if census_result is not None:
+                    return census_result
+            entry = await self.cache_op(self.cache.get, clean_mc)
+            if entry is not None:
+                return CarrierVerificationResponse(**entry.value)
+        
+        result = await self._fetch_carrier(clean_mc)
+        
+        # Transient failures are not cached so the next call retries upstream
+        if result.status != "FAIL":
+            await self.cache_op(self.cache.set, clean_mc, result.model_dump())
+        elif self.census_mode == "fallback":
+            census_result = self.census_lookup(clean_mc)
+            if census_result is not None:
+                return census_result
+        
+        return result
+    
+    def census_index(self) -> Optional[CensusIndex]:
+        """
+        The offline census index, opened lazily and reopened after a re-import
+        
+        Returns:
+            CensusIndex, or None if census lookups are off or no index exists
+        """
+        if self.census_mode == "off":
+            return None
+        now = time.monotonic()
+        if self._census_checked_at is not None and now - self._census_checked_at < 60:
+            return self._census
+        self._census_checked_at = now
         try:
-            # Clean the MC number (remove 'MC' prefix if present)
-            clean_mc = mc_number.upper().replace('MC', '').strip()
+            mtime = os.stat(self.census_path).st_mtime
+        except OSError:
+            return self._census
+        if self._census is None or self._census.mtime != mtime:
+            try:
+                # The previous index is left to the garbage collector, since
+                # in-flight lookups may still be reading from its mapping
+                self._census = CensusIndex(self.census_path)
+                logger.info(f"Loaded FMCSA census index {self.census_path}")
+            except (OSError, ValueError) as e:
+                logger.error(f"Could not open FMCSA census index {self.census_path}: {str(e)}")
+        return self._census
+    
+    def census_lookup(self, clean_mc: str) -> Optional[CarrierVerificationResponse]:
+        """
+        Verify a carrier from the offline census snapshot
+        
+        Args:
+            clean_mc: Normalized Motor Carrier number
             
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                # FMCSA API endpoint for carrier lookup
-                # Based on the documentation, the API key is required to be passed in the query string
-                url = f"{self.base_url}/{clean_mc}?webKey={settings.FMCSA_API_KEY.strip()}"
-                
-                headers = {
-                    "User-Agent": "HappyRobot-CarrierVerification/1.0",
-                    "Accept": "application/json",
-                }
-                
-                logger.info(f"Calling FMCSA API for MC: {clean_mc}")
-                response = await client.get(url, headers=headers)
+        Returns:
+            CarrierVerificationResponse carrying the snapshot age, or None if not in the snapshot
+        """
+        index = self.census_index()
+        if index is None:
+            return None
+        record = index.lookup_mc(clean_mc)
+        if record is None:
+            return None
+        self.census_hits += 1
+        return CarrierVerificationResponse(
+            carrier_id=record.dot_number or clean_mc,
+            carrier_name=record.legal_name or "UNKNOWN",
+            status=carrier_status(record.status_code, record.allowed_to_operate, record.safety_rating),
+            dot_number=record.dot_number,
+            mc_number=clean_mc,
+            source="census",
+            snapshot_age_seconds=round(index.snapshot_age_seconds)
+        )
+    
+    def census_stats(self) -> Dict[str, Any]:
+        index = self.census_index()
+        return {
+            "mode": self.census_mode,
+            "loaded": index is not None,
+            "hits": self.census_hits,
+            **(index.stats() if index is not None else {"path": self.census_path}),
+        }
+    
+    async def _fetch_carrier(self, clean_mc: str) -> CarrierVerificationResponse:
+        """
+        Verify carrier eligibility using FMCSA API
+        
+        Args:
+            clean_mc: Normalized Motor Carrier number to verify
+            
+        Returns:
+            CarrierVerificationResponse with verification details
+        """
+        self.upstream_calls += 1
+        try:
+            # FMCSA API endpoint for carrier lookup
+            # Based on the documentation, the API key is required to be passed in the query string
+            url = f"{self.base_url}/{clean_mc}?webKey={settings.FMCSA_API_KEY.strip()}"
+            
+            logger.info(f"Calling FMCSA API for MC: {clean_mc}")
+            response = await self.client.get(url)
+            
+            if response.status_code == 200:
+                data = response.json()
+                return self._process_fmcsa_response(data, clean_mc)
+            elif response.status_code == 404:
+                return CarrierVerificationResponse(
+                    carrier_id=clean_mc,
+                    carrier_name="UNKNOWN",
+                    status="UNREGISTERED",
+                    mc_number=clean_mc,
+                    source="fmcsa_api"
+                )
+            else:
+                logger.error(f"FMCSA API error: {response.status_code} - {response.text}")
+                return CarrierVerificationResponse(
+                    carrier_id=clean_mc,
+                    carrier_name="UNKNOWN",
+                    status="FAIL",
+                    mc_number=clean_mc,
+                    source="fmcsa_api"
+                )
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    return self._process_fmcsa_response(data, clean_mc)
-                elif response.status_code == 404:
-                    return CarrierVerificationResponse(
-                        carrier_id=clean_mc,
-                        carrier_name="UNKNOWN",
-                        status="UNREGISTERED",
-                        mc_number=clean_mc
-                    )
-                else:
-                    print("else")
-                    logger.error(f"FMCSA API error: {response.status_code} - {response.text}")
-                    return CarrierVerificationResponse(
-                        carrier_id=clean_mc,
-                        carrier_name="UNKNOWN",
-                        status="FAIL",
-                        mc_number=clean_mc
-                    )
-                    
         except httpx.TimeoutException:
             logger.error(f"FMCSA API timeout for MC: {clean_mc}")
             return CarrierVerificationResponse(
                 carrier_id=clean_mc,
                 carrier_name="UNKNOWN",
                 status="FAIL",
-                mc_number=clean_mc
+                mc_number=clean_mc,
+                source="fmcsa_api"
             )
         except Exception as e:
             logger.error(f"Error verifying carrier {clean_mc}: {str(e)}")
@@ -75,7 +310,8 @@ class FMCSAService:
                 carrier_id=clean_mc,
                 carrier_name="UNKNOWN",
                 status="FAIL",
-                mc_number=clean_mc
+                mc_number=clean_mc,
+                source="fmcsa_api"
             )
     
     def _process_fmcsa_response(self, data: Dict[str, Any], mc_number: str) -> CarrierVerificationResponse:
@@ -97,34 +333,19 @@ class FMCSAService:
             dot_number = str(carrier.get('dotNumber', ''))
             
             # Determine status based on FMCSA data
-            status_code = carrier.get('statusCode', '').upper()
-            allowed_to_operate = carrier.get('allowedToOperate', '').upper()
-            safety_rating = carrier.get('safetyRating', '').upper()
-            
-            # Check various status indicators
-            if status_code == 'A' and allowed_to_operate == 'Y':
-                # Active carrier, check safety rating
-                if safety_rating in ['S', 'SATISFACTORY', '', 'NONE']:  # S = Satisfactory
-                    status = "ACTIVE"
-                elif safety_rating in ['U', 'UNSATISFACTORY']:
-                    status = "FAIL"  # Unsatisfactory safety rating
-                else:
-                    status = "ACTIVE"  # Default to active if safety rating is unclear
-            elif status_code in ['S', 'SUSPENDED']:
-                status = "SUSPENDED"
-            elif status_code in ['I', 'INACTIVE']:
-                status = "INACTIVE"
-            elif allowed_to_operate == 'N':
-                status = "SUSPENDED"
-            else:
-                status = "FAIL"  # Unknown or problematic status
+            status = carrier_status(
+                carrier.get('statusCode', ''),
+                carrier.get('allowedToOperate', ''),
+                carrier.get('safetyRating', ''),
+            )
             
             return CarrierVerificationResponse(
                 carrier_id=dot_number or mc_number,
                 carrier_name=carrier_name,
                 status=status,
                 dot_number=dot_number,
-                mc_number=mc_number
+                mc_number=mc_number,
+                source="fmcsa_api"
             )
             
         except Exception as e:
@@ -133,7 +354,8 @@ class FMCSAService:
                 carrier_id=mc_number,
                 carrier_name="UNKNOWN",
                 status="FAIL",
-                mc_number=mc_number
+                mc_number=mc_number,
+                source="fmcsa_api"
             )
 
 
@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.core.fmcsa_service import FMCSAService, fmcsa_service
+from app.database import engine, replica_engine
+
+logger = logging.getLogger(__name__)
+
+
+def pool_stats(bind: Engine) -> Dict[str, Any]:
+    """Connection pool occupancy, for pools that track it"""
+    pool = bind.pool
+    stats: Dict[str, Any] = {"pool": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if callable(method):
+            stats[name] = method()
+    return stats
+
+
+def _check_database(bind: Engine) -> None:
+    with bind.connect() as conn:
+        conn.execute(text("SELECT 1")).fetchone()
+
+
+class HealthProber:
+    """
+    Check dependencies on an interval and cache the results for probes
+
+    Every ``interval_seconds`` the primary database, the replica (when one
+    is configured) and FMCSA reachability are checked concurrently, each
+    with ``timeout_seconds``. Readiness is answered from the last results,
+    so load balancer probes cost no I/O however often they arrive. The app
+    is ready once the databases answered on the last round and that round
+    is recent; FMCSA only counts when ``require_fmcsa`` is set, since
+    verification falls back to the census snapshot and the cache.
+    """
+
+    def __init__(
+        self,
+        primary: Engine,
+        replica: Engine,
+        fmcsa: FMCSAService,
+        interval_seconds: float,
+        timeout_seconds: float,
+        require_fmcsa: bool = False,
+    ):
+        self.checks: Dict[str, Callable[[], Awaitable[None]]] = {
+            "database": lambda: asyncio.to_thread(_check_database, primary),
+            "fmcsa": self._check_fmcsa,
+        }
+        if replica is not primary:
+            self.checks["replica"] = lambda: asyncio.to_thread(_check_database, replica)
+        self.fmcsa = fmcsa
+        self.interval_seconds = interval_seconds
+        self.timeout_seconds = timeout_seconds
+        self.required = [name for name in self.checks if name != "fmcsa" or require_fmcsa]
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.rounds = 0
+        self._probed_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _check_fmcsa(self) -> None:
+        await self.fmcsa.ping(self.timeout_seconds)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.probe()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Health probe round failed: {str(e)}")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def probe(self) -> Dict[str, Dict[str, Any]]:
+        """Run every check once and store the results"""
+        names = list(self.checks)
+        results = await asyncio.gather(*(self._timed(name) for name in names))
+        previous = self.results
+        self.results = dict(zip(names, results))
+        self._probed_at = time.monotonic()
+        self.rounds += 1
+        for name, result in self.results.items():
+            if result["ok"] != previous.get(name, {}).get("ok", True):
+                log = logger.info if result["ok"] else logger.warning
+                log(f"Health check {name} is {'up' if result['ok'] else 'down'}", extra=result)
+        return self.results
+
+    async def _timed(self, name: str) -> Dict[str, Any]:
+        started = time.perf_counter()
+        error = None
+        try:
+            await asyncio.wait_for(self.checks[name](), timeout=self.timeout_seconds)
+        except (asyncio.TimeoutError, httpx.TimeoutException):
+            error = f"timed out after {self.timeout_seconds}s"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        return {
+            "ok": error is None,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+            "checked_at": datetime.now(timezone.utc).isoformat(),
+            "error": error,
+        }
+
+    @property
+    def probe_age_seconds(self) -> Optional[float]:
+        return round(time.monotonic() - self._probed_at, 2) if self._probed_at is not None else None
+
+    def readiness(self) -> Dict[str, Any]:
+        """
+        Readiness from the cached probe results
+
+        Returns:
+            ready flag, the reason when not ready, age of the last round and per-check results
+        """
+        age = self.probe_age_seconds
+        reason = None
+        if age is None:
+            reason = "no probe has completed yet"
+        elif age > 3 * self.interval_seconds + self.timeout_seconds:
+            reason = f"last probe is {age:.0f}s old"
+        else:
+            failing = [name for name in self.required if not self.results[name]["ok"]]
+            if failing:
+                reason = f"{', '.join(failing)} unavailable"
+        return {
+            "ready": reason is None,
+            "reason": reason,
+            "probe_age_seconds": age,
+            "checks": self.results,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "interval_seconds": self.interval_seconds,
+            "rounds": self.rounds,
+            "probe_age_seconds": self.probe_age_seconds,
+            "required": self.required,
+        }
+
+
+# Singleton instance
+health_prober = HealthProber(
+    primary=engine,
+    replica=replica_engine,
+    fmcsa=fmcsa_service,
+    interval_seconds=settings.HEALTH_PROBE_INTERVAL_SECONDS,
+    timeout_seconds=settings.HEALTH_PROBE_TIMEOUT_SECONDS,
+    require_fmcsa=settings.HEALTH_READY_REQUIRES_FMCSA,
+)
@@ -0,0 +1,347 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.dashboard_feed import is_booked
+from app.models.call_log import CallLog
+from app.models.load import Load, LoadArchive, any_load_column, join_any_load
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+# Lane key: (origin, destination, equipment_type), normalized; "*" matches any
+LaneKey = Tuple[str, str, str]
+
+
+def lane_key(origin: Optional[str], destination: Optional[str], equipment_type: Optional[str]) -> LaneKey:
+    return ((origin or "").strip().lower(), (destination or "").strip().lower(), (equipment_type or "").strip().lower())
+
+
+class LaneSamples:
+    """
+    Column arrays of the calls seen on one lane
+
+    ``rate_per_mile`` is the agreed rate per mile when there is one, else the
+    loadboard rate per mile the carrier was quoted; NaN where miles is unknown.
+    """
+
+    COLUMNS = ("agreed_rate", "initial_offer", "rate_per_mile", "rounds", "booked")
+
+    def __init__(self, columns: Optional[Dict[str, np.ndarray]] = None):
+        self.columns = columns or {name: np.empty(0) for name in self.COLUMNS}
+        self._summary: Optional[Dict[str, Any]] = None
+
+    def __len__(self) -> int:
+        return len(self.columns["booked"])
+
+    def extend(self, columns: Dict[str, np.ndarray]) -> None:
+        self.columns = {name: np.concatenate([self.columns[name], columns[name]]) for name in self.COLUMNS}
+        self._summary = None
+
+    def summary(self, rpm_band: float) -> Dict[str, Any]:
+        """Percentiles and acceptance bands, computed once per change"""
+        if self._summary is None:
+            self._summary = _summarize(self.columns, rpm_band)
+        return self._summary
+
+
+def _percentiles(values: np.ndarray) -> Optional[Dict[str, float]]:
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return None
+    return {f"p{p}": round(float(v), 2) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+
+
+def _summarize(columns: Dict[str, np.ndarray], rpm_band: float) -> Dict[str, Any]:
+    booked = columns["booked"].astype(bool)
+    rounds = columns["rounds"]
+    rpm = columns["rate_per_mile"]
+
+    # Acceptance by rate-per-mile band: calls and bookings per band in one pass each
+    acceptance = []
+    known = ~np.isnan(rpm)
+    if known.any():
+        bands = np.floor(rpm[known] / rpm_band).astype(np.int64)
+        first = bands.min()
+        calls = np.bincount(bands - first)
+        bookings = np.bincount(bands - first, weights=booked[known].astype(float))
+        for offset in np.nonzero(calls)[0]:
+            low = (first + offset) * rpm_band
+            acceptance.append({
+                "min_rate_per_mile": round(float(low), 2),
+                "max_rate_per_mile": round(float(low + rpm_band), 2),
+                "calls": int(calls[offset]),
+                "booked_calls": int(bookings[offset]),
+                "acceptance_rate": round(float(bookings[offset] / calls[offset]) * 100, 1),
+            })
+
+    calls = len(booked)
+    return {
+        "calls": calls,
+        "booked_calls": int(booked.sum()),
+        "booking_rate": round(float(booked.mean()) * 100, 1) if calls else 0.0,
+        "agreed_rate": _percentiles(columns["agreed_rate"]),
+        "initial_offer": _percentiles(columns["initial_offer"]),
+        "agreed_rate_per_mile": _percentiles(np.where(booked, rpm, np.nan)),
+        "avg_negotiation_rounds": round(float(np.nanmean(rounds)), 2) if calls and not np.isnan(rounds).all() else None,
+        "acceptance_by_rate_per_mile": acceptance,
+        "_sorted_agreed": np.sort(columns["agreed_rate"][~np.isnan(columns["agreed_rate"])]),
+    }
+
+
+def _columns_from_rows(rows: List[Tuple]) -> Tuple[List[LaneKey], Dict[str, np.ndarray]]:
+    """Turn (origin, destination, equipment, miles, loadboard_rate, agreed, offer, rounds, outcome, id) rows into arrays"""
+    if not rows:
+        return [], LaneSamples().columns
+    origins, destinations, equipment, miles, loadboard_rate, agreed, offer, rounds, outcomes, _ = zip(*rows)
+    normalized: Dict[Tuple, LaneKey] = {}
+    keys = [
+        normalized.get(key) or normalized.setdefault(key, lane_key(*key))
+        for key in zip(origins, destinations, equipment)
+    ]
+    # None becomes NaN in float arrays
+    miles, loadboard_rate, agreed, offer, rounds = (
+        np.array(column, dtype=float) for column in (miles, loadboard_rate, agreed, offer, rounds)
+    )
+    quoted = np.where(np.isnan(agreed), loadboard_rate, agreed)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rpm = np.where(miles > 0, quoted / miles, np.nan)
+    # Only a handful of distinct outcomes, so classify each once
+    booked_by_outcome: Dict[Optional[str], float] = {}
+    booked = np.array(
+        [booked_by_outcome.setdefault(outcome, float(is_booked(outcome))) for outcome in outcomes],
+        dtype=float,
+    )
+    return keys, {"agreed_rate": agreed, "initial_offer": offer, "rate_per_mile": rpm, "rounds": rounds, "booked": booked}
+
+
+def _group(keys: List[LaneKey], columns: Dict[str, np.ndarray]) -> Dict[LaneKey, Dict[str, np.ndarray]]:
+    """Split column arrays by lane, plus an equipment-wide ("*", "*", equipment) group per equipment type"""
+    groups: Dict[LaneKey, Dict[str, np.ndarray]] = {}
+    if not keys:
+        return groups
+    for group_keys in (keys, [("*", "*", key[2]) for key in keys]):
+        index: Dict[LaneKey, int] = {}
+        codes = np.array([index.setdefault(key, len(index)) for key in group_keys])
+        order = np.argsort(codes, kind="stable")
+        boundaries = np.flatnonzero(np.diff(codes[order])) + 1
+        # Codes are assigned in first-seen order, so the sorted runs line up with index
+        for key, indices in zip(index, np.split(order, boundaries)):
+            groups[key] = {name: values[indices] for name, values in columns.items()}
+    return groups
+
+
+class LaneStatsEngine:
+    """
+    Per-lane negotiation statistics, held in memory and kept current incrementally
+
+    A full rebuild reads every call in the lookback window, joined to its
+    load, and groups it by lane with numpy. After that only calls with a
+    higher id than the last one seen are fetched and appended to their
+    lanes, which is a cheap primary key range scan; it runs before a read
+    whenever a call was logged locally or ``refresh_seconds`` have passed,
+    so calls logged through other workers show up within that interval.
+    Ids are assigned before commit, so a call can become visible after a
+    higher id: each catch-up rereads the last ``lookback_ids`` ids below the
+    newest one seen and skips the ones already appended. Queries run
+    without the lock, which is only taken to merge.
+    Summaries are recomputed only for lanes that changed. The full rebuild
+    (which also drops calls that left the window or were archived) runs in a
+    background thread at startup and repeats every ``rebuild_seconds``.
+    """
+
+    def __init__(
+        self, lookback_days: int, refresh_seconds: float, rebuild_seconds: float, min_samples: int, rpm_band: float,
+        lookback_ids: int,
+    ):
+        self.lookback_days = lookback_days
+        self.lookback_ids = lookback_ids
+        self.refresh_seconds = refresh_seconds
+        self.rebuild_seconds = rebuild_seconds
+        self.min_samples = min_samples
+        self.rpm_band = rpm_band
+        self._lanes: Dict[LaneKey, LaneSamples] = {}
+        self._last_id = 0
+        # Ids of appended calls that catch-ups still reread
+        self._recent_ids: Set[int] = set()
+        self._refreshed_at = 0.0
+        self._rebuilt_at: Optional[float] = None
+        self._stale = False
+        self._lock = threading.Lock()
+        self._rebuilding = threading.Lock()
+        self.rebuilds = 0
+        self.catch_ups = 0
+
+    def _query(self):
+        since = datetime.utcnow() - timedelta(days=self.lookback_days)
+        statement = select(
+            *(any_load_column(name) for name in ("origin", "destination", "equipment_type", "miles", "loadboard_rate")),
+            CallLog.agreed_rate, CallLog.initial_carrier_offer, CallLog.negotiation_rounds,
+            CallLog.call_outcome_classification, CallLog.id,
+        ).select_from(CallLog)
+        # Archived loads keep contributing their calls
+        return (
+            join_any_load(statement, CallLog.searched_load_id)
+            .where(CallLog.called_at >= since)
+            .where(or_(Load.id.isnot(None), LoadArchive.id.isnot(None)))
+        )
+
+    def _fetch(self, db: Session, statement) -> List[Tuple]:
+        # Core execution: plain tuples without the ORM row layer, which doubles the cost of a full read
+        return db.connection().execute(statement).all()
+
+    def rebuild(self, db: Session) -> int:
+        """
+        Recompute every lane from the call logs in the lookback window
+
+        Returns:
+            Number of calls loaded
+        """
+        with self._rebuilding:
+            started = time.perf_counter()
+            rows = self._fetch(db, self._query())
+            keys, columns = _columns_from_rows(rows)
+            lanes = {key: LaneSamples(group) for key, group in _group(keys, columns).items()}
+            last_id = max((row[9] for row in rows), default=0)
+            recent_ids = {row[9] for row in rows if row[9] > last_id - self.lookback_ids}
+            with self._lock:
+                # Calls a concurrent catch-up appended past our snapshot go with the old lanes,
+                # so the watermark moves back to the snapshot and the catch-up below re-reads them
+                self._lanes = lanes
+                self._last_id = last_id
+                self._recent_ids = recent_ids
+                self._rebuilt_at = self._refreshed_at = time.monotonic()
+                self.rebuilds += 1
+            self.catch_up(db)
+            logger.info(
+                f"Rebuilt lane stats for {len(lanes)} lanes from {len(rows)} calls "
+                f"in {(time.perf_counter() - started) * 1000:.0f}ms"
+            )
+            return len(rows)
+
+    def catch_up(self, db: Session) -> int:
+        """Append calls logged since the lookback below the last one seen; returns how many were added"""
+        with self._lock:
+            floor = self._last_id - self.lookback_ids
+            self._refreshed_at = time.monotonic()
+            self._stale = False
+        rows = self._fetch(db, self._query().where(CallLog.id > floor).order_by(CallLog.id))
+        with self._lock:
+            # Only ids above the current floor are remembered; a rebuild or another catch-up may have raised it
+            floor = max(floor, self._last_id - self.lookback_ids)
+            rows = [row for row in rows if row[9] > floor and row[9] not in self._recent_ids]
+            if not rows:
+                return 0
+            keys, columns = _columns_from_rows(rows)
+            for key, group in _group(keys, columns).items():
+                self._lanes.setdefault(key, LaneSamples()).extend(group)
+            self._recent_ids.update(row[9] for row in rows)
+            self._last_id = max(self._last_id, rows[-1][9])
+            floor = self._last_id - self.lookback_ids
+            self._recent_ids = {call_id for call_id in self._recent_ids if call_id > floor}
+            self.catch_ups += 1
+            return len(rows)
+
+    def notify_new_call(self) -> None:
+        """A call was logged; fold it in before the next read"""
+        self._stale = True
+
+    async def warm(self) -> None:
+        """Build the lanes in a background thread so the first guidance request does not pay for it"""
+        if self._rebuilt_at is None and not self._rebuilding.locked():
+            threading.Thread(target=self._rebuild_in_background, name="lane-stats-rebuild", daemon=True).start()
+
+    def _ensure_current(self, db: Session) -> None:
+        if self._rebuilt_at is None:
+            # Wait for a warm-up already in flight rather than starting a second full read
+            with self._rebuilding:
+                pass
+            if self._rebuilt_at is None:
+                self.rebuild(db)
+            return
+        now = time.monotonic()
+        if self._stale or now - self._refreshed_at >= self.refresh_seconds:
+            self.catch_up(db)
+        if now - self._rebuilt_at >= self.rebuild_seconds and not self._rebuilding.locked():
+            self._rebuilt_at = now  # Claim this rebuild so concurrent reads do not start another
+            threading.Thread(target=self._rebuild_in_background, name="lane-stats-rebuild", daemon=True).start()
+
+    def _rebuild_in_background(self) -> None:
+        from app.database import ReadSessionLocal
+
+        db = ReadSessionLocal()
+        try:
+            self.rebuild(db)
+        except Exception:
+            logger.exception("Lane stats rebuild failed")
+        finally:
+            db.close()
+
+    def guidance(self, db: Session, load: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Negotiation guidance for a load from its lane's history
+
+        Falls back to all lanes with the same equipment type when the lane has
+        fewer than ``min_samples`` calls.
+
+        Args:
+            db: Session used to catch up on new calls
+            load: Load record with origin, destination, equipment_type, miles and loadboard_rate
+
+        Returns:
+            Lane statistics plus where the loadboard rate sits among agreed rates
+        """
+        self._ensure_current(db)
+        key = lane_key(load["origin"], load["destination"], load["equipment_type"])
+        scope, samples = "lane", self._lanes.get(key)
+        if samples is None or len(samples) < self.min_samples:
+            scope, samples = "equipment", self._lanes.get(("*", "*", key[2]))
+        summary = samples.summary(self.rpm_band) if samples is not None else _summarize(LaneSamples().columns, self.rpm_band)
+
+        miles = load.get("miles")
+        loadboard_rate = load["loadboard_rate"]
+        agreed = summary["_sorted_agreed"]
+        return {
+            "load_id": load["load_id"],
+            "origin": load["origin"],
+            "destination": load["destination"],
+            "equipment_type": load["equipment_type"],
+            "loadboard_rate": loadboard_rate,
+            "miles": miles,
+            "loadboard_rate_per_mile": round(loadboard_rate / miles, 2) if miles else None,
+            "scope": scope if samples is not None else "none",
+            "loadboard_rate_percentile": (
+                round(float(np.searchsorted(agreed, loadboard_rate, side="right")) / len(agreed) * 100, 1)
+                if len(agreed) else None
+            ),
+            **{name: value for name, value in summary.items() if not name.startswith("_")},
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "lanes": len(self._lanes),
+            "calls": sum(len(samples) for key, samples in self._lanes.items() if key[0] != "*"),
+            "last_call_id": self._last_id,
+            "rebuilds": self.rebuilds,
+            "catch_ups": self.catch_ups,
+            "seconds_since_rebuild": round(time.monotonic() - self._rebuilt_at, 1) if self._rebuilt_at is not None else None,
+        }
+
+
+# Singleton instance
+lane_stats = LaneStatsEngine(
+    lookback_days=settings.LANE_STATS_LOOKBACK_DAYS,
+    refresh_seconds=settings.LANE_STATS_REFRESH_SECONDS,
+    rebuild_seconds=settings.LANE_STATS_REBUILD_SECONDS,
+    min_samples=settings.LANE_STATS_MIN_SAMPLES,
+    rpm_band=settings.LANE_STATS_RPM_BAND,
+    lookback_ids=settings.LANE_STATS_LOOKBACK_IDS,
+)
@@ -0,0 +1,246 @@
+import argparse
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, case, delete, func, insert, literal, select
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.core.load_cache import load_cache
+from app.database import engine
+from app.models.load import AVAILABLE_STATUS, BOOKED_STATUS, EXPIRED_STATUS, Load, LoadArchive, load_is_available
+
+logger = logging.getLogger(__name__)
+
+# Columns copied as-is from loads; status and archived_at are set by the job
+COPIED_COLUMNS = [column.name for column in LoadArchive.__table__.columns if column.name not in ("status", "archived_at")]
+
+
+def expiry_cutoff(now: Optional[datetime] = None) -> datetime:
+    """
+    Pickup time before which an unbooked load is expired
+
+    Pickup times are naive local times, as the seed data and API clients
+    write them, so the cutoff is taken from the local clock too.
+    """
+    return (now or datetime.now()) - timedelta(hours=settings.LOAD_EXPIRY_GRACE_HOURS)
+
+
+def load_is_open():
+    """Available and not past its pickup: the loads search offers and booking accepts"""
+    return and_(load_is_available(), Load.pickup_datetime >= expiry_cutoff())
+
+
+class LoadArchiver:
+    """
+    Move expired and long-booked loads from ``loads`` to ``loads_archive``
+
+    Every interval, available loads whose pickup is more than the expiry
+    grace period past, and booked loads booked more than
+    ``booked_after_hours`` ago, are moved in batches of ``batch_size``. Each
+    batch copies the rows and deletes them from the board in one
+    transaction, so a load is always in exactly one of the two tables. Both
+    kinds of load are found through partial indexes, so a run costs the
+    rows it moves rather than a scan of the board. Board and archive sizes
+    are counted every ``board_resync_seconds`` and adjusted from the rows
+    each batch moves in between.
+    """
+
+    def __init__(
+        self,
+        bind: Engine,
+        interval_seconds: float,
+        batch_size: int,
+        booked_after_hours: float,
+        board_resync_seconds: float,
+    ):
+        self.bind = bind
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.booked_after_hours = booked_after_hours
+        self.board_resync_seconds = board_resync_seconds
+        self._board_counted_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self.metrics: Dict[str, Any] = {
+            "runs": 0,
+            "last_run_at": None,
+            "last_run_duration_ms": None,
+            "archived_total": 0,
+            "expired_total": 0,
+            "booked_total": 0,
+            "archived_last_run": 0,
+            "batches_last_run": 0,
+            # Archive throughput of the last run that moved anything
+            "rows_per_second": None,
+            "board": None,
+        }
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Load archiver started (every {self.interval_seconds}s, batches of {self.batch_size})")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Load archival run failed: {str(e)}")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def run_once(self) -> int:
+        """Archive due loads once, returning how many were moved"""
+        return await asyncio.to_thread(self.archive)
+
+    def archive(self) -> int:
+        """
+        Move every due load to the archive, one batch per transaction
+
+        Returns:
+            Number of loads archived
+        """
+        started = time.perf_counter()
+        # booked_at and archived_at are UTC; pickup times are local (see expiry_cutoff)
+        now = datetime.utcnow()
+        if self._board_counted_at is None or time.monotonic() - self._board_counted_at >= self.board_resync_seconds:
+            self.metrics["board"] = self.board_size()
+            self._board_counted_at = time.monotonic()
+        board = self.metrics["board"]
+        phases = {
+            EXPIRED_STATUS: and_(load_is_available(), Load.pickup_datetime < expiry_cutoff()),
+            BOOKED_STATUS: and_(Load.status == BOOKED_STATUS, Load.booked_at < now - timedelta(hours=self.booked_after_hours)),
+        }
+        archived, batches = 0, 0
+        for archived_status, due in phases.items():
+            while True:
+                load_ids, moved = self._archive_batch(due, now)
+                if not load_ids:
+                    break
+                batches += 1
+                archived += moved
+                self.metrics[f"{archived_status}_total"] += moved
+                board_status = BOOKED_STATUS if archived_status == BOOKED_STATUS else AVAILABLE_STATUS
+                board["loads"] -= moved
+                board["by_status"][board_status] = board["by_status"].get(board_status, 0) - moved
+                board["archived"] += moved
+                if archived_status == EXPIRED_STATUS:
+                    board["expired_pending"] = max(0, board["expired_pending"] - moved)
+                # Bulk SQL bypasses the ORM hooks, so drop the moved loads explicitly. Facets
+                # only count open loads, which these no longer were, so they are unaffected
+                load_cache.invalidate(load_ids)
+                if len(load_ids) < self.batch_size:
+                    break
+
+        if board["loads"] < 0 or any(count < 0 for count in board["by_status"].values()):
+            # Loads were added since the last count; recount rather than report negatives
+            self.metrics["board"] = self.board_size()
+            self._board_counted_at = time.monotonic()
+
+        elapsed = time.perf_counter() - started
+        self.metrics.update({
+            "runs": self.metrics["runs"] + 1,
+            "last_run_at": now.isoformat(),
+            "last_run_duration_ms": round(elapsed * 1000, 1),
+            "archived_total": self.metrics["archived_total"] + archived,
+            "archived_last_run": archived,
+            "batches_last_run": batches,
+        })
+        if archived:
+            self.metrics["rows_per_second"] = round(archived / elapsed, 1)
+            logger.info(f"Archived {archived} loads in {batches} batches", extra={"elapsed_ms": round(elapsed * 1000, 1)})
+        return archived
+
+    def _archive_batch(self, due, now: datetime) -> Tuple[List[str], int]:
+        """Move up to ``batch_size`` loads matching ``due`` in one transaction; returns their load IDs and rows moved"""
+        with self.bind.begin() as conn:
+            query = select(Load.id, Load.load_id).where(due).limit(self.batch_size)
+            if conn.dialect.name == "postgresql":
+                # Rows being booked right now are left for the next batch
+                query = query.with_for_update(skip_locked=True)
+            rows = conn.execute(query).all()
+            if not rows:
+                return [], 0
+            ids = [row.id for row in rows]
+            load_ids = [row.load_id for row in rows]
+
+            # A load restored to the board and archived again replaces its earlier copy
+            conn.execute(delete(LoadArchive).where(LoadArchive.load_id.in_(load_ids)))
+            status = case((Load.status == BOOKED_STATUS, BOOKED_STATUS), else_=EXPIRED_STATUS)
+            conn.execute(
+                insert(LoadArchive).from_select(
+                    COPIED_COLUMNS + ["status", "archived_at"],
+                    select(*(Load.__table__.c[name] for name in COPIED_COLUMNS), status, literal(now)).where(Load.id.in_(ids)),
+                )
+            )
+            moved = conn.execute(delete(Load).where(Load.id.in_(ids))).rowcount
+        return load_ids, moved
+
+    def board_size(self) -> Dict[str, Any]:
+        """Count loads on the board by status, past pickup and in the archive"""
+        with self.bind.connect() as conn:
+            board = dict(conn.execute(select(Load.status, func.count(Load.id)).group_by(Load.status)).all())
+            archived = conn.execute(select(func.count()).select_from(LoadArchive)).scalar()
+            expired = conn.execute(
+                select(func.count(Load.id)).where(load_is_available(), Load.pickup_datetime < expiry_cutoff())
+            ).scalar()
+        return {
+            "loads": sum(board.values()),
+            "by_status": board,
+            # Past their pickup but not archived yet; search already leaves them out
+            "expired_pending": expired,
+            "archived": archived,
+            "counted_at": datetime.utcnow().isoformat(),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "interval_seconds": self.interval_seconds,
+            "batch_size": self.batch_size,
+            "expiry_grace_hours": settings.LOAD_EXPIRY_GRACE_HOURS,
+            "booked_after_hours": self.booked_after_hours,
+            "board_resync_seconds": self.board_resync_seconds,
+            **self.metrics,
+        }
+
+
+# Singleton instance
+load_archiver = LoadArchiver(
+    bind=engine,
+    interval_seconds=settings.LOAD_ARCHIVE_INTERVAL_SECONDS,
+    batch_size=settings.LOAD_ARCHIVE_BATCH_SIZE,
+    booked_after_hours=settings.LOAD_ARCHIVE_BOOKED_AFTER_HOURS,
+    board_resync_seconds=settings.LOAD_ARCHIVE_BOARD_RESYNC_SECONDS,
+)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Archive expired and booked loads")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("run", help="Archive every due load once")
+    subparsers.add_parser("status", help="Print board and archive sizes")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        archived = load_archiver.archive()
+        print(f"Archived {archived} loads ({load_archiver.metrics['expired_total']} expired, "
+              f"{load_archiver.metrics['booked_total']} booked)")
+    print(load_archiver.board_size())
+
+
+if __name__ == "__main__":
+    main()
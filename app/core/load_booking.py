@@ -0,0 +1,123 @@
+import logging
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.core.load_cache import load_cache
+from app.core.load_facets import facet_cache, load_state
+from app.core.load_archival import expiry_cutoff, load_is_open
+from app.models.load import BOOKED_STATUS, Load as LoadModel, LoadArchive
+
+logger = logging.getLogger(__name__)
+
+
+def book_load(db: Session, load_id: str, mc_number: str, agreed_rate: Optional[float] = None) -> LoadModel:
+    """
+    Atomically reserve a load for a carrier
+
+    On PostgreSQL the available row is locked with ``FOR UPDATE SKIP LOCKED``,
+    so concurrent bookers never queue behind each other: whoever holds the
+    lock wins and the rest see the load as taken. Other databases use an
+    optimistic check on the ``version`` column instead.
+
+    Args:
+        db: Session on the primary database
+        load_id: Load to book
+        mc_number: Carrier booking the load
+        agreed_rate: Rate agreed with the carrier
+
+    Returns:
+        The booked load
+
+    Raises:
+        HTTPException: 404 if the load does not exist, 409 if it is already booked,
+            being booked by another request or past its pickup
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        booked = _book_with_row_lock(db, load_id, mc_number, agreed_rate)
+    else:
+        booked = _book_with_version_check(db, load_id, mc_number, agreed_rate)
+
+    if booked is None:
+        db.rollback()
+        _raise_booking_conflict(db, load_id)
+
+    state = load_state(booked)
+    db.commit()
+    # Core UPDATEs bypass the ORM flush hooks, so drop the cached record and facets explicitly
+    load_cache.invalidate([load_id])
+    facet_cache.invalidate([state])
+    logger.info(f"Load {load_id} booked by MC {mc_number}")
+    db.refresh(booked)
+    return booked
+
+
+def _raise_booking_conflict(db: Session, load_id: str) -> None:
+    """
+    Explain why a load could not be booked
+
+    The row is re-read without a lock, so it shows the last committed state:
+    a load another request holds locked (Postgres) or just changed (version
+    check) still reads as open.
+    """
+    load = (
+        db.query(LoadModel.status, LoadModel.pickup_datetime)
+        .filter(LoadModel.load_id == load_id)
+        .first()
+    )
+    if load is None:
+        archived = db.query(LoadArchive.status).filter(LoadArchive.load_id == load_id).first()
+        if archived is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Load not found")
+        if archived.status == BOOKED_STATUS:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Load is already booked")
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Load has expired")
+    if load.status == BOOKED_STATUS:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Load is already booked")
+    if load.pickup_datetime < expiry_cutoff():
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Load has expired")
+    raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Load is being booked by another request")
+
+
+def _book_with_row_lock(db: Session, load_id: str, mc_number: str, agreed_rate: Optional[float]) -> Optional[LoadModel]:
+    load = (
+        db.query(LoadModel)
+        .filter(LoadModel.load_id == load_id, load_is_open())
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+    if load is None:
+        return None
+    load.status = BOOKED_STATUS
+    load.version = LoadModel.version + 1
+    load.booked_by_mc = mc_number
+    load.booked_rate = agreed_rate
+    load.booked_at = datetime.utcnow()
+    db.flush()
+    return load
+
+
+def _book_with_version_check(db: Session, load_id: str, mc_number: str, agreed_rate: Optional[float]) -> Optional[LoadModel]:
+    load = db.query(LoadModel).filter(LoadModel.load_id == load_id, load_is_open()).first()
+    if load is None:
+        return None
+    # Only succeeds if nobody has booked or otherwise changed the row since we read it
+    result = db.execute(
+        update(LoadModel)
+        .where(LoadModel.id == load.id, LoadModel.version == load.version, load_is_open())
+        .values(
+            status=BOOKED_STATUS,
+            version=LoadModel.version + 1,
+            booked_by_mc=mc_number,
+            booked_rate=agreed_rate,
+            booked_at=datetime.utcnow(),
+            updated_at=datetime.utcnow(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        return None
+    return load
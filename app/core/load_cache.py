@@ -0,0 +1,168 @@
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.load import Load as LoadModel, LoadArchive
+from app.schemas.load import Load
+
+logger = logging.getLogger(__name__)
+
+
+class CachedLoad(NamedTuple):
+    body: bytes  # Load record serialized as JSON
+    expires_at: float  # time.monotonic() deadline
+
+
+class LoadCache:
+    """
+    Bounded LRU of serialized load records, keyed by load_id
+
+    Entries are dropped when the ORM flushes or commits a change to the load
+    and when the load change notifier sees one. The TTL bounds staleness for
+    changes neither sees, such as bulk SQL from other processes or a replica
+    read that lands just after an invalidation.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, CachedLoad]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    @staticmethod
+    def serialize(load: LoadModel) -> bytes:
+        return Load.model_validate(load).model_dump_json().encode("utf-8")
+
+    def get_many(self, load_ids: Iterable[str]) -> Dict[str, bytes]:
+        """Cached records for the given IDs; IDs not returned are misses"""
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for load_id in load_ids:
+                entry = self._entries.get(load_id)
+                if entry is None or entry.expires_at <= now:
+                    if entry is not None:
+                        self._drop(load_id)
+                    self.misses += 1
+                    continue
+                self._entries.move_to_end(load_id)
+                self.hits += 1
+                found[load_id] = entry.body
+        return found
+
+    def get(self, load_id: str) -> Optional[bytes]:
+        return self.get_many([load_id]).get(load_id)
+
+    def put(self, load: LoadModel) -> bytes:
+        body = self.serialize(load)
+        with self._lock:
+            if load.load_id in self._entries:
+                self._drop(load.load_id)
+            self._entries[load.load_id] = CachedLoad(body, time.monotonic() + self.ttl_seconds)
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+        return body
+
+    def invalidate(self, load_ids: Iterable[str]) -> None:
+        with self._lock:
+            for load_id in load_ids:
+                if load_id in self._entries:
+                    self._drop(load_id)
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _drop(self, load_id: str) -> None:
+        entry = self._entries.pop(load_id)
+        self._bytes -= len(entry.body)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        with self._lock:
+            entries = len(self._entries)
+            # Serialized bodies plus the dict slot, key and entry tuple for each record
+            overhead = sum(sys.getsizeof(key) + sys.getsizeof(entry) + 100 for key, entry in self._entries.items())
+            body_bytes = self._bytes
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+            "body_bytes": body_bytes,
+            "approx_memory_bytes": body_bytes + overhead,
+        }
+
+
+# Singleton instance
+load_cache = LoadCache(max_entries=settings.LOAD_CACHE_MAX_ENTRIES, ttl_seconds=settings.LOAD_CACHE_TTL_SECONDS)
+
+
+def _changed_load_ids(session: Session) -> List[str]:
+    return [
+        obj.load_id
+        for obj in list(session.dirty) + list(session.deleted)
+        if isinstance(obj, LoadModel) and obj.load_id
+    ]
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_load_changes(session, flush_context, instances):
+    load_ids = _changed_load_ids(session)
+    if load_ids:
+        session.info.setdefault("changed_load_ids", set()).update(load_ids)
+        load_cache.invalidate(load_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_loads(session):
+    # Invalidate again once committed, in case a concurrent read re-cached
+    # the old row between the flush and the commit
+    load_ids = session.info.pop("changed_load_ids", None)
+    if load_ids:
+        load_cache.invalidate(load_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_load_changes(session):
+    session.info.pop("changed_load_ids", None)
+
+
+def load_records(db: Session, load_ids: List[str]) -> List[bytes]:
+    """
+    Serialized records for the given load IDs, in request order
+
+    Cache misses are resolved with a single IN query and cached, and IDs not
+    on the board with one more against the archive; unknown IDs are left out.
+    """
+    found = load_cache.get_many(load_ids)
+    missing = [load_id for load_id in load_ids if load_id not in found]
+    if missing:
+        for load in db.query(LoadModel).filter(LoadModel.load_id.in_(missing)):
+            found[load.load_id] = load_cache.put(load)
+        archived = [load_id for load_id in missing if load_id not in found]
+        if archived:
+            for load in db.query(LoadArchive).filter(LoadArchive.load_id.in_(archived)):
+                found[load.load_id] = load_cache.put(load)
+    return [found[load_id] for load_id in load_ids if load_id in found]
@@ -0,0 +1,244 @@
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, event, func, inspect
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.load_search import apply_text_search
+from app.models.load import Load as LoadModel
+
+logger = logging.getLogger(__name__)
+
+UNKNOWN = "unknown"
+
+# Load fields facet entries are matched against when a load changes
+MATCHED_FIELDS = ("origin", "destination", "equipment_type", "weight", "loadboard_rate")
+
+
+def location_state(location: Optional[str]) -> str:
+    """State code from a "City, ST" location"""
+    if not location or "," not in location:
+        return UNKNOWN
+    return location.rsplit(",", 1)[1].strip().upper() or UNKNOWN
+
+
+def _ranked(counts: Counter) -> List[Dict[str, Any]]:
+    return [{"value": value, "count": count} for value, count in sorted(counts.items(), key=lambda item: (-item[1], item[0]))]
+
+
+def query_facets(db: Session, filters: List, q: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Load counts by equipment type, origin state, destination state and pickup day
+
+    One grouped query over the filtered loads, by equipment, origin,
+    destination and pickup day, rolled up to the four facets here since
+    states are parsed out of the location strings.
+
+    Args:
+        db: Database session
+        filters: Filter expressions, as built for search_loads
+        q: Optional full-text search phrase
+
+    Returns:
+        Total matching loads and, per facet, values with counts
+    """
+    pickup_day = func.date(LoadModel.pickup_datetime)
+    query = db.query(
+        LoadModel.equipment_type, LoadModel.origin, LoadModel.destination, pickup_day, func.count()
+    ).filter(and_(*filters))
+    if q:
+        query = apply_text_search(query, q, db.get_bind().dialect.name, ranked=False)
+    rows = query.group_by(LoadModel.equipment_type, LoadModel.origin, LoadModel.destination, pickup_day).all()
+
+    equipment, origins, destinations, days = Counter(), Counter(), Counter(), Counter()
+    for equipment_type, origin, destination, day, count in rows:
+        equipment[equipment_type] += count
+        origins[location_state(origin)] += count
+        destinations[location_state(destination)] += count
+        days[str(day)[:10]] += count  # A date on Postgres, an ISO string on SQLite
+
+    return {
+        "total": sum(equipment.values()),
+        "equipment_type": _ranked(equipment),
+        "origin_state": _ranked(origins),
+        "destination_state": _ranked(destinations),
+        "pickup_day": [{"value": day, "count": count} for day, count in sorted(days.items())],
+    }
+
+
+def load_state(load) -> Dict[str, Any]:
+    """The fields of a load (ORM object) that facet filters look at"""
+    return {field: getattr(load, field) for field in MATCHED_FIELDS}
+
+
+def filter_matcher(
+    origin_city: Optional[str],
+    destination_city: Optional[str],
+    equipment_type: Optional[str],
+    max_weight: Optional[float],
+    min_rate: Optional[float],
+    max_rate: Optional[float],
+) -> Callable[[Dict[str, Any]], bool]:
+    """
+    Whether a load state could be counted under these search filters
+
+    Mirrors the lane, equipment, weight and rate filters of load_filters.
+    Pickup, delivery and text filters are not checked, and a field missing
+    from the state matches, so the answer errs towards True.
+    """
+    substrings = [
+        (field, value.lower())
+        for field, value in (("origin", origin_city), ("destination", destination_city), ("equipment_type", equipment_type))
+        if value
+    ]
+
+    def matches(state: Dict[str, Any]) -> bool:
+        for field, value in substrings:
+            if state.get(field) is not None and value not in state[field].lower():
+                return False
+        weight, rate = state.get("weight"), state.get("loadboard_rate")
+        if max_weight and max_weight > 0 and weight is not None and weight > max_weight:
+            return False
+        if min_rate and min_rate > 0 and rate is not None and rate < min_rate:
+            return False
+        if max_rate and max_rate > 0 and rate is not None and rate > max_rate:
+            return False
+        return True
+
+    return matches
+
+
+class FacetCache:
+    """
+    LRU of facet results keyed by the search filters
+
+    When loads change, only entries whose filters match the old or new
+    state of a changed load are dropped (see ``filter_matcher``); calling
+    ``invalidate`` without loads clears everything. Changes are picked up
+    from ORM flushes in this process, bookings and the load change watcher;
+    the TTL bounds staleness for anything else, such as loads passing their
+    pickup. Results computed while a matching change committed are not
+    stored, so a slow query that read the old rows cannot undo it.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple, Tuple[float, Dict[str, Any], Callable]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation = 0
+        # (generation, changed load states or None for a full clear) of recent invalidations
+        self._recent: deque = deque(maxlen=256)
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.entries_dropped = 0
+
+    def get(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Tuple, value: Dict[str, Any], generation: int, matcher: Callable[[Dict[str, Any]], bool]) -> None:
+        """
+        Store a result computed from reads that started at ``generation``
+
+        Skipped if an invalidation since then may have touched it.
+        """
+        with self._lock:
+            if generation != self.generation:
+                missed = [states for gen, states in self._recent if gen > generation]
+                if len(missed) < self.generation - generation:
+                    return  # Older than the invalidations kept
+                if any(states is None or any(matcher(state) for state in states) for states in missed):
+                    return
+            self._entries[key] = (time.monotonic(), value, matcher)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, states: Optional[Iterable[Dict[str, Any]]] = None) -> None:
+        """
+        Drop entries a load change may affect
+
+        Args:
+            states: Old and new states of the changed loads (see ``load_state``);
+                None drops every entry
+        """
+        states = list(states) if states is not None else None
+        if states is not None and not states:
+            return
+        with self._lock:
+            self.generation += 1
+            self._recent.append((self.generation, states))
+            self.invalidations += 1
+            if states is None:
+                self.entries_dropped += len(self._entries)
+                self._entries.clear()
+                return
+            stale = [key for key, (_, _, matcher) in self._entries.items() if any(matcher(state) for state in states)]
+            for key in stale:
+                del self._entries[key]
+            self.entries_dropped += len(stale)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "entries_dropped": self.entries_dropped,
+        }
+
+
+# Singleton instance
+facet_cache = FacetCache(max_entries=settings.LOAD_FACETS_CACHE_MAX_ENTRIES, ttl_seconds=settings.LOAD_FACETS_CACHE_TTL_SECONDS)
+
+
+def _flushed_states(obj: LoadModel) -> List[Dict[str, Any]]:
+    """New and, for changed fields, old state of a load being flushed, without loading expired attributes"""
+    instance = inspect(obj)
+    new = {field: instance.dict[field] for field in MATCHED_FIELDS if field in instance.dict}
+    old = dict(new)
+    for field in MATCHED_FIELDS:
+        deleted = instance.attrs[field].history.deleted
+        if deleted:
+            old[field] = deleted[0]
+    return [new] if old == new else [new, old]
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_load_writes(session, flush_context, instances):
+    states = [
+        state
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted)
+        if isinstance(obj, LoadModel)
+        for state in _flushed_states(obj)
+    ]
+    if states:
+        session.info.setdefault("loads_written", []).extend(states)
+        facet_cache.invalidate(states)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_facets(session):
+    # Again once committed, for facets computed from replica reads in between
+    states = session.info.pop("loads_written", None)
+    if states:
+        facet_cache.invalidate(states)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_load_writes(session):
+    session.info.pop("loads_written", None)
@@ -0,0 +1,353 @@
+import asyncio
+import json
+import logging
+import select
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from sqlalchemy import func, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.config import settings
+from app.core.broadcast import Broadcaster, Subscription
+from app.core.load_cache import load_cache
+from app.core.load_facets import MATCHED_FIELDS, facet_cache, load_state
+from app.database import SessionLocal, ddl_transaction, engine
+from app.models.load import AVAILABLE_STATUS, Load as LoadModel, LoadArchive, load_is_available
+from app.schemas.load import Load
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "load_changes"
+NOTIFY_TRIGGER = "loads_notify_change"
+
+# Notifications carry the operation and, for updates and deletes, the row's
+# state before the change, so the watcher classifies changes and finds
+# removed loads without keeping a copy of the board. Migration 0004 holds the
+# frozen copy of this DDL.
+PG_NOTIFY_FUNCTION_DDL = f"""
+    CREATE OR REPLACE FUNCTION notify_load_change() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            PERFORM pg_notify('{NOTIFY_CHANNEL}', json_build_object('op', TG_OP, 'load_id', NEW.load_id)::text);
+            RETURN NEW;
+        END IF;
+        PERFORM pg_notify('{NOTIFY_CHANNEL}', json_build_object(
+            'op', TG_OP,
+            'load_id', OLD.load_id,
+            'old', json_build_object(
+                'origin', OLD.origin,
+                'destination', OLD.destination,
+                'equipment_type', OLD.equipment_type,
+                'weight', OLD.weight,
+                'loadboard_rate', OLD.loadboard_rate,
+                'status', OLD.status
+            )
+        )::text);
+        IF TG_OP = 'DELETE' THEN
+            RETURN OLD;
+        END IF;
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """
+
+PG_NOTIFY_TRIGGER_DDL = f"""
+    DO $$
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1 FROM pg_trigger WHERE tgname = '{NOTIFY_TRIGGER}' AND tgrelid = 'loads'::regclass
+        ) THEN
+            CREATE TRIGGER {NOTIFY_TRIGGER}
+            AFTER INSERT OR UPDATE OR DELETE ON loads
+            FOR EACH ROW EXECUTE FUNCTION notify_load_change();
+        END IF;
+    END
+    $$
+    """
+
+
+def ensure_change_trigger(bind: Union[Engine, Connection]) -> None:
+    """
+    Create the trigger that NOTIFYs load changes if missing (Postgres only)
+
+    Called from ``init_schema`` on boot; migrated databases get it from
+    revision 0004. The watcher itself never runs DDL.
+    """
+    if bind.dialect.name != "postgresql":
+        return
+    with ddl_transaction(bind) as conn:
+        conn.execute(text(PG_NOTIFY_FUNCTION_DDL))
+        conn.execute(text(PG_NOTIFY_TRIGGER_DDL))
+
+
+class LoadChangeNotifier:
+    """
+    Watch the loads table and fan changes out to stream subscribers
+
+    A single watcher per process detects changes and publishes ``insert``,
+    ``rate_change``, ``update`` and ``remove`` events to every subscriber
+    through a ``Broadcaster``. On Postgres it LISTENs for the notifications
+    of the ``loads`` trigger, whose payloads hold each row's previous state,
+    so nothing about the board is kept in memory. Elsewhere it polls
+    ``updated_at`` and compares against a snapshot of the open board, and
+    picks up removals from ``loads_archive.archived_at``, since archival is
+    the only path that deletes loads.
+    """
+
+    def __init__(self, poll_interval: float, buffer_size: int):
+        self.poll_interval = poll_interval
+        self.broadcaster = Broadcaster(buffer_size=buffer_size)
+        self._task: Optional[asyncio.Task] = None
+        self._start_lock = asyncio.Lock()
+        # Polling only: load_id -> last known state of each available load, used to classify changes
+        self._snapshot: Dict[str, Dict[str, Any]] = {}
+        self._watermark: Optional[datetime] = None
+        self._archive_watermark: Optional[datetime] = None
+        self._listen_conn = None
+        self.use_listen = engine.dialect.name == "postgresql"
+
+    async def ensure_started(self) -> None:
+        """Start the watcher on first use"""
+        async with self._start_lock:
+            if self._task is None or self._task.done():
+                await asyncio.to_thread(self._prime)
+                self._task = asyncio.create_task(self._run())
+                logger.info(
+                    f"Load change watcher started ("
+                    f"{'LISTEN/NOTIFY' if self.use_listen else f'polling, {len(self._snapshot)} loads'})"
+                )
+
+    async def stop(self) -> None:
+        """Stop the watcher and release its connection"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._listen_conn is not None:
+            self._listen_conn.close()
+            self._listen_conn = None
+
+    def subscribe(
+        self,
+        equipment_type: Optional[str] = None,
+        origin_city: Optional[str] = None,
+        destination_city: Optional[str] = None,
+    ) -> Subscription:
+        """
+        Subscribe to load changes, optionally filtered by equipment type or lane
+
+        Filters use the same case-insensitive substring matching as
+        ``search_loads``.
+        """
+        criteria = [
+            ("equipment_type", equipment_type),
+            ("origin", origin_city),
+            ("destination", destination_city),
+        ]
+        criteria = [(field, value.lower()) for field, value in criteria if value]
+
+        def matches(event: Dict[str, Any]) -> bool:
+            load = event["load"]
+            return all(value in (load.get(field) or "").lower() for field, value in criteria)
+
+        return self.broadcaster.subscribe(matches if criteria else None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "mode": "listen" if self.use_listen else "polling",
+            "tracked_loads": None if self.use_listen else len(self._snapshot),
+            **self.broadcaster.stats(),
+        }
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if self.use_listen:
+                    changes = await asyncio.to_thread(self._listen, self.poll_interval)
+                else:
+                    await asyncio.sleep(self.poll_interval)
+                    changes = await asyncio.to_thread(self._poll)
+
+                if changes:
+                    events, states = await asyncio.to_thread(self._collect, changes)
+                    # Also catches changes made outside this process's ORM sessions
+                    load_cache.invalidate(set(changes))
+                    facet_cache.invalidate(states)
+                    for event in events:
+                        self.broadcaster.publish(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Load change watcher error: {str(e)}")
+                if self._listen_conn is not None:
+                    self._listen_conn.close()
+                    self._listen_conn = None
+                await asyncio.sleep(self.poll_interval)
+
+    def _prime(self) -> None:
+        """Load the current board so later changes can be classified (polling only)"""
+        if self.use_listen:
+            return
+
+        db = SessionLocal()
+        try:
+            rows = db.query(
+                LoadModel.load_id,
+                *(getattr(LoadModel, field) for field in MATCHED_FIELDS),
+                LoadModel.status,
+                LoadModel.updated_at,
+            ).filter(load_is_available()).all()
+            self._snapshot = {row.load_id: self._summarize(row) for row in rows}
+            self._watermark = max((row.updated_at for row in rows if row.updated_at), default=None)
+            self._archive_watermark = db.query(func.max(LoadArchive.archived_at)).scalar()
+        finally:
+            db.close()
+
+    def _poll(self) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Load IDs touched or archived since the last poll, with their last known state"""
+        db = SessionLocal()
+        try:
+            query = db.query(LoadModel.load_id, LoadModel.updated_at)
+            if self._watermark is not None:
+                # >= because updated_at may only have second precision
+                query = query.filter(LoadModel.updated_at >= self._watermark)
+            changed_ids = set()
+            for load_id, updated_at in query:
+                changed_ids.add(load_id)
+                if updated_at and (self._watermark is None or updated_at > self._watermark):
+                    self._watermark = updated_at
+
+            # Archival moves loads to loads_archive in the same transaction that deletes them
+            archived = db.query(LoadArchive.load_id, LoadArchive.archived_at)
+            if self._archive_watermark is not None:
+                archived = archived.filter(LoadArchive.archived_at >= self._archive_watermark)
+            for load_id, archived_at in archived:
+                changed_ids.add(load_id)
+                if self._archive_watermark is None or archived_at > self._archive_watermark:
+                    self._archive_watermark = archived_at
+            return {load_id: self._snapshot.get(load_id) for load_id in changed_ids}
+        finally:
+            db.close()
+
+    def _listen(self, timeout: float) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Block until NOTIFY payloads arrive or the timeout expires; returns each load's state before the changes"""
+        if self._listen_conn is None:
+            raw = engine.raw_connection()
+            raw.detach()
+            self._listen_conn = raw.driver_connection
+            self._listen_conn.autocommit = True
+            with self._listen_conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+
+        if select.select([self._listen_conn], [], [], timeout) == ([], [], []):
+            return {}
+
+        self._listen_conn.poll()
+        changes: Dict[str, Optional[Dict[str, Any]]] = {}
+        while self._listen_conn.notifies:
+            notify = self._listen_conn.notifies.pop(0)
+            try:
+                payload = json.loads(notify.payload)
+                # The first notification for a load holds its state before this batch; inserts have none
+                changes.setdefault(payload["load_id"], payload.get("old"))
+            except (ValueError, KeyError):
+                logger.warning(f"Ignoring malformed load change payload: {notify.payload}")
+        return changes
+
+    def _collect(self, changes: Dict[str, Optional[Dict[str, Any]]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Turn changed loads into events, updating the snapshot when polling
+
+        Args:
+            changes: Changed load IDs and each load's state before the
+                change, None for loads that were not on the open board
+
+        Returns:
+            The events, and the old and new states of the loads they are about
+            for facet cache invalidation
+        """
+        events = []
+        states = []
+        db = SessionLocal()
+        try:
+            loads = (
+                db.query(LoadModel)
+                .filter(LoadModel.load_id.in_(changes), load_is_available())
+                .all()
+            )
+        finally:
+            db.close()
+
+        for load in loads:
+            previous = self._open_state(changes[load.load_id])
+            if not self.use_listen:
+                self._snapshot[load.load_id] = self._summarize(load)
+            event = self._classify(load, previous)
+            if event is not None:
+                events.append(event)
+                states.append(load_state(load))
+                if previous is not None:
+                    states.append(previous)
+
+        # A load that is gone (deleted or archived) or no longer available (booked) is a removal
+        for load_id in set(changes) - {load.load_id for load in loads}:
+            previous = self._open_state(changes[load_id])
+            if not self.use_listen:
+                self._snapshot.pop(load_id, None)
+            if previous is None:
+                continue
+            states.append(previous)
+            events.append({
+                "type": "remove",
+                "load_id": load_id,
+                "load": {"load_id": load_id, **{k: v for k, v in previous.items() if k not in ("status", "updated_at")}},
+                "at": datetime.utcnow().isoformat(),
+            })
+        return events, states
+
+    @staticmethod
+    def _open_state(state: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """A previous state if the load was on the open board then, else None"""
+        return state if state is not None and state.get("status") == AVAILABLE_STATUS else None
+
+    @staticmethod
+    def _classify(load: LoadModel, previous: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if previous is None:
+            event_type = "insert"
+        elif previous["loadboard_rate"] != load.loadboard_rate:
+            event_type = "rate_change"
+        elif "updated_at" in previous and previous["updated_at"] == load.updated_at:
+            # Polling re-reads the rows at the watermark
+            return None
+        else:
+            event_type = "update"
+
+        event = {
+            "type": event_type,
+            "load_id": load.load_id,
+            "load": Load.model_validate(load).model_dump(mode="json"),
+            "at": datetime.utcnow().isoformat(),
+        }
+        if event_type == "rate_change":
+            event["previous_rate"] = previous["loadboard_rate"]
+        return event
+
+    @staticmethod
+    def _summarize(row) -> Dict[str, Any]:
+        return {
+            **{field: getattr(row, field) for field in MATCHED_FIELDS},
+            "status": row.status,
+            "updated_at": row.updated_at,
+        }
+
+
+# Singleton instance
+load_change_notifier = LoadChangeNotifier(
+    poll_interval=settings.LOAD_STREAM_POLL_INTERVAL_SECONDS,
+    buffer_size=settings.LOAD_STREAM_BUFFER_SIZE,
+)
@@ -0,0 +1,126 @@
+import logging
+import re
+from typing import Union
+
+from sqlalchemy import column, false, func, literal_column, table, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Query
+
+from app.database import ddl_transaction
+from app.models.load import Load as LoadModel
+
+logger = logging.getLogger(__name__)
+
+TEXT_SEARCH_CONFIG = literal_column("'english'")
+
+loads_fts = table("loads_fts", column("rowid"), column("rank"))
+
+PG_SEARCH_INDEX_DDL = [
+    """
+    CREATE INDEX IF NOT EXISTS ix_loads_search_document ON loads
+    USING gin (to_tsvector('english', coalesce(notes, '') || ' ' || coalesce(commodity_type, '')))
+    """,
+]
+
+SQLITE_SEARCH_INDEX_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS loads_fts USING fts5(
+        notes, commodity_type, content='loads', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS loads_fts_insert AFTER INSERT ON loads BEGIN
+        INSERT INTO loads_fts(rowid, notes, commodity_type) VALUES (new.id, new.notes, new.commodity_type);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS loads_fts_delete AFTER DELETE ON loads BEGIN
+        INSERT INTO loads_fts(loads_fts, rowid, notes, commodity_type)
+        VALUES ('delete', old.id, old.notes, old.commodity_type);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS loads_fts_update AFTER UPDATE OF notes, commodity_type ON loads BEGIN
+        INSERT INTO loads_fts(loads_fts, rowid, notes, commodity_type)
+        VALUES ('delete', old.id, old.notes, old.commodity_type);
+        INSERT INTO loads_fts(rowid, notes, commodity_type) VALUES (new.id, new.notes, new.commodity_type);
+    END
+    """,
+]
+
+
+def search_document():
+    """
+    The tsvector searched on Postgres
+
+    Built only from literals so it matches the expression of the GIN index
+    in ``PG_SEARCH_INDEX_DDL`` and the planner can use it.
+    """
+    return func.to_tsvector(
+        TEXT_SEARCH_CONFIG,
+        func.coalesce(LoadModel.notes, literal_column("''"))
+        + literal_column("' '")
+        + func.coalesce(LoadModel.commodity_type, literal_column("''")),
+    )
+
+
+def ensure_search_index(bind: Union[Engine, Connection]) -> None:
+    """
+    Create the full-text index over load notes and commodity if missing
+
+    Postgres gets a GIN expression index, SQLite an FTS5 table kept in sync by
+    triggers. Both are maintained by the database on every write.
+    """
+    dialect = bind.dialect.name
+    with ddl_transaction(bind) as conn:
+        if dialect == "postgresql":
+            for statement in PG_SEARCH_INDEX_DDL:
+                conn.execute(text(statement))
+        elif dialect == "sqlite":
+            existed = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'loads_fts'")
+            ).first()
+            for statement in SQLITE_SEARCH_INDEX_DDL:
+                conn.execute(text(statement))
+            if not existed:
+                # Index loads that were inserted before the FTS table existed
+                conn.execute(text("INSERT INTO loads_fts(loads_fts) VALUES ('rebuild')"))
+                logger.info("Built loads_fts full-text index")
+        else:
+            logger.warning(f"Full-text load search is not supported on {dialect}")
+
+
+def _fts5_query(q: str) -> str:
+    """Turn free text into an FTS5 query that ANDs quoted terms"""
+    terms = re.findall(r"\w+", q)
+    return " ".join(f'"{term}"' for term in terms)
+
+
+def apply_text_search(query: Query, q: str, dialect: str, ranked: bool = True) -> Query:
+    """
+    Restrict a load query to matches for ``q`` and order by relevance
+
+    Existing filters on the query still apply; relevance is the primary sort
+    key and callers should add their usual ordering as tie-breakers. Pass
+    ``ranked=False`` to only filter, e.g. for aggregate queries.
+    """
+    if dialect == "postgresql":
+        ts_query = func.websearch_to_tsquery(TEXT_SEARCH_CONFIG, q)
+        document = search_document()
+        query = query.filter(document.op("@@")(ts_query))
+        return query.order_by(func.ts_rank(document, ts_query).desc()) if ranked else query
+
+    if dialect == "sqlite":
+        fts_query = _fts5_query(q)
+        if not fts_query:
+            return query.filter(false())
+        query = (
+            query.join(loads_fts, loads_fts.c.rowid == LoadModel.id)
+            .filter(text("loads_fts MATCH :fts_query").bindparams(fts_query=fts_query))
+        )
+        # FTS5 rank is bm25, where lower is more relevant
+        return query.order_by(loads_fts.c.rank) if ranked else query
+
+    # No full-text engine available: unranked substring match
+    pattern = f"%{q}%"
+    return query.filter(LoadModel.notes.ilike(pattern) | LoadModel.commodity_type.ilike(pattern))
@@ -0,0 +1,132 @@
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import case
+from sqlalchemy.orm import Session
+
+from app.database import dialect_insert
+from app.models.call_log import CarrierOffer
+from app.models.load import Load
+from app.models.offer_stats import LoadOfferStats
+from app.schemas.carrier import CarrierOfferLog
+
+logger = logging.getLogger(__name__)
+
+
+def _batch_stats(offers: List[CarrierOfferLog], offered_at: datetime) -> List[Dict[str, Any]]:
+    """Fold a batch into one aggregate row per load, in submission order"""
+    stats: Dict[str, Dict[str, Any]] = {}
+    for offer in offers:
+        row = stats.get(offer.load_id)
+        if row is None:
+            stats[offer.load_id] = {
+                "load_id": offer.load_id,
+                "offer_count": 1,
+                "offer_sum": offer.carrier_offer,
+                "min_offer": offer.carrier_offer,
+                "max_offer": offer.carrier_offer,
+                "last_offer": offer.carrier_offer,
+                "last_mc_number": offer.mc_number,
+                "first_offered_at": offered_at,
+                "last_offered_at": offered_at,
+            }
+            continue
+        row["offer_count"] += 1
+        row["offer_sum"] += offer.carrier_offer
+        row["min_offer"] = min(row["min_offer"], offer.carrier_offer)
+        row["max_offer"] = max(row["max_offer"], offer.carrier_offer)
+        row["last_offer"] = offer.carrier_offer
+        row["last_mc_number"] = offer.mc_number
+    return list(stats.values())
+
+
+def record_offers(db: Session, offers: List[CarrierOfferLog]) -> int:
+    """
+    Append carrier offers and fold them into the per-load aggregates
+
+    The offers are inserted with one executemany and the aggregates with one
+    multi-row upsert, in the caller's transaction.
+
+    Raises:
+        HTTPException: 404 if any offer refers to an unknown load
+    """
+    if not offers:
+        return 0
+    load_ids = {offer.load_id for offer in offers}
+    known = {row.load_id for row in db.query(Load.load_id).filter(Load.load_id.in_(load_ids))}
+    unknown = sorted(load_ids - known)
+    if unknown:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Unknown load_id: {', '.join(unknown)}")
+
+    offered_at = datetime.utcnow()
+    db.execute(CarrierOffer.__table__.insert(), [
+        {
+            "load_id": offer.load_id,
+            "mc_number": offer.mc_number,
+            "carrier_offer": offer.carrier_offer,
+            "notes": offer.notes,
+            "offered_at": offered_at,
+            "created_at": offered_at,
+        }
+        for offer in offers
+    ])
+
+    table = LoadOfferStats.__table__
+    stmt = dialect_insert(db, table).values(_batch_stats(offers, offered_at))
+    new = stmt.excluded
+    is_later = new.last_offered_at >= table.c.last_offered_at
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["load_id"],
+        set_={
+            "offer_count": table.c.offer_count + new.offer_count,
+            "offer_sum": table.c.offer_sum + new.offer_sum,
+            "min_offer": case((new.min_offer < table.c.min_offer, new.min_offer), else_=table.c.min_offer),
+            "max_offer": case((new.max_offer > table.c.max_offer, new.max_offer), else_=table.c.max_offer),
+            "last_offer": case((is_later, new.last_offer), else_=table.c.last_offer),
+            "last_mc_number": case((is_later, new.last_mc_number), else_=table.c.last_mc_number),
+            "last_offered_at": case((is_later, new.last_offered_at), else_=table.c.last_offered_at),
+        },
+    )
+    db.execute(stmt)
+    return len(offers)
+
+
+def offer_state(db: Session, load_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Current offer state for a load, from its aggregate row
+
+    Returns:
+        Aggregates with spreads against the current loadboard rate, or None if the load does not exist
+    """
+    row = (
+        db.query(Load.loadboard_rate, LoadOfferStats)
+        .outerjoin(LoadOfferStats, LoadOfferStats.load_id == Load.load_id)
+        .filter(Load.load_id == load_id)
+        .first()
+    )
+    if row is None:
+        return None
+    loadboard_rate, stats = row
+    if stats is None:
+        return {"load_id": load_id, "loadboard_rate": loadboard_rate, "offer_count": 0}
+
+    def spread(offer: float) -> float:
+        return round(offer - loadboard_rate, 2)
+
+    return {
+        "load_id": load_id,
+        "loadboard_rate": loadboard_rate,
+        "offer_count": stats.offer_count,
+        "min_offer": stats.min_offer,
+        "max_offer": stats.max_offer,
+        "avg_offer": round(stats.offer_sum / stats.offer_count, 2),
+        "last_offer": stats.last_offer,
+        "last_mc_number": stats.last_mc_number,
+        "first_offered_at": stats.first_offered_at,
+        "last_offered_at": stats.last_offered_at,
+        "min_spread": spread(stats.min_offer),
+        "max_spread": spread(stats.max_offer),
+        "last_spread": spread(stats.last_offer),
+    }
@@ -0,0 +1,50 @@
+import json
+import logging
+import zlib
+from typing import Any, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency, zlib is always available
+    zstandard = None
+
+
+def _preferred_codec() -> str:
+    codec = settings.PAYLOAD_COMPRESSION.lower()
+    if codec == "zstd" and zstandard is None:
+        logger.warning("PAYLOAD_COMPRESSION=zstd but zstandard is not installed, using zlib")
+        return "zlib"
+    if codec not in ("zstd", "zlib"):
+        raise ValueError(f"Unsupported payload compression: {settings.PAYLOAD_COMPRESSION}")
+    return codec
+
+
+def encode_payload(value: Any) -> Tuple[str, bytes, int]:
+    """
+    Serialize and compress a JSON payload
+
+    Returns:
+        Tuple of codec name, compressed bytes and uncompressed size
+    """
+    raw = json.dumps(value, separators=(",", ":"), default=str).encode("utf-8")
+    codec = _preferred_codec()
+    if codec == "zstd":
+        return codec, zstandard.ZstdCompressor(level=settings.PAYLOAD_COMPRESSION_LEVEL).compress(raw), len(raw)
+    return codec, zlib.compress(raw, settings.PAYLOAD_COMPRESSION_LEVEL), len(raw)
+
+
+def decode_payload(codec: str, data: bytes) -> Any:
+    """Decompress and parse a payload written by ``encode_payload``"""
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Payload is zstd-compressed but zstandard is not installed")
+        raw = zstandard.ZstdDecompressor().decompress(data)
+    elif codec == "zlib":
+        raw = zlib.decompress(data)
+    else:
+        raise ValueError(f"Unknown payload codec: {codec}")
+    return json.loads(raw)
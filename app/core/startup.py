@@ -0,0 +1,239 @@
+import ast
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Set, Union
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.config import settings
+from app.core.fmcsa_service import fmcsa_service
+from app.core.health_prober import health_prober
+from app.core.lane_stats import lane_stats
+from app.core.load_archival import load_archiver
+from app.core.load_notifier import ensure_change_trigger
+from app.core.load_search import ensure_search_index
+from app.database import Base, add_missing_columns, create_missing_indexes, engine, replica_engine
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_VERSIONS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "migrations", "versions"
+)
+
+# Background tasks started during boot, kept referenced until they finish
+_background_tasks: Set[asyncio.Task] = set()
+
+
+class StartupTimer:
+    """Wall-clock duration of each boot phase, from the first import to serving"""
+
+    def __init__(self):
+        self.started: Optional[float] = None
+        self.phases: Dict[str, float] = {}
+        self.total_ms: Optional[float] = None
+
+    def record(self, name: str, start: float) -> None:
+        if self.started is None or start < self.started:
+            self.started = start
+        self.phases[name] = round((time.perf_counter() - start) * 1000, 1)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start)
+
+    def finish(self) -> None:
+        if self.started is not None:
+            self.total_ms = round((time.perf_counter() - self.started) * 1000, 1)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "mode": "fast" if settings.FAST_BOOT else "full",
+            "total_ms": self.total_ms,
+            "phases_ms": dict(self.phases),
+        }
+
+
+startup_timer = StartupTimer()
+
+
+def init_schema(bind: Union[Engine, Connection]) -> None:
+    """
+    Create every table, column and index the models declare
+
+    Used on every boot outside fast-boot mode. Each step only adds what is
+    missing. Migrations keep their own copy of the DDL, so a database built
+    here matches ``alembic upgrade head`` and can be stamped at head.
+    """
+    Base.metadata.create_all(bind=bind)
+    add_missing_columns(bind)
+    create_missing_indexes(bind)
+    ensure_search_index(bind)
+    ensure_change_trigger(bind)
+
+
+def migration_heads(versions_dir: str = MIGRATIONS_VERSIONS_DIR) -> Set[str]:
+    """
+    Latest revisions in the Alembic versions directory
+
+    Reads the ``revision`` and ``down_revision`` assignments with ``ast``
+    rather than loading Alembic's script machinery, which costs more on a cold
+    start than the check itself.
+    """
+    revisions: Set[str] = set()
+    parents: Set[str] = set()
+    for name in os.listdir(versions_dir):
+        if not name.endswith(".py"):
+            continue
+        with open(os.path.join(versions_dir, name)) as f:
+            tree = ast.parse(f.read(), filename=name)
+        for node in tree.body:
+            if isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+                target, value = node.target.id, node.value
+            elif isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+                target, value = node.targets[0].id, node.value
+            else:
+                continue
+            if target == "revision":
+                revisions.add(ast.literal_eval(value))
+            elif target == "down_revision" and value is not None:
+                down = ast.literal_eval(value)
+                parents.update([down] if isinstance(down, str) else down or [])
+    return revisions - parents
+
+
+def verify_schema_revision(bind: Engine) -> str:
+    """
+    Check the database is at the latest Alembic revision without running DDL
+
+    Returns:
+        The current revision
+
+    Raises:
+        RuntimeError: If the database is behind, ahead or was never migrated
+    """
+    expected = migration_heads()
+    with bind.connect() as conn:
+        current: Set[str] = set()
+        if inspect(conn).has_table("alembic_version"):
+            current = set(conn.execute(text("SELECT version_num FROM alembic_version")).scalars())
+    if current != expected:
+        raise RuntimeError(
+            f"Database schema is at revision {', '.join(sorted(current)) or 'none'}, "
+            f"expected {', '.join(sorted(expected))}; run `alembic upgrade head` before booting with FAST_BOOT"
+        )
+    return ", ".join(sorted(current))
+
+
+def prewarm_db_pool(bind: Engine, connections: int) -> int:
+    """
+    Open pool connections concurrently so the first requests skip connect and auth
+
+    Returns:
+        Number of connections opened and returned to the pool
+    """
+    size = getattr(bind.pool, "size", None)
+    if callable(size):
+        connections = min(connections, size())
+    if connections <= 0:
+        return 0
+
+    def connect(_: int) -> Connection:
+        conn = bind.connect()
+        conn.execute(text("SELECT 1"))
+        return conn
+
+    with ThreadPoolExecutor(max_workers=connections) as pool:
+        opened = list(pool.map(connect, range(connections)))
+    for conn in opened:
+        conn.close()
+    return len(opened)
+
+
+def _timed(name: str, fn: Callable[..., Any], *args: Any) -> Any:
+    start = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        startup_timer.record(name, start)
+
+
+def _spawn(coro: Awaitable[Any]) -> None:
+    task = asyncio.ensure_future(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def _prewarm_http() -> None:
+    start = time.perf_counter()
+    reachable = await fmcsa_service.prewarm()
+    startup_timer.record("http_client", start)
+    logger.info("FMCSA client prewarmed", extra={"reachable": reachable, "elapsed_ms": startup_timer.phases["http_client"]})
+
+
+async def _start_later(delay: float, start: Callable[[], Awaitable[None]]) -> None:
+    await asyncio.sleep(delay)
+    await start()
+
+
+async def boot() -> None:
+    """
+    Prepare the database and background jobs before serving
+
+    In fast-boot mode the schema is only checked against the Alembic head,
+    the revision check and pool prewarm run in parallel with the outbound
+    FMCSA connection, and the carrier refresh scheduler, load archiver and
+    lane statistics warm-up start after ``FAST_BOOT_DEFER_SECONDS`` instead
+    of competing with the first requests.
+    """
+    if settings.FAST_BOOT:
+        if settings.FAST_BOOT_PREWARM_HTTP:
+            _spawn(_prewarm_http())
+        with startup_timer.phase("prewarm"):
+            steps = [
+                asyncio.to_thread(_timed, "schema_check", verify_schema_revision, engine),
+                asyncio.to_thread(_timed, "db_pool", prewarm_db_pool, engine, settings.FAST_BOOT_DB_PREWARM_CONNECTIONS),
+            ]
+            if replica_engine is not engine:
+                steps.append(asyncio.to_thread(
+                    _timed, "replica_pool", prewarm_db_pool, replica_engine, settings.FAST_BOOT_DB_PREWARM_CONNECTIONS))
+            await asyncio.gather(*steps)
+        if settings.CARRIER_REFRESH_ENABLED:
+            from app.core.carrier_refresh import carrier_refresh_scheduler
+            _spawn(_start_later(settings.FAST_BOOT_DEFER_SECONDS, carrier_refresh_scheduler.start))
+        if settings.LOAD_ARCHIVE_ENABLED:
+            _spawn(_start_later(settings.FAST_BOOT_DEFER_SECONDS, load_archiver.start))
+        _spawn(_start_later(settings.FAST_BOOT_DEFER_SECONDS, lane_stats.warm))
+    else:
+        with startup_timer.phase("schema"):
+            init_schema(engine)
+        with startup_timer.phase("background_jobs"):
+            if settings.CARRIER_REFRESH_ENABLED:
+                from app.core.carrier_refresh import carrier_refresh_scheduler
+                await carrier_refresh_scheduler.start()
+            if settings.LOAD_ARCHIVE_ENABLED:
+                await load_archiver.start()
+            # Lane statistics build in a background thread; rate guidance waits for it only if asked first
+            await lane_stats.warm()
+
+    # First round runs in the background; /health/ready answers 503 until it completes
+    health_prober.start()
+
+    startup_timer.finish()
+    logger.info("Startup complete", extra=startup_timer.report())
+
+
+async def shutdown() -> None:
+    """Stop the health prober, cancel boot-time background tasks and close the shared FMCSA client"""
+    await health_prober.stop()
+    for task in list(_background_tasks):
+        task.cancel()
+    await fmcsa_service.aclose()
@@ -0,0 +1,261 @@
+import base64
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set
+from urllib.parse import parse_qsl, urlencode
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Stands in for secrets in captured traffic; the replay tool substitutes its own API key
+REDACTED = "__REDACTED__"
+
+CAPTURED_HEADERS = {"accept", "accept-encoding", "authorization", "content-type", "user-agent", "x-session-id"}
+SECRET_HEADERS = {"authorization"}
+SECRET_QUERY_PARAMS = {"api_key"}
+
+capture_stats: Dict[str, int] = {
+    "captured": 0,
+    "dropped": 0,
+    "truncated_bodies": 0,
+    "bytes_written": 0,
+}
+# Request threads and the writer thread both update the counters
+_stats_lock = threading.Lock()
+
+
+def _count(key: str, amount: int = 1) -> None:
+    with _stats_lock:
+        capture_stats[key] += amount
+
+
+def redact(value: Any, fields: Set[str]) -> Any:
+    """Replace the values of sensitive keys anywhere in a JSON document"""
+    if isinstance(value, dict):
+        return {key: REDACTED if key.lower() in fields else redact(item, fields) for key, item in value.items()}
+    if isinstance(value, list):
+        return [redact(item, fields) for item in value]
+    return value
+
+
+def sanitize_body(body: bytes, content_type: str, fields: Set[str]) -> Dict[str, Any]:
+    """
+    Captured form of a request body
+
+    JSON bodies are stored parsed, with sensitive fields redacted; other text
+    is stored as is and binary bodies as base64.
+    """
+    if not body:
+        return {}
+    if "json" in content_type:
+        try:
+            return {"json": redact(json.loads(body), fields)}
+        except ValueError:
+            pass
+    try:
+        return {"text": body.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"b64": base64.b64encode(body).decode("ascii")}
+
+
+def sanitize_query(query_string: bytes) -> str:
+    params = parse_qsl(query_string.decode("latin-1"), keep_blank_values=True)
+    return urlencode([(key, REDACTED if key in SECRET_QUERY_PARAMS else value) for key, value in params])
+
+
+class CaptureWriter:
+    """
+    Append capture records to a JSON Lines file from a background thread
+
+    Request handling only enqueues; when the queue is full or the file has
+    reached ``max_file_bytes`` records are dropped and counted.
+    """
+
+    def __init__(self, path: str, max_file_bytes: int, queue_size: int):
+        self.path = path
+        self.max_file_bytes = max_file_bytes
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._thread = threading.Thread(target=self._run, name="traffic-capture", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Write out everything queued, then stop the writer thread"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, record: Dict[str, Any]) -> None:
+        self.start()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            _count("dropped")
+
+    def stats(self) -> Dict[str, Any]:
+        with _stats_lock:
+            stats = dict(capture_stats)
+        return {
+            **stats,
+            "queued": self._queue.qsize(),
+            "running": self._thread is not None and self._thread.is_alive(),
+        }
+
+    def _run(self) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            size = f.tell()
+            while True:
+                record = self._queue.get()
+                if record is None:
+                    return
+                batch = [record]
+                # Drain whatever else is ready so bursts cost one flush
+                while len(batch) < 256:
+                    try:
+                        record = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if record is None:
+                        self._write(f, batch, size)
+                        return
+                    batch.append(record)
+                size = self._write(f, batch, size)
+
+    def _write(self, f, batch: List[Dict[str, Any]], size: int) -> int:
+        for record in batch:
+            line = json.dumps(record, separators=(",", ":"), default=str) + "\n"
+            if size + len(line) > self.max_file_bytes:
+                _count("dropped")
+                continue
+            f.write(line)
+            size += len(line)
+            _count("captured")
+            _count("bytes_written", len(line))
+        f.flush()
+        return size
+
+
+class TrafficCaptureMiddleware:
+    """
+    Record sanitized API traffic for replay
+
+    For each request under ``/api/`` (minus the excluded paths) records the
+    arrival time, method, route template, path, query string, a whitelisted
+    subset of headers, the body up to ``max_body_bytes``, the response status
+    and size, and the server-side latency to the last response byte. API
+    keys and the configured body fields are replaced with ``REDACTED``.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        writer: CaptureWriter,
+        max_body_bytes: int = 65536,
+        sample_rate: float = 1.0,
+        excluded_paths: Iterable[str] = (),
+        redact_fields: Iterable[str] = (),
+    ):
+        self.app = app
+        self.writer = writer
+        self.max_body_bytes = max_body_bytes
+        self.sample_rate = sample_rate
+        self.excluded_paths = tuple(excluded_paths)
+        self.redact_fields = {field.lower() for field in redact_fields}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        if (
+            scope["type"] != "http"
+            or not path.startswith("/api/")
+            or path.startswith(self.excluded_paths)
+            or (self.sample_rate < 1 and random.random() >= self.sample_rate)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.time()
+        started = time.perf_counter()
+        body = bytearray()
+        truncated = False
+        response = {"status": 0, "bytes": 0}
+
+        async def capture_receive() -> Message:
+            nonlocal truncated
+            message = await receive()
+            if message["type"] == "http.request":
+                chunk = message.get("body", b"")
+                room = self.max_body_bytes - len(body)
+                if len(chunk) > room:
+                    truncated = True
+                body.extend(chunk[:max(room, 0)])
+            return message
+
+        async def capture_send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, capture_receive, capture_send)
+        finally:
+            self._record(scope, started_at, started, bytes(body), truncated, response)
+
+    def _record(self, scope: Scope, started_at: float, started: float, body: bytes, truncated: bool, response: Dict[str, int]) -> None:
+        headers = {}
+        for raw_name, raw_value in scope.get("headers", []):
+            name = raw_name.decode("latin-1").lower()
+            if name in CAPTURED_HEADERS:
+                headers[name] = REDACTED if name in SECRET_HEADERS else raw_value.decode("latin-1")
+        route = scope.get("route")
+        record = {
+            "t": round(started_at, 6),
+            "method": scope["method"],
+            "route": getattr(route, "path", None),
+            "path": scope["path"],
+            "query": sanitize_query(scope.get("query_string", b"")),
+            "headers": headers,
+            "status": response["status"],
+            "ms": round((time.perf_counter() - started) * 1000, 3),
+            "response_bytes": response["bytes"],
+            **sanitize_body(body, headers.get("content-type", ""), self.redact_fields),
+        }
+        if truncated:
+            record["truncated"] = True
+            _count("truncated_bodies")
+        self.writer.submit(record)
+
+
+traffic_capture_writer = CaptureWriter(
+    path=settings.TRAFFIC_CAPTURE_PATH,
+    max_file_bytes=settings.TRAFFIC_CAPTURE_MAX_FILE_BYTES,
+    queue_size=settings.TRAFFIC_CAPTURE_QUEUE_SIZE,
+)
+
+
+def read_capture(path: str) -> List[Dict[str, Any]]:
+    """Records from a capture file in arrival order, skipping a torn last line"""
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return sorted(records, key=lambda record: record["t"])
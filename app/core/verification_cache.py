@@ -0,0 +1,211 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional, Union
+
+
+class CacheEntry(NamedTuple):
+    value: Dict[str, Any]  # Serialized CarrierVerificationResponse
+    expires_at: float  # Unix timestamp
+
+
+class InMemoryVerificationCache:
+    """Per-process LRU cache of carrier verifications with a time-to-live"""
+
+    # Operations only take an in-process lock, so async callers may call them directly
+    blocking = False
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Return the live entry for a key, counting the lookup as a hit or miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= time.time():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def peek(self, key: str) -> Optional[CacheEntry]:
+        """Return an entry, even if expired, without affecting hit statistics or recency"""
+        with self._lock:
+            return self._entries.get(key)
+
+    def set(self, key: str, value: Dict[str, Any]) -> CacheEntry:
+        entry = CacheEntry(value=value, expires_at=time.time() + self.ttl_seconds)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "memory",
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+class SQLiteVerificationCache:
+    """
+    Carrier verifications shared by every worker process on the host
+
+    Entries live in a SQLite database in WAL mode, so any number of processes
+    can read while one writes and a verification fetched by one worker is a
+    hit for all of them. Each thread of each process keeps its own
+    connection. Reads never write: when the cache outgrows ``max_entries``
+    the entries closest to expiry (the least recently fetched) are evicted,
+    checked every ``trim_every`` writes, so the size can briefly overshoot by
+    that many entries per worker. Hit and miss counts are per process.
+
+    Every operation is blocking file I/O that can wait up to the 5 second
+    busy timeout on another worker's write, so async callers must run them
+    in a thread (see ``FMCSAService.cache_op``).
+    """
+
+    blocking = True
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS verifications ("
+        " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS ix_verifications_expires_at ON verifications (expires_at)",
+    )
+
+    def __init__(self, path: str, ttl_seconds: float, max_entries: int, trim_every: int = 32):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.trim_every = trim_every
+        self._local = threading.local()
+        # Guards the counters, which are updated from threadpool threads
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        for statement in self.SCHEMA:
+            conn.execute(statement)
+
+    def _connection(self) -> sqlite3.Connection:
+        # Connections must not cross threads, nor survive a fork into a worker
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _read(self, key: str) -> Optional[CacheEntry]:
+        row = self._connection().execute(
+            "SELECT value, expires_at FROM verifications WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return CacheEntry(value=json.loads(row[0]), expires_at=row[1])
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Return the live entry for a key, counting the lookup as a hit or miss"""
+        entry = self._read(key)
+        live = entry is not None and entry.expires_at > time.time()
+        with self._lock:
+            if live:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return entry if live else None
+
+    def peek(self, key: str) -> Optional[CacheEntry]:
+        """Return an entry, even if expired, without affecting hit statistics"""
+        return self._read(key)
+
+    def set(self, key: str, value: Dict[str, Any]) -> CacheEntry:
+        entry = CacheEntry(value=value, expires_at=time.time() + self.ttl_seconds)
+        conn = self._connection()
+        conn.execute(
+            "INSERT INTO verifications (key, value, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at",
+            (key, json.dumps(value), entry.expires_at),
+        )
+        with self._lock:
+            self._writes += 1
+            due = self._writes % self.trim_every == 0
+        if due:
+            self.trim()
+        return entry
+
+    def trim(self) -> int:
+        """Drop expired entries, then the soonest-expiring ones beyond ``max_entries``"""
+        conn = self._connection()
+        removed = conn.execute("DELETE FROM verifications WHERE expires_at <= ?", (time.time(),)).rowcount
+        excess = conn.execute("SELECT COUNT(*) FROM verifications").fetchone()[0] - self.max_entries
+        if excess > 0:
+            removed += conn.execute(
+                "DELETE FROM verifications WHERE key IN "
+                "(SELECT key FROM verifications ORDER BY expires_at LIMIT ?)",
+                (excess,),
+            ).rowcount
+        with self._lock:
+            self.evictions += removed
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "entries": self._connection().execute("SELECT COUNT(*) FROM verifications").fetchone()[0],
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "pid": os.getpid(),
+        }
+
+
+VerificationCache = Union[InMemoryVerificationCache, SQLiteVerificationCache]
+
+
+def create_verification_cache(backend: str, ttl_seconds: float, max_entries: int, path: str) -> VerificationCache:
+    """
+    Build the configured verification cache backend
+
+    Args:
+        backend: "memory" for a per-process cache, "sqlite" for one shared by all workers
+        ttl_seconds: How long a verification stays fresh
+        max_entries: Size bound
+        path: Database file for the sqlite backend
+
+    Raises:
+        ValueError: For an unknown backend
+    """
+    if backend == "memory":
+        return InMemoryVerificationCache(ttl_seconds=ttl_seconds, max_entries=max_entries)
+    if backend == "sqlite":
+        return SQLiteVerificationCache(path=path, ttl_seconds=ttl_seconds, max_entries=max_entries)
+    raise ValueError(f"Unknown verification cache backend: {backend!r}")
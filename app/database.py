@@ -1,26 +1,221 @@
-from sqlalchemy import create_engine
+import logging
+import threading
+import time
+from contextlib import nullcontext
+from typing import ContextManager, Dict, Optional, Set, Union
+
+from fastapi import Request
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Connection, Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from app.config import settings
 
 # Create database engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    echo=settings.ENVIRONMENT == "development",
+engine = create_engine(settings.DATABASE_URL, echo=False)
+
+# Read replica engine, falling back to the primary when no replica is configured
+replica_engine = (
+    create_engine(settings.DATABASE_REPLICA_URL, echo=False)
+    if settings.DATABASE_REPLICA_URL
+    else engine
 )
 
-# Create session factory
+# SQL logging goes through the app's log pipeline: echo=True would attach its own
+# stdout handler on top of the root one and write every statement twice
+if settings.ENVIRONMENT == "development":
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO)
+
+# Create session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine, info={"read_only": True})
 
 # Create base class for models
 Base = declarative_base()
 
 
+class RecentWrites:
+    """
+    Clients that committed a write within the read-your-writes window
+
+    Kept per process, so with several workers a client is pinned to the
+    primary only by the worker that handled its write.
+    """
+
+    def __init__(self, window_seconds: float):
+        self.window_seconds = window_seconds
+        self._written_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, client_key: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._written_at[client_key] = now
+            if len(self._written_at) > 10000:
+                cutoff = now - self.window_seconds
+                self._written_at = {k: t for k, t in self._written_at.items() if t >= cutoff}
+
+    def is_recent(self, client_key: Optional[str]) -> bool:
+        if client_key is None or self.window_seconds <= 0:
+            return False
+        written_at = self._written_at.get(client_key)
+        return written_at is not None and time.monotonic() - written_at < self.window_seconds
+
+
+recent_writes = RecentWrites(settings.READ_YOUR_WRITES_SECONDS)
+read_routing_counts = {"replica": 0, "primary": 0, "pinned_to_primary": 0}
+# Sync handlers run on threadpool threads, so the counters are updated under a lock
+_read_routing_lock = threading.Lock()
+
+
+def _count_read(route: str) -> None:
+    with _read_routing_lock:
+        read_routing_counts[route] += 1
+
+
+def read_routing_stats() -> Dict[str, int]:
+    with _read_routing_lock:
+        return dict(read_routing_counts)
+
+
+def client_key(request: Optional[Request]) -> Optional[str]:
+    """
+    Identify a client for read-your-writes by its X-Session-ID header
+
+    The client address is not used: behind a load balancer or NAT many
+    clients share one, and a single write would pin all of them to the
+    primary. Clients without the header are never pinned.
+    """
+    if request is None:
+        return None
+    return request.headers.get("X-Session-ID") or None
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _flag_writes(session, flush_context):
+    session.info["has_writes"] = True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _remember_write(session):
+    # Marked at commit rather than after the response, so a client's next
+    # request already sees itself pinned
+    if session.info.pop("has_writes", False) and session.info.get("client_key"):
+        recent_writes.mark(session.info["client_key"])
+
+
+@event.listens_for(ReadSessionLocal, "before_flush")
+def _reject_replica_writes(session, flush_context, instances):
+    if session.new or session.dirty or session.deleted:
+        raise RuntimeError("Read-only session used for a write; depend on get_db instead of get_read_db")
+
+
 # Dependency to get database session
-def get_db():
+def get_db(request: Request = None):
     db = SessionLocal()
+    db.info["client_key"] = client_key(request)
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close() 
+
+
+def get_read_db(request: Request = None):
+    """
+    Session for read-only handlers, served by the replica
+
+    Clients that wrote within READ_YOUR_WRITES_SECONDS, identified by their
+    X-Session-ID header, read from the primary so they see their own writes
+    despite replication lag.
+    """
+    if replica_engine is engine:
+        _count_read("primary")
+        db = ReadSessionLocal()
+    elif recent_writes.is_recent(client_key(request)):
+        _count_read("pinned_to_primary")
+        db = SessionLocal()
+    else:
+        _count_read("replica")
+        db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def ddl_transaction(bind: Union[Engine, Connection]) -> ContextManager[Connection]:
+    """
+    Connection to run schema changes on
+
+    An engine gets its own transaction; a connection (e.g. inside an Alembic
+    migration) is used as is, in whatever transaction it already has.
+    """
+    if isinstance(bind, Engine):
+        return bind.begin()
+    return nullcontext(bind)
+
+
+def add_missing_columns(bind) -> None:
+    """
+    Add model columns that ``create_all`` skipped because their table already existed
+
+    Only nullable columns or columns with a server default can be added this
+    way; anything else needs a real migration.
+    """
+    from sqlalchemy import inspect
+    from sqlalchemy.schema import CreateColumn
+
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    with ddl_transaction(bind) as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = CreateColumn(column).compile(dialect=bind.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+
+
+def partitioned_tables(bind: Union[Engine, Connection]) -> Set[str]:
+    """Names of partitioned parent tables; always empty outside Postgres"""
+    if bind.dialect.name != "postgresql":
+        return set()
+    query = text("SELECT c.relname FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid")
+    if isinstance(bind, Engine):
+        with bind.connect() as conn:
+            return set(conn.execute(query).scalars())
+    return set(bind.execute(query).scalars())
+
+
+def create_missing_indexes(bind) -> None:
+    """
+    Create model indexes that ``create_all`` skipped because their table already existed
+
+    Partitioned tables are skipped: their indexes are created with the
+    partitioning (see ``convert_to_partitioned``), and Postgres rejects the
+    model's unique indexes there since they lack the partition key.
+    """
+    skipped = partitioned_tables(bind)
+    for table in Base.metadata.sorted_tables:
+        if table.name in skipped:
+            continue
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+
+
+def dialect_insert(db, table):
+    """
+    Return an INSERT construct that supports ``on_conflict_do_update``
+    for the database behind the given session
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upserts are not supported on {dialect}")
+    return insert(table)
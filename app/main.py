@@ -1,11 +1,27 @@
+import time
+
+_boot_started = time.perf_counter()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 
 from app.config import settings
-from app.api import health, auth, carriers, loads, offers
-from app.database import engine, Base
-from app.models import load, call_log  # Import models to register them
+from app.core.logging_config import setup_logging, stop_logging
+from app.api import health, auth, carriers, loads, offers, analytics
+from app.core.dashboard_feed import dashboard_feed
+from app.core.load_archival import load_archiver
+from app.core.load_notifier import load_change_notifier
+from app.core.startup import boot, shutdown, startup_timer
+from app.models import load, call_log, call_stats, offer_stats  # Import models to register them
+
+setup_logging(
+    level=settings.LOG_LEVEL,
+    fmt=settings.LOG_FORMAT,
+    queue_size=settings.LOG_QUEUE_SIZE,
+    sample_rates=settings.LOG_SAMPLE_RATES,
+)
+startup_timer.record("imports", _boot_started)
 
 # Create FastAPI application
 app = FastAPI(
@@ -17,8 +33,24 @@ app = FastAPI(
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database tables on startup"""
-    Base.metadata.create_all(bind=engine)
+    """Initialize database tables (or verify them, in fast-boot mode) and background jobs"""
+    await boot()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background watchers"""
+    await load_change_notifier.stop()
+    await dashboard_feed.stop()
+    if settings.CARRIER_REFRESH_ENABLED:
+        from app.core.carrier_refresh import carrier_refresh_scheduler
+        await carrier_refresh_scheduler.stop()
+    await load_archiver.stop()
+    await shutdown()
+    if settings.TRAFFIC_CAPTURE_ENABLED:
+        from app.core.traffic_capture import traffic_capture_writer
+        traffic_capture_writer.stop()
+    stop_logging()
 
 # Add security middleware for production
 if settings.ENVIRONMENT == "production":
@@ -37,12 +69,40 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_headers=["*"],
     )
 
+# Optional middleware is imported only when enabled, so turning it off also skips the import
+
+# Compress large responses (dashboard, call logs, exports); added last so it wraps the rest of the stack
+if settings.COMPRESSION_ENABLED:
+    from app.core.compression import CompressionMiddleware
+
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        excluded_paths=settings.COMPRESSION_EXCLUDED_PATHS,
+    )
+
+# Record sanitized traffic for replay; outermost, so latencies cover the whole stack
+if settings.TRAFFIC_CAPTURE_ENABLED:
+    from app.core.traffic_capture import TrafficCaptureMiddleware, traffic_capture_writer
+
+    app.add_middleware(
+        TrafficCaptureMiddleware,
+        writer=traffic_capture_writer,
+        max_body_bytes=settings.TRAFFIC_CAPTURE_MAX_BODY_BYTES,
+        sample_rate=settings.TRAFFIC_CAPTURE_SAMPLE_RATE,
+        excluded_paths=settings.TRAFFIC_CAPTURE_EXCLUDED_PATHS,
+        redact_fields=settings.TRAFFIC_CAPTURE_REDACT_FIELDS,
+    )
+
 # Include API routes
 app.include_router(health.router, tags=["health"])
 app.include_router(auth.router, prefix=f"{settings.API_V1_STR}/auth", tags=["api-key-validation"])
 app.include_router(carriers.router, prefix=f"{settings.API_V1_STR}/carriers", tags=["carriers"])
 app.include_router(loads.router, prefix=f"{settings.API_V1_STR}/loads", tags=["loads"])
 app.include_router(offers.router, prefix=f"{settings.API_V1_STR}/offers", tags=["offers"])
+app.include_router(analytics.router, prefix=f"{settings.API_V1_STR}/analytics", tags=["analytics"])
 
 @app.get("/")
 async def root():
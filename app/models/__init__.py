@@ -1,5 +1,7 @@
 # Database models package
 from .load import Load
-from .call_log import CallLog, CarrierOffer
+from .call_log import CallLog, CallLogPayload, CarrierOffer
+from .call_stats import CallStatsBucket, CallStatsCarrierBucket, CallStatsLaneBucket
+from .offer_stats import LoadOfferStats
 
-__all__ = ["Load", "CallLog", "CarrierOffer"] 
\ No newline at end of file
+__all__ = ["Load", "CallLog", "CallLogPayload", "CarrierOffer", "CallStatsBucket", "CallStatsLaneBucket", "CallStatsCarrierBucket", "LoadOfferStats"] 
\ No newline at end of file
@@ -1,6 +1,8 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, JSON, LargeBinary
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 from app.database import Base
+from app.core.payload_codec import decode_payload, encode_payload
 
 
 class CallLog(Base):
@@ -17,10 +19,48 @@ class CallLog(Base):
     agreed_rate = Column(Float)  # Final agreed upon rate
     call_outcome_classification = Column(String)  # e.g., "Booked", "Rejected - Price", "No Interest"
     carrier_sentiment_classification = Column(String)  # e.g., "Positive", "Negative", "Neutral"
-    raw_extracted_data_json = Column(JSON)  # Full extracted data from HappyRobot
+    raw_extracted_data_json = deferred(Column(JSON))  # Legacy inline payload, new payloads go to call_log_payloads
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
 
+    payload = relationship(
+        "CallLogPayload",
+        primaryjoin="CallLog.id == foreign(CallLogPayload.call_log_id)",
+        uselist=False,
+        lazy="select",
+        cascade="all, delete-orphan",
+    )
+
+    @property
+    def raw_extracted_data(self):
+        """Full extracted data from HappyRobot, loaded and decompressed on access"""
+        if self.payload is not None:
+            return self.payload.value
+        return self.raw_extracted_data_json
+
+    @raw_extracted_data.setter
+    def raw_extracted_data(self, value):
+        self.payload = CallLogPayload.from_value(value) if value is not None else None
+
+
+class CallLogPayload(Base):
+    __tablename__ = "call_log_payloads"
+
+    # No foreign key: a partitioned call_logs has no unique constraint on id alone
+    call_log_id = Column(Integer, primary_key=True)
+    codec = Column(String, nullable=False)  # "zlib" or "zstd"
+    data = Column(LargeBinary, nullable=False)  # Compressed JSON
+    raw_size = Column(Integer)  # Uncompressed size in bytes
+
+    @classmethod
+    def from_value(cls, value) -> "CallLogPayload":
+        codec, data, raw_size = encode_payload(value)
+        return cls(codec=codec, data=data, raw_size=raw_size)
+
+    @property
+    def value(self):
+        return decode_payload(self.codec, self.data)
+
 
 class CarrierOffer(Base):
     __tablename__ = "carrier_offers"
@@ -31,4 +71,4 @@ class CarrierOffer(Base):
     carrier_offer = Column(Float, nullable=False)
     notes = Column(Text)
     offered_at = Column(DateTime, default=func.now())
-    created_at = Column(DateTime, default=func.now()) 
\ No newline at end of file
+    created_at = Column(DateTime, default=func.now())
@@ -0,0 +1,80 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, UniqueConstraint
+from app.database import Base
+
+
+# Dimension columns that make up a bucket's identity in each rollup. Values are
+# normalized when written (see call_analytics.normalize_dimension); empty
+# string stands in for unknown. Each key only holds the dimensions its queries
+# filter or group by, so rows aggregate many calls.
+BUCKET_KEY_COLUMNS = [
+    "granularity",
+    "bucket_start",
+    "equipment_type",
+    "call_outcome_classification",
+    "carrier_sentiment_classification",
+]
+# Leading with the lane keeps one lane's buckets together for lane filters
+LANE_BUCKET_KEY_COLUMNS = [
+    "granularity",
+    "origin",
+    "destination",
+    "bucket_start",
+    "equipment_type",
+    "carrier_sentiment_classification",
+]
+CARRIER_BUCKET_KEY_COLUMNS = [
+    "granularity",
+    "mc_number",
+    "bucket_start",
+    "carrier_sentiment_classification",
+]
+
+
+class CallStatsMeasures:
+    """Additive measures shared by every call stats rollup"""
+
+    id = Column(Integer, primary_key=True, index=True)
+    granularity = Column(String, nullable=False)  # "hour", "day" or "week"
+    bucket_start = Column(DateTime, nullable=False, index=True)  # Start of the time bucket
+    carrier_sentiment_classification = Column(String, nullable=False, default="")
+    calls = Column(Integer, nullable=False, default=0)
+    booked_calls = Column(Integer, nullable=False, default=0)
+    agreed_rate_sum = Column(Float, nullable=False, default=0.0)
+    agreed_rate_count = Column(Integer, nullable=False, default=0)
+    loadboard_rate_sum = Column(Float, nullable=False, default=0.0)  # Loadboard rate for calls with an agreed rate
+    loadboard_rate_count = Column(Integer, nullable=False, default=0)
+    negotiation_rounds_sum = Column(Integer, nullable=False, default=0)
+    negotiation_rounds_count = Column(Integer, nullable=False, default=0)
+
+
+class CallStatsBucket(CallStatsMeasures, Base):
+    """Calls per time bucket, equipment, outcome and sentiment"""
+    __tablename__ = "call_stats_buckets"
+    __table_args__ = (
+        UniqueConstraint(*BUCKET_KEY_COLUMNS, name="uq_call_stats_bucket"),
+    )
+
+    equipment_type = Column(String, nullable=False, default="")  # Equipment from the searched load
+    call_outcome_classification = Column(String, nullable=False, default="")
+
+
+class CallStatsLaneBucket(CallStatsMeasures, Base):
+    """Calls per time bucket and lane of the searched load"""
+    __tablename__ = "call_stats_lane_buckets"
+    __table_args__ = (
+        UniqueConstraint(*LANE_BUCKET_KEY_COLUMNS, name="uq_call_stats_lane_bucket"),
+    )
+
+    origin = Column(String, nullable=False, default="")  # Lane origin from the searched load
+    destination = Column(String, nullable=False, default="")  # Lane destination from the searched load
+    equipment_type = Column(String, nullable=False, default="")
+
+
+class CallStatsCarrierBucket(CallStatsMeasures, Base):
+    """Calls per time bucket and carrier"""
+    __tablename__ = "call_stats_carrier_buckets"
+    __table_args__ = (
+        UniqueConstraint(*CARRIER_BUCKET_KEY_COLUMNS, name="uq_call_stats_carrier_bucket"),
+    )
+
+    mc_number = Column(String, nullable=False, default="")
@@ -1,8 +1,15 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Index, literal_column, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 from app.database import Base
 
+AVAILABLE_STATUS = "available"
+BOOKED_STATUS = "booked"
+EXPIRED_STATUS = "expired"  # Archived without being booked
+# Written as a literal so the query planner can match it to the partial index predicate
+AVAILABLE_PREDICATE = f"status = '{AVAILABLE_STATUS}'"
+BOOKED_PREDICATE = f"status = '{BOOKED_STATUS}'"
+
 
 class Load(Base):
     __tablename__ = "loads"
@@ -21,5 +28,88 @@ class Load(Base):
     num_of_pieces = Column(Integer)  # Number of items
     miles = Column(Float)  # Distance to travel
     dimensions = Column(String)  # Size measurements
+    status = Column(String, nullable=False, default=AVAILABLE_STATUS, server_default=AVAILABLE_STATUS)  # available or booked
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # Bumped on booking, for optimistic locking
+    booked_by_mc = Column(String)  # MC number of the carrier that booked the load
+    booked_rate = Column(Float)  # Agreed rate at booking
+    booked_at = Column(DateTime)
     created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now()) 
\ No newline at end of file
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # Matches search_loads' available-only filter and ORDER BY, so results come from the index without a sort
+        Index(
+            "ix_loads_available_pickup_rate",
+            pickup_datetime,
+            loadboard_rate.desc(),
+            postgresql_where=text(AVAILABLE_PREDICATE),
+            sqlite_where=text(AVAILABLE_PREDICATE),
+        ),
+        Index("ix_loads_delivery", delivery_datetime),
+        # Lets the archival job find booked loads past their retention without scanning the board
+        Index(
+            "ix_loads_booked_at",
+            booked_at,
+            postgresql_where=text(BOOKED_PREDICATE),
+            sqlite_where=text(BOOKED_PREDICATE),
+        ),
+    )
+
+
+class LoadArchive(Base):
+    """Loads moved off the board by the archival job once expired or booked; same columns as loads"""
+    __tablename__ = "loads_archive"
+
+    load_id = Column(String, primary_key=True)  # Unique identifier
+    id = Column(Integer, nullable=False)  # Row id the load had in loads
+    origin = Column(String, nullable=False)
+    destination = Column(String, nullable=False)
+    pickup_datetime = Column(DateTime, nullable=False)
+    delivery_datetime = Column(DateTime, nullable=False)
+    equipment_type = Column(String, nullable=False)
+    loadboard_rate = Column(Float, nullable=False)
+    notes = Column(Text)
+    weight = Column(Float)
+    commodity_type = Column(String)
+    num_of_pieces = Column(Integer)
+    miles = Column(Float)
+    dimensions = Column(String)
+    status = Column(String, nullable=False)  # booked or expired
+    version = Column(Integer, nullable=False)
+    booked_by_mc = Column(String)
+    booked_rate = Column(Float)
+    booked_at = Column(DateTime)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    archived_at = Column(DateTime, nullable=False, index=True)
+
+
+def load_is_available():
+    """Filter for loads still open for booking, in the form the partial index expects"""
+    return Load.status == literal_column(f"'{AVAILABLE_STATUS}'")
+
+
+def any_load_column(name: str):
+    """
+    A load column from whichever of loads and loads_archive holds the load
+
+    For queries joined with ``join_any_load``, so call history keeps its
+    lane and rate details after the load is archived.
+    """
+    return func.coalesce(getattr(Load, name), getattr(LoadArchive, name)).label(name)
+
+
+def join_any_load(statement, load_id_column):
+    """Outer-join a statement to both loads and loads_archive on ``load_id_column``"""
+    return (
+        statement.outerjoin(Load, Load.load_id == load_id_column)
+        .outerjoin(LoadArchive, LoadArchive.load_id == load_id_column)
+    )
+
+
+def find_any_load(db, load_id: str):
+    """The load with this ID from the board, or else from the archive"""
+    return (
+        db.query(Load).filter(Load.load_id == load_id).first()
+        or db.query(LoadArchive).filter(LoadArchive.load_id == load_id).first()
+    )
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime
+from app.database import Base
+
+
+class LoadOfferStats(Base):
+    __tablename__ = "load_offer_stats"
+
+    load_id = Column(String, primary_key=True)  # One row per load with offers
+    offer_count = Column(Integer, nullable=False, default=0)
+    offer_sum = Column(Float, nullable=False, default=0.0)  # For the average offer
+    min_offer = Column(Float, nullable=False)
+    max_offer = Column(Float, nullable=False)
+    last_offer = Column(Float, nullable=False)
+    last_mc_number = Column(String, nullable=False)
+    first_offered_at = Column(DateTime, nullable=False)
+    last_offered_at = Column(DateTime, nullable=False)
@@ -0,0 +1,16 @@
+from datetime import datetime
+from typing import Dict, Optional
+from pydantic import BaseModel, Field
+
+
+class CallStatsBucketResponse(BaseModel):
+    bucket_start: datetime = Field(..., description="Start of the time bucket")
+    origin: Optional[str] = Field(None, description="Lane origin (when grouped by lane)")
+    destination: Optional[str] = Field(None, description="Lane destination (when grouped by lane)")
+    calls: int = Field(..., description="Number of calls in the bucket")
+    booked_calls: int = Field(..., description="Number of booked calls")
+    booking_rate: float = Field(..., description="Booked calls as a percentage of calls")
+    avg_agreed_rate: Optional[float] = Field(None, description="Average agreed rate")
+    avg_loadboard_rate: Optional[float] = Field(None, description="Average loadboard rate for calls with an agreed rate")
+    avg_negotiation_rounds: Optional[float] = Field(None, description="Average number of negotiation rounds")
+    sentiment_mix: Dict[str, int] = Field(..., description="Call count per carrier sentiment")
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Dict, List
 from pydantic import BaseModel, Field
 
 
@@ -9,6 +9,8 @@ class CarrierVerificationResponse(BaseModel):
     status: str = Field(..., description="Verification status: ACTIVE, FAIL, SUSPENDED, INACTIVE, UNREGISTERED")
     dot_number: Optional[str] = Field(None, description="DOT number from FMCSA")
     mc_number: Optional[str] = Field(None, description="MC number")
+    source: Optional[str] = Field(None, description="Where the verdict came from: fmcsa_api or census")
+    snapshot_age_seconds: Optional[float] = Field(None, description="Age of the census snapshot, for census results")
 
 
 class CarrierOfferLog(BaseModel):
@@ -18,9 +20,30 @@ class CarrierOfferLog(BaseModel):
     notes: Optional[str] = Field(None, description="Additional notes about the offer")
 
 
+class CarrierOfferBatch(BaseModel):
+    offers: List[CarrierOfferLog] = Field(..., description="Offers to log, in the order they were made")
+
+
 class CarrierOfferResponse(BaseModel):
     status: int = Field(201, description="HTTP status code")
     message: str = Field("Offer logged successfully", description="Response message")
+    offers_logged: int = Field(1, description="Number of offers recorded")
+
+
+class LoadOfferState(BaseModel):
+    load_id: str = Field(..., description="Load ID")
+    loadboard_rate: float = Field(..., description="Current listed rate for the load")
+    offer_count: int = Field(0, description="Offers received for the load")
+    min_offer: Optional[float] = Field(None, description="Lowest offer")
+    max_offer: Optional[float] = Field(None, description="Highest offer")
+    avg_offer: Optional[float] = Field(None, description="Average offer")
+    last_offer: Optional[float] = Field(None, description="Most recent offer")
+    last_mc_number: Optional[str] = Field(None, description="Carrier that made the most recent offer")
+    first_offered_at: Optional[datetime] = Field(None, description="When the first offer was made")
+    last_offered_at: Optional[datetime] = Field(None, description="When the most recent offer was made")
+    min_spread: Optional[float] = Field(None, description="Lowest offer minus loadboard rate")
+    max_spread: Optional[float] = Field(None, description="Highest offer minus loadboard rate")
+    last_spread: Optional[float] = Field(None, description="Most recent offer minus loadboard rate")
 
 
 class CallOutcome(BaseModel):
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 
 
@@ -40,6 +40,9 @@ class LoadUpdate(BaseModel):
 
 class Load(LoadBase):
     id: int
+    status: str = Field("available", description="available, booked, or expired once archived unbooked")
+    booked_by_mc: Optional[str] = Field(None, description="MC number of the carrier that booked the load")
+    booked_at: Optional[datetime] = Field(None, description="When the load was booked")
     created_at: datetime
     updated_at: datetime
 
@@ -52,6 +55,67 @@ class LoadSearchParams(BaseModel):
     destination_city: Optional[str] = Field(None, description="Filter by destination city")
     equipment_type: Optional[str] = Field(None, description="Filter by equipment type")
     pickup_date: Optional[str] = Field(None, description="Filter by pickup date (YYYY-MM-DD)")
+    pickup_from: Optional[str] = Field(None, description="Earliest pickup (YYYY-MM-DD or YYYY-MM-DDTHH:MM)")
+    pickup_to: Optional[str] = Field(None, description="Latest pickup, inclusive (YYYY-MM-DD or YYYY-MM-DDTHH:MM)")
+    delivery_by: Optional[str] = Field(None, description="Latest delivery, inclusive (YYYY-MM-DD or YYYY-MM-DDTHH:MM)")
     max_weight: Optional[float] = Field(None, description="Maximum weight filter")
     min_rate: Optional[float] = Field(None, description="Minimum rate filter")
-    max_rate: Optional[float] = Field(None, description="Maximum rate filter") 
\ No newline at end of file
+    max_rate: Optional[float] = Field(None, description="Maximum rate filter")
+    q: Optional[str] = Field(None, description="Full-text search over load notes and commodity type")
+
+
+class LoadBookingRequest(BaseModel):
+    mc_number: str = Field(..., description="MC number of the carrier booking the load")
+    agreed_rate: Optional[float] = Field(None, description="Rate agreed with the carrier")
+
+
+class LoadBookingResponse(BaseModel):
+    load_id: str = Field(..., description="Booked load")
+    status: str = Field(..., description="Load status after booking")
+    booked_by_mc: str = Field(..., description="MC number of the carrier that booked the load")
+    booked_rate: Optional[float] = Field(None, description="Agreed rate")
+    booked_at: datetime = Field(..., description="When the load was booked")
+    version: int = Field(..., description="Row version after booking")
+
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+
+class LoadFacets(BaseModel):
+    total: int = Field(..., description="Available loads matching the filters")
+    equipment_type: List[FacetCount] = Field(..., description="Counts by equipment type, largest first")
+    origin_state: List[FacetCount] = Field(..., description="Counts by origin state, largest first")
+    destination_state: List[FacetCount] = Field(..., description="Counts by destination state, largest first")
+    pickup_day: List[FacetCount] = Field(..., description="Counts by pickup day (YYYY-MM-DD), in date order")
+
+
+class RateBand(BaseModel):
+    min_rate_per_mile: float = Field(..., description="Lower bound of the band, inclusive")
+    max_rate_per_mile: float = Field(..., description="Upper bound of the band, exclusive")
+    calls: int = Field(..., description="Calls quoted or agreed in this band")
+    booked_calls: int = Field(..., description="Of those, calls that booked")
+    acceptance_rate: float = Field(..., description="Booked calls as a percentage")
+
+
+class RateGuidance(BaseModel):
+    load_id: str
+    origin: str
+    destination: str
+    equipment_type: str
+    loadboard_rate: float
+    miles: Optional[float] = None
+    loadboard_rate_per_mile: Optional[float] = None
+    scope: str = Field(..., description="lane, equipment (lane had too few calls) or none")
+    calls: int = Field(..., description="Calls the statistics are based on")
+    booked_calls: int
+    booking_rate: float = Field(..., description="Booked calls as a percentage")
+    agreed_rate: Optional[Dict[str, float]] = Field(None, description="Agreed rate percentiles (p10..p90)")
+    initial_offer: Optional[Dict[str, float]] = Field(None, description="Carriers' initial offer percentiles")
+    agreed_rate_per_mile: Optional[Dict[str, float]] = Field(None, description="Rate per mile percentiles of booked calls")
+    avg_negotiation_rounds: Optional[float] = None
+    acceptance_by_rate_per_mile: List[RateBand] = []
+    loadboard_rate_percentile: Optional[float] = Field(
+        None, description="Share of agreed rates at or below this load's loadboard rate"
+    )
@@ -0,0 +1,135 @@
+"""
+Bytes read and latency of the call log list endpoints, before and after
+moving raw payloads to the compressed call_log_payloads side table
+
+Seeds call logs with inline raw_extracted_data_json payloads (the old
+layout), measures the list queries with the payload column loaded as they
+used to be, migrates payloads with compress_legacy_payloads, and measures
+get_call_logs and get_dashboard again.
+
+    python -m benchmarks.bench_call_log_payloads --rows 20000 --payload-bytes 4000
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import configure_environment, measure, print_table
+
+
+def make_payload(rng: random.Random, size: int) -> dict:
+    transcript = " ".join(rng.choice(["rate", "load", "pickup", "Chicago", "flatbed", "deal", "okay", "$2,100"])
+                          for _ in range(size // 6))
+    return {
+        "transcript": transcript,
+        "extracted": {"mc_number": str(rng.randint(100000, 999999)), "counter_offers": [2100, 2000, 1950]},
+    }
+
+
+def seed(engine, rows: int, payload_bytes: int, batch_size: int = 1000) -> None:
+    from app.models.call_log import CallLog, CallLogPayload
+
+    rng = random.Random(7)
+    now = datetime.now()
+    with engine.begin() as conn:
+        conn.execute(CallLogPayload.__table__.delete())
+        conn.execute(CallLog.__table__.delete())
+    start = time.perf_counter()
+    for offset in range(0, rows, batch_size):
+        batch = []
+        for i in range(offset, min(offset + batch_size, rows)):
+            called_at = now - timedelta(minutes=rows - i)
+            batch.append({
+                "happyrobot_run_id": f"bench-{i}",
+                "mc_number": str(rng.randint(100000, 999999)),
+                "called_at": called_at,
+                "searched_load_id": f"LOAD{rng.randint(1, 500):03d}",
+                "agreed_rate": rng.choice([None, round(rng.uniform(800, 3000), 2)]),
+                "call_outcome_classification": rng.choice(["Booked", "Rejected - Price", "No Interest"]),
+                "carrier_sentiment_classification": rng.choice(["Positive", "Neutral", "Negative"]),
+                "negotiation_rounds": rng.randint(0, 3),
+                "raw_extracted_data_json": make_payload(rng, payload_bytes),
+                "created_at": called_at,
+                "updated_at": called_at,
+            })
+        with engine.begin() as conn:
+            conn.execute(CallLog.__table__.insert(), batch)
+    print(f"Seeded {rows} call logs in {time.perf_counter() - start:.1f}s")
+
+
+def fetched_bytes(db, query) -> int:
+    """Approximate bytes transferred for a query's result rows"""
+    total = 0
+    # Execute on the connection to get raw column values rather than entities
+    for row in db.connection().execute(query.statement):
+        for value in row:
+            if value is None:
+                continue
+            total += len(value) if isinstance(value, (bytes, str)) else len(str(value))
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///./bench_call_logs.db")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--payload-bytes", type=int, default=4000)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    configure_environment(args.database_url)
+    from sqlalchemy.orm import undefer
+
+    from app.api.offers import get_call_logs, get_dashboard
+    from app.core.call_log_retention import compress_legacy_payloads
+    from app.database import Base, SessionLocal, engine
+    from app.models.call_log import CallLog
+
+    Base.metadata.create_all(bind=engine)
+    seed(engine, args.rows, args.payload_bytes)
+
+    results = {}
+    db = SessionLocal()
+    try:
+        for limit in (50, 500):
+            # Previous behaviour: every listed row carried its payload
+            legacy_query = (
+                db.query(CallLog).options(undefer(CallLog.raw_extracted_data_json))
+                .order_by(CallLog.created_at.desc()).limit(limit)
+            )
+
+            def list_legacy_logs():
+                legacy_query.all()
+                db.expunge_all()
+
+            results[f"before: logs limit={limit}"] = measure(list_legacy_logs, repeat=args.repeat)
+            results[f"before: logs limit={limit}"]["kb_read"] = round(fetched_bytes(db, legacy_query) / 1024, 1)
+
+        start = time.perf_counter()
+        compress_legacy_payloads(db)
+        print(f"Moved payloads to call_log_payloads in {time.perf_counter() - start:.1f}s")
+
+        for limit in (50, 500):
+            list_query = db.query(CallLog).order_by(CallLog.created_at.desc()).limit(limit)
+
+            def list_logs():
+                get_call_logs(db=db, api_key="benchmark", limit=limit, offset=0)
+                db.expunge_all()
+
+            results[f"after: logs limit={limit}"] = measure(list_logs, repeat=args.repeat)
+            results[f"after: logs limit={limit}"]["kb_read"] = round(fetched_bytes(db, list_query) / 1024, 1)
+
+        def dashboard():
+            get_dashboard(db=db, limit=50, live=False, api_key="benchmark")
+            db.expunge_all()
+
+        results["after: dashboard limit=50"] = measure(dashboard, repeat=args.repeat)
+        results["after: dashboard limit=50"]["kb_read"] = results["after: logs limit=50"]["kb_read"]
+    finally:
+        db.close()
+
+    print_table(f"Call log list latency (ms) and payload bytes, {args.rows} rows, {engine.dialect.name}", results)
+
+
+if __name__ == "__main__":
+    main()
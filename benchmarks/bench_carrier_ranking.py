@@ -0,0 +1,101 @@
+"""
+Carrier-personalized ranking latency
+
+Seeds a load board and a simulated call history (see eval_carrier_ranking),
+then times search_loads without `mc`, with `mc` for a carrier whose profile
+is loaded, and with `mc` right after a new call is logged (incremental
+catch-up). It also times building a profile from scratch and re-ranking the
+candidate window on its own, the part personalization adds on top of
+candidate retrieval, and retrieving the wider window itself.
+
+    python -m benchmarks.bench_carrier_ranking --loads 200000 --carriers 2000
+"""
+import argparse
+import random
+
+from benchmarks.common import configure_environment, measure, print_table, query_defaults
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///./bench_ranking.db")
+    parser.add_argument("--loads", type=int, default=200000)
+    parser.add_argument("--carriers", type=int, default=2000)
+    parser.add_argument("--calls-per-carrier", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    configure_environment(args.database_url)
+    from app.api.loads import search_loads
+    from app.config import settings
+    from app.core.carrier_profiles import carrier_profiles, rank_loads
+    from app.core.load_search import ensure_search_index
+    from app.database import Base, SessionLocal, add_missing_columns, engine
+    from app.models.load import Load, load_is_available
+    from benchmarks.bench_load_search import seed
+    from benchmarks.eval_carrier_ranking import seed_history, simulate_calls, simulate_carriers
+
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns(engine)
+    ensure_search_index(engine)
+    seed(engine, args.loads)
+
+    rng = random.Random(9)
+    db = SessionLocal()
+    loads = db.query(Load).all()
+    by_lane, by_equipment = {}, {}
+    for load in loads:
+        by_lane.setdefault((load.origin, load.destination), []).append(load)
+        by_equipment.setdefault(load.equipment_type, []).append(load)
+    carriers = simulate_carriers(loads, args.carriers, rng)
+    histories = {
+        carrier["mc_number"]: simulate_calls(carrier, loads, by_lane, by_equipment, args.calls_per_carrier, rng)
+        for carrier in carriers
+    }
+    print(f"Seeded {seed_history(engine, carriers, histories)} calls for {args.carriers} carriers")
+    db.expunge_all()
+
+    mc_numbers = [carrier["mc_number"] for carrier in carriers]
+    defaults = query_defaults(search_loads)
+    call = dict(defaults, equipment_type="Reefer")
+
+    def retrieve_candidates():
+        return (
+            db.query(Load).filter(load_is_available(), Load.equipment_type.ilike("%Reefer%"))
+            .order_by(Load.pickup_datetime, Load.loadboard_rate.desc())
+            .limit(settings.CARRIER_RANKING_CANDIDATES).all()
+        )
+
+    candidates = retrieve_candidates()
+
+    def build_profile():
+        carrier_profiles._profiles.clear()
+        carrier_profiles.get(db, rng.choice(mc_numbers))
+
+    def after_new_call():
+        carrier_profiles.notify_new_call()
+        search_loads(**dict(call, mc=rng.choice(mc_numbers[:50])), db=db, api_key="benchmark")
+
+    for mc_number in mc_numbers[:50]:
+        carrier_profiles.get(db, mc_number)
+    results = {
+        "search, no mc": measure(lambda: search_loads(**call, db=db, api_key="benchmark"), repeat=args.repeat),
+        "search, mc (profile loaded)": measure(
+            lambda: search_loads(**dict(call, mc=rng.choice(mc_numbers[:50])), db=db, api_key="benchmark"), repeat=args.repeat
+        ),
+        "search, mc after new call": measure(after_new_call, repeat=args.repeat),
+        f"retrieve {len(candidates)} candidates only": measure(retrieve_candidates, repeat=args.repeat),
+        "profile build (cold carrier)": measure(build_profile, repeat=max(10, args.repeat // 10)),
+        f"rank {len(candidates)} candidates only": measure(
+            lambda: rank_loads(carrier_profiles.get(db, mc_numbers[0]), candidates), repeat=args.repeat * 5
+        ),
+    }
+    db.close()
+    print_table(
+        f"Latency (ms), {args.loads} loads, {args.carriers} carriers, candidate window {settings.CARRIER_RANKING_CANDIDATES}",
+        results,
+    )
+
+
+if __name__ == "__main__":
+    main()
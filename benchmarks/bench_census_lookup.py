@@ -0,0 +1,105 @@
+"""
+Offline FMCSA census index: import time, lookup latency and resident memory
+
+Generates a synthetic census CSV (two million carriers by default), imports
+it with build_index, then times MC and DOT lookups for hits and misses and
+reports how much resident memory mapping and querying the index costs.
+
+    python -m benchmarks.bench_census_lookup --carriers 2000000
+    python -m benchmarks.bench_census_lookup --csv census.csv --reuse
+"""
+import argparse
+import csv
+import os
+import random
+import time
+
+from benchmarks.common import configure_environment, print_table, summarize
+
+BATCH = 10000
+
+
+def resident_kb() -> int:
+    """Current resident set size in KiB (Linux), or 0 where unavailable"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError):
+        return 0
+
+
+def write_census(path: str, carriers: int) -> None:
+    rng = random.Random(3)
+    start = time.perf_counter()
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["DOT_NUMBER", "MC_NUMBER", "LEGAL_NAME", "STATUS_CODE", "ALLOWED_TO_OPERATE", "SAFETY_RATING"])
+        for i in range(carriers):
+            writer.writerow([
+                1000000 + i * 2,
+                f"MC{100000 + i * 3}" if rng.random() < 0.8 else "",
+                f"CARRIER {i} TRUCKING LLC",
+                rng.choice("AAAAAAIS"),
+                rng.choice("YYYYN"),
+                rng.choice(["S", "", "", "C", "U"]),
+            ])
+    print(f"Wrote {carriers} census rows in {time.perf_counter() - start:.1f}s")
+
+
+def time_lookups(lookup, numbers, repeat: int):
+    """Per-lookup latency in microseconds, sampled over batches"""
+    samples = []
+    for _ in range(repeat):
+        batch = random.sample(numbers, min(BATCH, len(numbers)))
+        start = time.perf_counter()
+        for number in batch:
+            lookup(number)
+        samples.append((time.perf_counter() - start) * 1e6 / len(batch))
+    return summarize(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--carriers", type=int, default=2_000_000)
+    parser.add_argument("--csv", default="bench_census.csv")
+    parser.add_argument("--index", default="bench_census.idx")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--reuse", action="store_true", help="Skip generating and importing")
+    args = parser.parse_args()
+
+    configure_environment("sqlite:///./bench_census.db")
+    from app.core.census_index import CensusIndex, build_index
+
+    if not args.reuse:
+        write_census(args.csv, args.carriers)
+        start = time.perf_counter()
+        counts = build_index(args.csv, args.index)
+        print(f"Imported {counts['mc_keys']} MC / {counts['dot_keys']} DOT keys in {time.perf_counter() - start:.1f}s, "
+              f"index {os.path.getsize(args.index) / 2 ** 20:.1f} MiB")
+
+    rss_before = resident_kb()
+    index = CensusIndex(args.index)
+    rss_mapped = resident_kb()
+
+    count = index.dot_count
+    mc_hits = [str(100000 + i * 3) for i in range(0, count, 7)]
+    mc_misses = [str(100001 + i * 3) for i in range(0, count, 7)]
+    dot_hits = [str(1000000 + i * 2) for i in range(0, count, 7)]
+    rss_queried_from = resident_kb()
+
+    results = {
+        "mc hit": time_lookups(index.lookup_mc, mc_hits, args.repeat),
+        "mc miss": time_lookups(index.lookup_mc, mc_misses, args.repeat),
+        "dot hit": time_lookups(index.lookup_dot, dot_hits, args.repeat),
+    }
+    rss_after = resident_kb()
+    index.close()
+
+    print_table(f"Census lookup latency (microseconds) over {count} carriers", results)
+    # Pages touched by lookups are file-backed page cache, reclaimable under pressure
+    print(f"\nResident memory: +{rss_mapped - rss_before} KiB to map, "
+          f"+{rss_after - rss_queried_from} KiB after {args.repeat * BATCH * len(results)} random lookups")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Cold start: time to the first successful request
+
+Boots the app under uvicorn in a fresh process, in full mode (DDL on every
+boot) and fast-boot mode (Alembic revision check, parallel prewarm), and
+polls an authenticated load search until it returns 200. Reports the time
+from process spawn to that first success, plus the phase timings the app
+logs in its startup report. Against a local SQLite file the DDL is cheap;
+the schema phase matters most against a networked Postgres, so pass
+--database-url to measure that. The database is migrated with
+`alembic upgrade head` beforehand so both modes boot against the same schema.
+
+    python -m benchmarks.bench_cold_start --runs 5
+    python -m benchmarks.bench_cold_start --database-url postgresql://... --runs 10
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from benchmarks.common import configure_environment, print_table, summarize
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def boot_once(env: dict, timeout: float) -> dict:
+    """Spawn uvicorn, poll until the first 200, and return timings"""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/api/v1/loads/?limit=1"
+    request = urllib.request.Request(url, headers={"Authorization": env["API_KEY"]})
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=REPO_ROOT,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    try:
+        first_ok = None
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited during boot:\n{process.stdout.read()}")
+            try:
+                with urllib.request.urlopen(request, timeout=1) as response:
+                    if response.status == 200:
+                        first_ok = time.perf_counter() - started
+                        break
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.005)
+        if first_ok is None:
+            raise RuntimeError(f"No successful request within {timeout}s")
+    finally:
+        process.terminate()
+        output, _ = process.communicate(timeout=10)
+
+    report = {}
+    for line in output.splitlines():
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        if entry.get("message") == "Startup complete":
+            report = entry
+    return {"first_ok_ms": first_ok * 1000, "report": report}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///./bench_cold_start.db")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    configure_environment(args.database_url)
+    base_env = {
+        **os.environ,
+        "PYTHONPATH": REPO_ROOT,
+        "LOG_FORMAT": "json",
+        "CARRIER_REFRESH_ENABLED": "true",
+    }
+    if args.database_url.startswith("sqlite:///./"):
+        # Relative SQLite paths resolve against the server's cwd (the repo root), so pin them here
+        base_env["DATABASE_URL"] = "sqlite:///" + os.path.abspath(args.database_url[len("sqlite:///"):])
+
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "-c", os.path.join(REPO_ROOT, "alembic.ini"), "upgrade", "head"],
+        cwd=REPO_ROOT,
+        env=base_env,
+        check=True,
+        capture_output=True,
+    )
+
+    results = {}
+    for mode, fast in [("full boot", "false"), ("fast boot", "true")]:
+        env = {**base_env, "FAST_BOOT": fast}
+        boot_once(env, args.timeout)  # Warm the OS page cache for imports
+        runs = [boot_once(env, args.timeout) for _ in range(args.runs)]
+        latency = summarize([run["first_ok_ms"] for run in runs])
+        phases = runs[-1]["report"].get("phases_ms", {})
+        results[mode] = {
+            "p50_ms": round(latency["p50"], 1),
+            "max_ms": round(latency["max"], 1),
+            "imports_ms": phases.get("imports", "-"),
+            "schema_ms": phases.get("schema", phases.get("schema_check", "-")),
+            "prewarm_ms": phases.get("prewarm", "-"),
+            "ready_ms": runs[-1]["report"].get("total_ms", "-"),
+        }
+        print(f"{mode}: last startup report {runs[-1]['report'].get('phases_ms')}")
+
+    print_table(f"Time to first successful request over {args.runs} boots, {args.database_url.split(':')[0]}", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Response compression: bytes on the wire vs added server latency
+
+Seeds call logs, then fetches the dashboard, the call log JSON listing and
+the NDJSON export with each available encoding (identity, gzip and, when the
+brotli package is installed, br). Reports wire size, in-process latency and
+the estimated time to deliver the response over a link of --mbps, which is
+where compression pays for its CPU cost.
+
+    python -m benchmarks.bench_compression --rows 2000 --mbps 20
+"""
+import argparse
+import os
+import time
+
+from benchmarks.common import configure_environment, print_table, summarize
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///./bench_compression.db")
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--payload-bytes", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--mbps", type=float, default=20.0, help="Link bandwidth for the transfer estimate")
+    args = parser.parse_args()
+
+    configure_environment(args.database_url)
+    os.environ["CARRIER_REFRESH_ENABLED"] = "false"
+    from fastapi.testclient import TestClient
+
+    from app.core.compression import brotli
+    from app.database import Base, engine
+    from app.main import app
+    from benchmarks.bench_call_log_payloads import seed
+
+    Base.metadata.create_all(bind=engine)
+    seed(engine, args.rows, args.payload_bytes)
+
+    api_key = os.environ["API_KEY"]
+    endpoints = {
+        "dashboard": f"/api/v1/offers/dashboard?api_key={api_key}&limit=200",
+        "logs json": "/api/v1/offers/logs?limit=500",
+        "export ndjson": "/api/v1/offers/logs/export",
+    }
+    encodings = ["identity", "gzip"] + (["br"] if brotli is not None else [])
+
+    results = {}
+    with TestClient(app) as client:
+        for name, url in endpoints.items():
+            for encoding in encodings:
+                headers = {"Authorization": api_key, "Accept-Encoding": encoding}
+                samples, wire_bytes = [], 0
+                for i in range(args.repeat + 2):
+                    start = time.perf_counter()
+                    with client.stream("GET", url, headers=headers) as response:
+                        wire_bytes = sum(len(chunk) for chunk in response.iter_raw())
+                    if i >= 2:  # Warmup
+                        samples.append((time.perf_counter() - start) * 1000)
+                stats = summarize(samples)
+                transfer_ms = wire_bytes * 8 / (args.mbps * 1e6) * 1000
+                results[f"{name} [{encoding}]"] = {
+                    "kb": round(wire_bytes / 1024, 1),
+                    "p50": stats["p50"],
+                    "p95": stats["p95"],
+                    f"@{args.mbps:g}Mbps": round(stats["p50"] + transfer_ms, 1),
+                }
+
+    print_table(f"Response size (KiB), server latency (ms) and estimated delivery time (ms), {args.rows} call logs",
+                results)
+    if brotli is None:
+        print("\nbrotli is not installed; install it to include br in the comparison")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Health probe cost under aggressive probing
+
+Sends bursts of probes through the full app and counts the SQL statements
+they cause, comparing a live `SELECT 1` per probe (what /health/db used to
+do) with /health/live, /health/ready and /health/db answered from the
+background prober's cached results.
+
+    python -m benchmarks.bench_health_probes --probes 2000
+"""
+import argparse
+import time
+
+from benchmarks.common import configure_environment, measure, print_table
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///./bench_health.db")
+    parser.add_argument("--probes", type=int, default=2000)
+    args = parser.parse_args()
+
+    configure_environment(args.database_url)
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event, text
+
+    from app.database import SessionLocal, engine
+    from app.main import app
+
+    statements = {"count": 0}
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count(*_):
+        statements["count"] += 1
+
+    @app.get("/bench/live-select")
+    def live_select():
+        db = SessionLocal()
+        try:
+            db.execute(text("SELECT 1")).fetchone()
+        finally:
+            db.close()
+        return {"status": "healthy"}
+
+    results = {}
+    with TestClient(app) as client:
+        while client.get("/health/ready").status_code != 200:
+            time.sleep(0.05)
+        for name, path in [
+            ("live SELECT per probe", "/bench/live-select"),
+            ("/health/live", "/health/live"),
+            ("/health/ready", "/health/ready"),
+            ("/health/db (cached)", "/health/db"),
+        ]:
+            before = statements["count"]
+            latency = measure(lambda: client.get(path), repeat=args.probes, warmup=0)
+            results[name] = {
+                "p50_ms": latency["p50"],
+                "p95_ms": latency["p95"],
+                "sql_per_1k": round((statements["count"] - before) / args.probes * 1000, 1),
+            }
+
+    print_table(f"{args.probes} probes per endpoint (SQL includes background prober rounds)", results)
+
+
+if __name__ == "__main__":
+    main()
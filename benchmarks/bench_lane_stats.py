@@ -0,0 +1,124 @@
+"""
+Lane rate statistics: rebuild cost and rate-guidance latency
+
+Seeds a load board and a history of calls against it, then measures the
+full lane statistics rebuild, rate guidance served from the precomputed
+lanes, guidance right after a new call is logged (incremental catch-up),
+and for comparison the same statistics computed per request from a lane
+query.
+
+    python -m benchmarks.bench_lane_stats --loads 20000 --calls 500000
+    python -m benchmarks.bench_lane_stats --database-url postgresql://... --calls 1000000
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import configure_environment, measure, print_table
+
+OUTCOMES = ["Booked", "Booked", "Rejected - Price", "No Interest", "Carrier Not Eligible"]
+
+
+def seed_calls(engine, loads: int, calls: int, batch_size: int = 20000) -> None:
+    from app.models.call_log import CallLog
+    from app.models.load import Load
+
+    rng = random.Random(7)
+    table = CallLog.__table__
+    with engine.connect() as conn:
+        rates = {row.load_id: row.loadboard_rate for row in conn.execute(Load.__table__.select())}
+    load_ids = list(rates)
+    now = datetime.utcnow()
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(table.delete())
+    for offset in range(0, calls, batch_size):
+        batch = []
+        for i in range(offset, min(offset + batch_size, calls)):
+            load_id = rng.choice(load_ids[:max(1, loads // 10)]) if rng.random() < 0.5 else rng.choice(load_ids)
+            outcome = rng.choice(OUTCOMES)
+            offer = round(rates[load_id] * rng.uniform(0.9, 1.3), 2)
+            batch.append({
+                "happyrobot_run_id": f"BENCH-RUN-{i}",
+                "mc_number": str(100000 + rng.randrange(5000)),
+                "called_at": now - timedelta(minutes=rng.randrange(60 * 24 * 170)),
+                "searched_load_id": load_id,
+                "initial_carrier_offer": offer,
+                "negotiation_rounds": rng.randint(0, 3),
+                "agreed_rate": round(offer * rng.uniform(0.9, 1.0), 2) if outcome == "Booked" else None,
+                "call_outcome_classification": outcome,
+                "carrier_sentiment_classification": "Neutral",
+            })
+        with engine.begin() as conn:
+            conn.execute(table.insert(), batch)
+    print(f"Seeded {calls} calls in {time.perf_counter() - start:.1f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///./bench_lane_stats.db")
+    parser.add_argument("--loads", type=int, default=20000)
+    parser.add_argument("--calls", type=int, default=500000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    configure_environment(args.database_url)
+    import numpy as np
+
+    from app.api.loads import get_rate_guidance
+    from app.core.dashboard_feed import is_booked
+    from app.core.lane_stats import lane_stats
+    from app.database import Base, SessionLocal, add_missing_columns, engine
+    from app.models.call_log import CallLog
+    from app.models.load import Load
+    from benchmarks.bench_load_search import seed
+
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns(engine)
+    seed(engine, args.loads)
+    seed_calls(engine, args.loads, args.calls)
+
+    db = SessionLocal()
+    rng = random.Random(3)
+    load_ids = [f"BENCH{i:08d}" for i in range(args.loads)]
+
+    def guidance():
+        json.dumps(get_rate_guidance(rng.choice(load_ids), db=db, api_key=""))
+
+    def per_request():
+        load = db.query(Load).filter(Load.load_id == rng.choice(load_ids)).one()
+        rows = (
+            db.query(CallLog.agreed_rate, CallLog.initial_carrier_offer, CallLog.negotiation_rounds,
+                     CallLog.call_outcome_classification)
+            .join(Load, Load.load_id == CallLog.searched_load_id)
+            .filter(Load.origin == load.origin, Load.destination == load.destination,
+                    Load.equipment_type == load.equipment_type)
+            .all()
+        )
+        agreed = np.array([row[0] for row in rows if row[0] is not None])
+        if len(agreed):
+            np.percentile(agreed, [10, 25, 50, 75, 90])
+        sum(is_booked(row[3]) for row in rows)
+
+    started = time.perf_counter()
+    calls = lane_stats.rebuild(db)
+    rebuild_ms = (time.perf_counter() - started) * 1000
+    print(f"Rebuilt {lane_stats.stats()['lanes']} lanes from {calls} calls in {rebuild_ms:.0f}ms")
+
+    def after_new_call():
+        lane_stats.notify_new_call()
+        guidance()
+
+    results = {
+        "precomputed": measure(guidance, repeat=args.repeat),
+        "after new call": measure(after_new_call, repeat=args.repeat),
+        "per-request query": measure(per_request, repeat=max(10, args.repeat // 10)),
+    }
+    db.close()
+    print_table(f"Rate guidance latency (ms), {args.calls} calls over {args.loads} loads", results)
+
+
+if __name__ == "__main__":
+    main()
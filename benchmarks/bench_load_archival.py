@@ -0,0 +1,116 @@
+"""
+Load archival: archive throughput and search cost before and after
+
+Seeds a load board, moves the pickup of a share of it into the past and
+books another share a few days ago, as on a board nothing was ever removed
+from. Times search_loads (with and without `q`), facet counts as a cache
+miss and a single load lookup, then archives everything due with
+LoadArchiver, reporting rows per second, and times the same calls again on
+the active set. Lookups of archived loads go to the archive.
+
+    python -m benchmarks.bench_load_archival --rows 500000 --stale-fraction 0.8
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import configure_environment, measure, print_table, query_defaults
+
+SEARCHES = {
+    "search, no filters": {},
+    "search, equipment + lane": {"equipment_type": "Reefer", "origin_city": "Chicago"},
+    "search, q=food grade": {"q": "food grade"},
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///./bench_archival.db")
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--stale-fraction", type=float, default=0.8, help="Share of loads whose pickup is in the past")
+    parser.add_argument("--booked-fraction", type=float, default=0.1, help="Share of loads booked days ago")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    configure_environment(args.database_url)
+    from sqlalchemy import text
+
+    from app.api.loads import get_load_details, get_load_facets, search_loads
+    from app.core.load_archival import LoadArchiver
+    from app.core.load_cache import load_cache
+    from app.core.load_facets import facet_cache
+    from app.core.startup import init_schema
+    from app.config import settings
+    from app.database import SessionLocal, engine
+    from app.models.load import BOOKED_STATUS
+    from benchmarks.bench_load_search import seed
+
+    init_schema(engine)
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM loads_archive"))
+    seed(engine, args.rows)
+    stale = int(args.stale_fraction * 100)
+    booked = int(args.booked_fraction * 100)
+    with engine.begin() as conn:
+        # Spread over ids so stale, booked and live loads are interleaved as on a real board
+        conn.execute(
+            text("UPDATE loads SET pickup_datetime = :past WHERE id % 100 < :stale"),
+            {"past": datetime.now() - timedelta(days=45), "stale": stale},
+        )
+        conn.execute(
+            text("UPDATE loads SET status = :booked, booked_at = :at WHERE id % 100 >= :stale AND id % 100 < :end"),
+            {"booked": BOOKED_STATUS, "at": datetime.utcnow() - timedelta(days=3), "stale": stale, "end": stale + booked},
+        )
+
+    archiver = LoadArchiver(
+        bind=engine,
+        interval_seconds=settings.LOAD_ARCHIVE_INTERVAL_SECONDS,
+        batch_size=args.batch_size or settings.LOAD_ARCHIVE_BATCH_SIZE,
+        booked_after_hours=settings.LOAD_ARCHIVE_BOOKED_AFTER_HOURS,
+        board_resync_seconds=settings.LOAD_ARCHIVE_BOARD_RESYNC_SECONDS,
+    )
+    db = SessionLocal()
+    search_defaults = query_defaults(search_loads)
+    facet_defaults = query_defaults(get_load_facets)
+
+    def facets_miss():
+        facet_cache.invalidate()
+        return get_load_facets(**facet_defaults, db=db, api_key="benchmark")
+
+    def lookup(load_id: str):
+        load_cache.clear()
+        return get_load_details(load_id, db=db, api_key="benchmark")
+
+    def timings(stage: str) -> dict:
+        results = {}
+        for name, params in SEARCHES.items():
+            call = dict(search_defaults, **params)
+            results[f"{name} ({stage})"] = measure(lambda: search_loads(**call, db=db, api_key="benchmark"), repeat=args.repeat)
+        results[f"facets, cache miss ({stage})"] = measure(facets_miss, repeat=max(5, args.repeat // 5), warmup=1)
+        # BENCH00000000 has id 1, which the stale share includes
+        results[f"get_load_details, past pickup ({stage})"] = measure(lambda: lookup("BENCH00000000"), repeat=args.repeat)
+        return results
+
+    try:
+        before = archiver.board_size()
+        results = timings("before")
+        started = time.perf_counter()
+        archived = archiver.archive()
+        elapsed = time.perf_counter() - started
+        results.update(timings("after"))
+        after = archiver.board_size()
+    finally:
+        db.close()
+
+    print(f"Board before: {before}")
+    print(
+        f"Archived {archived} loads ({archiver.metrics['expired_total']} expired, {archiver.metrics['booked_total']} booked) "
+        f"in {elapsed:.1f}s, {archived / elapsed:.0f} rows/s, batches of {archiver.batch_size}, {engine.dialect.name}"
+    )
+    print(f"Board after: {after}")
+    print_table(f"Latency (ms), {args.rows} loads seeded", results)
+
+
+if __name__ == "__main__":
+    main()
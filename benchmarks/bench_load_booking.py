@@ -0,0 +1,123 @@
+"""
+Load booking under contention
+
+Releases hundreds of concurrent bookers at once against a small set of hot
+loads and checks that each load is booked exactly once. Runs the real
+book_load (FOR UPDATE SKIP LOCKED on Postgres, version check elsewhere) and,
+for comparison, a naive read-then-write booking with no concurrency control.
+Reports outcomes, double bookings and latency. Exits non-zero if book_load
+ever double-books.
+
+    python -m benchmarks.bench_load_booking --bookers 300 --loads 10
+    python -m benchmarks.bench_load_booking --database-url postgresql://... --bookers 500
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import configure_environment, print_table, summarize
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///./bench_booking.db")
+    parser.add_argument("--bookers", type=int, default=300)
+    parser.add_argument("--loads", type=int, default=10, help="Number of hot loads the bookers compete for")
+    args = parser.parse_args()
+
+    configure_environment(args.database_url)
+    from fastapi import HTTPException
+    from sqlalchemy import null, update
+
+    from app.core.load_booking import book_load
+    from app.database import Base, SessionLocal, add_missing_columns, engine
+    from app.models.load import AVAILABLE_STATUS, BOOKED_STATUS, Load, load_is_available
+    from benchmarks.bench_load_search import seed
+
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns(engine)
+    seed(engine, args.loads)
+    load_ids = [f"BENCH{i:08d}" for i in range(args.loads)]
+
+    def naive_book(db, load_id, mc_number):
+        load = db.query(Load).filter(Load.load_id == load_id, load_is_available()).first()
+        if load is None:
+            raise HTTPException(status_code=409, detail="Load is already booked")
+        time.sleep(0.001)  # Stand-in for the work between reading and writing
+        load.status = BOOKED_STATUS
+        load.booked_by_mc = mc_number
+        db.commit()
+        return load
+
+    def run(name, booker):
+        with engine.begin() as conn:
+            conn.execute(update(Load.__table__).values(
+                status=AVAILABLE_STATUS, version=1, booked_by_mc=null(), booked_rate=null(), booked_at=null()))
+
+        barrier = threading.Barrier(args.bookers)
+        rng = random.Random(11)
+        targets = [rng.choice(load_ids) for _ in range(args.bookers)]
+
+        def attempt(i):
+            db = SessionLocal()
+            try:
+                barrier.wait()
+                start = time.perf_counter()
+                try:
+                    booker(db, targets[i], f"MC{i:06d}")
+                    outcome = "booked"
+                except HTTPException as e:
+                    outcome = "conflict" if e.status_code == 409 else f"http {e.status_code}"
+                except Exception as e:
+                    db.rollback()
+                    outcome = type(e).__name__
+                return targets[i], f"MC{i:06d}", outcome, (time.perf_counter() - start) * 1000
+            finally:
+                db.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.bookers) as pool:
+            results = list(pool.map(attempt, range(args.bookers)))
+        elapsed = time.perf_counter() - started
+
+        winners = defaultdict(list)
+        for load_id, mc_number, outcome, _ in results:
+            if outcome == "booked":
+                winners[load_id].append(mc_number)
+        with engine.connect() as conn:
+            stored = dict(conn.execute(Load.__table__.select().with_only_columns(Load.load_id, Load.booked_by_mc)).all())
+        double_booked = sum(1 for mcs in winners.values() if len(mcs) > 1)
+        # A winner that was told "booked" but whose MC is not on the row lost to a later overwrite
+        overwritten = sum(1 for load_id, mcs in winners.items() for mc in mcs if stored.get(load_id) != mc)
+
+        outcomes = Counter(outcome for _, _, outcome, _ in results)
+        latency = summarize([ms for _, _, _, ms in results])
+        print(f"{name}: {dict(outcomes)}")
+        return {
+            "booked": outcomes["booked"],
+            "conflicts": outcomes["conflict"],
+            "errors": args.bookers - outcomes["booked"] - outcomes["conflict"],
+            "double": double_booked,
+            "overwritten": overwritten,
+            "p50_ms": latency["p50"],
+            "p95_ms": latency["p95"],
+            "per_sec": round(args.bookers / elapsed),
+        }
+
+    results = {
+        "book_load": run("book_load", lambda db, load_id, mc: book_load(db, load_id, mc)),
+        "naive read-then-write": run("naive", naive_book),
+    }
+    print_table(f"{args.bookers} concurrent bookers on {args.loads} loads, {engine.dialect.name}", results)
+
+    if results["book_load"]["double"] or results["book_load"]["overwritten"]:
+        print("\nbook_load double-booked a load")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Load facet counts: grouped query cost vs cached results
+
+Seeds a load board and times get_load_facets for a few filter sets, first
+as a cache miss (one grouped query each) and then served from the facet
+cache. Then books one Flatbed load outside Chicago and reports which cached filter sets the
+booking dropped; only those whose filters match the load should go.
+
+    python -m benchmarks.bench_load_facets --rows 200000
+    python -m benchmarks.bench_load_facets --database-url postgresql://... --reuse
+"""
+import argparse
+
+from benchmarks.common import configure_environment, measure, print_table, query_defaults
+
+FILTERS = {
+    "no filters": {},
+    "equipment": {"equipment_type": "Reefer"},
+    "origin + rate": {"origin_city": "Chicago", "min_rate": 2000},
+    "q=food grade": {"q": "food grade"},
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///./bench_loads.db")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--reuse", action="store_true", help="Skip seeding and use the existing table")
+    args = parser.parse_args()
+
+    configure_environment(args.database_url)
+    from app.api.loads import get_load_facets
+    from app.core.load_booking import book_load
+    from app.core.load_facets import facet_cache
+    from app.core.load_search import ensure_search_index
+    from app.database import Base, SessionLocal, add_missing_columns, engine
+    from app.models.load import Load, load_is_available
+    from benchmarks.bench_load_search import seed
+
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns(engine)
+    ensure_search_index(engine)
+    if not args.reuse:
+        seed(engine, args.rows)
+
+    db = SessionLocal()
+    defaults = query_defaults(get_load_facets)
+    results = {}
+    try:
+        for name, params in FILTERS.items():
+            call = dict(defaults, **params)
+
+            def uncached():
+                facet_cache.invalidate()
+                return get_load_facets(**call, db=db, api_key="benchmark")
+
+            miss = measure(uncached, repeat=max(5, args.repeat // 20), warmup=1)
+            hit = measure(lambda: get_load_facets(**call, db=db, api_key="benchmark"), repeat=args.repeat)
+            results[name] = {
+                "loads": uncached()["total"],
+                "miss_p50": miss["p50"],
+                "miss_p95": miss["p95"],
+                "hit_p50": hit["p50"],
+                "hit_p95": hit["p95"],
+            }
+
+        # The misses above cleared the cache, so fill it with every filter set again
+        for params in FILTERS.values():
+            get_load_facets(**dict(defaults, **params), db=db, api_key="benchmark")
+        booked = (
+            db.query(Load)
+            .filter(load_is_available(), Load.equipment_type == "Flatbed", ~Load.origin.ilike("%Chicago%"))
+            .order_by(Load.pickup_datetime.desc())
+            .first()
+        )
+        book_load(db, booked.load_id, "BENCH")
+        for name, params in FILTERS.items():
+            misses = facet_cache.misses
+            get_load_facets(**dict(defaults, **params), db=db, api_key="benchmark")
+            results[name]["kept_after_booking"] = "yes" if facet_cache.misses == misses else "no"
+    finally:
+        db.close()
+
+    print_table(f"get_load_facets latency (ms) on {args.rows} loads, {engine.dialect.name}", results)
+
+
+if __name__ == "__main__":
+    main()
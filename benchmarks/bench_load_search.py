@@ -0,0 +1,112 @@
+"""
+Full-text load search latency on a large load board
+
+Seeds a loads table (one million rows by default) and times search_loads
+with and without the `q` parameter, alone and combined with the existing
+filters.
+
+    python -m benchmarks.bench_load_search --rows 1000000
+    python -m benchmarks.bench_load_search --database-url postgresql://... --reuse
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import configure_environment, measure, print_table, query_defaults
+
+CITIES = [
+    "Chicago, IL", "Dallas, TX", "Los Angeles, CA", "Phoenix, AZ", "Miami, FL", "Atlanta, GA",
+    "Denver, CO", "Salt Lake City, UT", "Houston, TX", "New Orleans, LA", "Seattle, WA", "Portland, OR",
+]
+EQUIPMENT = ["Dry Van", "Flatbed", "Reefer", "Tanker", "Step Deck"]
+COMMODITIES = [
+    "Electronics", "Frozen Foods", "Produce", "Machinery", "Chemicals", "Retail Goods",
+    "Construction Materials", "Paper Products", "Beverages", "Auto Parts",
+]
+NOTE_PHRASES = [
+    "food grade", "hazmat certified driver required", "high value freight", "temperature controlled",
+    "requires crane", "tarps required", "no touch freight", "team drivers preferred",
+    "drop and hook", "time sensitive", "secure properly", "appointment required",
+]
+
+QUERIES = {
+    "baseline (no q)": {},
+    "q=food grade": {"q": "food grade"},
+    "q=electronics": {"q": "electronics"},
+    "q=hazmat + equipment": {"q": "hazmat", "equipment_type": "Tanker"},
+    "q=crane + origin": {"q": "crane", "origin_city": "Chicago"},
+    "q=rare phrase": {"q": "team drivers appointment"},
+}
+
+
+def seed(engine, rows: int, batch_size: int = 10000) -> None:
+    from app.models.load import Load
+
+    rng = random.Random(42)
+    now = datetime.now()
+    table = Load.__table__
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(table.delete())
+    for offset in range(0, rows, batch_size):
+        batch = []
+        for i in range(offset, min(offset + batch_size, rows)):
+            origin, destination = rng.sample(CITIES, 2)
+            pickup = now + timedelta(hours=rng.randint(1, 24 * 30))
+            batch.append({
+                "load_id": f"BENCH{i:08d}",
+                "origin": origin,
+                "destination": destination,
+                "pickup_datetime": pickup,
+                "delivery_datetime": pickup + timedelta(days=rng.randint(1, 4)),
+                "equipment_type": rng.choice(EQUIPMENT),
+                "loadboard_rate": round(rng.uniform(500, 5000), 2),
+                "notes": ", ".join(rng.sample(NOTE_PHRASES, 2)),
+                "weight": rng.randint(5000, 50000),
+                "commodity_type": rng.choice(COMMODITIES),
+                "num_of_pieces": rng.randint(1, 200),
+                "miles": rng.randint(50, 2500),
+                "dimensions": "53ft trailer",
+                "created_at": now,
+                "updated_at": now,
+            })
+        with engine.begin() as conn:
+            conn.execute(table.insert(), batch)
+    print(f"Seeded {rows} loads in {time.perf_counter() - start:.1f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///./bench_loads.db")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--reuse", action="store_true", help="Skip seeding and use the existing table")
+    args = parser.parse_args()
+
+    configure_environment(args.database_url)
+    from app.api.loads import search_loads
+    from app.core.load_search import ensure_search_index
+    from app.database import Base, SessionLocal, engine
+
+    Base.metadata.create_all(bind=engine)
+    ensure_search_index(engine)
+    if not args.reuse:
+        seed(engine, args.rows)
+
+    db = SessionLocal()
+    defaults = query_defaults(search_loads)
+    results = {}
+    try:
+        for name, params in QUERIES.items():
+            call = dict(defaults, **params)
+            results[name] = measure(lambda: search_loads(**call, db=db, api_key="benchmark"), repeat=args.repeat)
+            results[name]["hits"] = len(search_loads(**call, db=db, api_key="benchmark"))
+    finally:
+        db.close()
+
+    print_table(f"search_loads latency (ms) on {args.rows} loads, {engine.dialect.name}", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Caller-side cost of logging in request hot paths
+
+Times a burst of log calls from the request thread with print, a
+synchronous JSON StreamHandler, the queue handler from setup_logging and the
+queue handler with the logger sampled down. Output goes to a temp file whose
+writes can be slowed with --sink-delay-us to mimic a congested log pipe; the
+synchronous writers pay that delay on every call, the queue handler does not;
+drain_ms is how long its writer thread needed afterwards to catch up.
+
+    python -m benchmarks.bench_logging --calls 20000 --sink-delay-us 50
+"""
+import argparse
+import io
+import logging
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+from benchmarks.common import print_table, summarize
+
+
+class SlowSink(io.TextIOWrapper):
+    """Text file whose writes take at least ``delay`` seconds"""
+
+    def __init__(self, path: str, delay: float):
+        super().__init__(open(path, "wb"), encoding="utf-8")
+        self.delay = delay
+
+    def write(self, text: str) -> int:
+        if self.delay:
+            time.sleep(self.delay)
+        return super().write(text)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--sink-delay-us", type=float, default=0.0, help="Added latency per write to the sink")
+    parser.add_argument("--sample-rate", type=float, default=0.01)
+    args = parser.parse_args()
+
+    from app.core.logging_config import JsonFormatter, queue_stats, setup_logging, stop_logging
+
+    delay = args.sink_delay_us / 1_000_000
+    workdir = tempfile.mkdtemp(prefix="bench_logging_")
+    extra = {"load_id": "LOAD001", "mc_number": "123456", "status_code": 200}
+    logger = logging.getLogger("bench.hot_path")
+
+    def time_calls(call) -> dict:
+        samples = []
+        for i in range(args.calls):
+            start = time.perf_counter()
+            call(i)
+            samples.append((time.perf_counter() - start) * 1000)
+        stats = summarize(samples)
+        return {
+            "p50_us": round(stats["p50"] * 1000, 2),
+            "p95_us": round(stats["p95"] * 1000, 2),
+            "max_us": round(stats["max"] * 1000, 2),
+            "total_ms": round(sum(samples), 1),
+            "drain_ms": 0,
+        }
+
+    results = {}
+
+    sink = SlowSink(f"{workdir}/print.log", delay)
+    with redirect_stdout(sink):
+        results["print"] = time_calls(lambda i: print(f"Searched load {extra['load_id']} for MC {extra['mc_number']}"))
+    sink.close()
+
+    sink = SlowSink(f"{workdir}/sync.log", delay)
+    handler = logging.StreamHandler(sink)
+    handler.setFormatter(JsonFormatter())
+    root = logging.getLogger()
+    saved = list(root.handlers)
+    for existing in saved:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+    results["sync json handler"] = time_calls(lambda i: logger.info("Searched load %s", i, extra=extra))
+    root.removeHandler(handler)
+    sink.close()
+
+    for name, rates in [("queue handler", None), (f"queue, sampled {args.sample_rate}", {"bench": args.sample_rate})]:
+        sink = SlowSink(f"{workdir}/queue.log", delay)
+        setup_logging(queue_size=args.calls, sample_rates=rates, stream=sink)
+        results[name] = time_calls(lambda i: logger.info("Searched load %s", i, extra=extra))
+        drain_start = time.perf_counter()
+        stop_logging()
+        results[name]["drain_ms"] = round((time.perf_counter() - drain_start) * 1000, 1)
+        sink.close()
+
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    for existing in saved:
+        root.addHandler(existing)
+
+    print_table(f"{args.calls} log calls, sink delay {args.sink_delay_us}us per write", results)
+    print(f"\nqueue stats: {queue_stats()}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Assert that search_loads is served in index order without a sort step
+
+Runs search_loads for representative filter combinations, captures the SQL
+it issues and checks the database's query plan: the ORDER BY must come from
+the partial ix_loads_available_pickup_rate index rather than a sort (SQLite
+"USE TEMP B-TREE FOR ORDER BY", Postgres "Sort" node). Exits non-zero if any
+plan regresses.
+
+    python -m benchmarks.check_load_query_plans
+    python -m benchmarks.check_load_query_plans --database-url postgresql://... --rows 200000
+"""
+import argparse
+import sys
+from datetime import datetime, timedelta
+
+from benchmarks.common import configure_environment, query_defaults
+
+TOMORROW = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+NEXT_WEEK = (datetime.now() + timedelta(days=7)).strftime("%Y-%m-%d")
+
+CASES = {
+    "no filters": {},
+    "pickup window": {"pickup_from": TOMORROW, "pickup_to": NEXT_WEEK},
+    "pickup_date": {"pickup_date": TOMORROW},
+    "equipment + pickup window": {"equipment_type": "Reefer", "pickup_from": TOMORROW, "pickup_to": NEXT_WEEK},
+    "rate range + delivery_by": {"min_rate": 1500, "max_rate": 3000, "delivery_by": NEXT_WEEK},
+    "lane": {"origin_city": "Chicago", "destination_city": "Dallas"},
+}
+
+
+def explain(conn, dialect: str, statement: str, parameters) -> str:
+    if dialect == "sqlite":
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+        return "\n".join(row[-1] for row in rows)
+    rows = conn.exec_driver_sql(f"EXPLAIN {statement}", parameters).fetchall()
+    return "\n".join(row[0] for row in rows)
+
+
+def has_sort_step(dialect: str, plan: str) -> bool:
+    if dialect == "sqlite":
+        return "TEMP B-TREE FOR ORDER BY" in plan
+    return any(line.strip().lstrip("->").strip().startswith(("Sort", "Incremental Sort")) for line in plan.splitlines())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///./bench_plans.db")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--reuse", action="store_true", help="Skip seeding and use the existing table")
+    args = parser.parse_args()
+
+    configure_environment(args.database_url)
+    from sqlalchemy import event, text
+
+    from app.api.loads import search_loads
+    from app.database import Base, SessionLocal, create_missing_indexes, engine
+    from benchmarks.bench_load_search import seed
+
+    Base.metadata.create_all(bind=engine)
+    create_missing_indexes(engine)
+    if not args.reuse:
+        seed(engine, args.rows)
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM loads" in statement:
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    dialect = engine.dialect.name
+    failures = 0
+    db = SessionLocal()
+    try:
+        for name, params in CASES.items():
+            captured.clear()
+            search_loads(**dict(query_defaults(search_loads), **params), db=db, api_key="benchmark")
+            statement, parameters = captured[-1]
+            with engine.connect() as conn:
+                plan = explain(conn, dialect, statement, parameters)
+            ok = not has_sort_step(dialect, plan)
+            failures += 0 if ok else 1
+            print(f"[{'ok' if ok else 'FAIL'}] {name}")
+            for line in plan.splitlines():
+                print(f"       {line}")
+    finally:
+        db.close()
+        event.remove(engine, "before_cursor_execute", capture)
+
+    if failures:
+        print(f"\n{failures} search plan(s) include a sort step")
+        sys.exit(1)
+    print("\nAll search plans are served in index order")
+
+
+if __name__ == "__main__":
+    main()
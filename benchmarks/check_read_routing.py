@@ -0,0 +1,108 @@
+"""
+Check read-replica routing against two local databases
+
+Points DATABASE_URL and DATABASE_REPLICA_URL at two separate SQLite files,
+seeds a different load into each so every response shows which database
+served it, and checks that:
+
+- read-only endpoints are served by the replica
+- call logging writes go to the primary
+- a client that just wrote reads from the primary for READ_YOUR_WRITES_SECONDS
+  (keyed by X-Session-ID), while other clients stay on the replica
+- writes without X-Session-ID pin no one, even clients sharing an address
+
+Exits non-zero on any failure.
+
+    python -m benchmarks.check_read_routing
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import configure_environment
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--primary-url", default="sqlite:///./bench_primary.db")
+    parser.add_argument("--replica-url", default="sqlite:///./bench_replica.db")
+    parser.add_argument("--window", type=float, default=1.0, help="READ_YOUR_WRITES_SECONDS for the check")
+    args = parser.parse_args()
+
+    configure_environment(args.primary_url)
+    os.environ["DATABASE_REPLICA_URL"] = args.replica_url
+    os.environ["READ_YOUR_WRITES_SECONDS"] = str(args.window)
+    os.environ["CARRIER_REFRESH_ENABLED"] = "false"
+    from fastapi.testclient import TestClient
+
+    from app.database import Base, engine, read_routing_stats, replica_engine
+    from app.main import app
+    from app.models.call_log import CallLog
+    from app.models.load import Load
+
+    pickup = datetime.now() + timedelta(days=1)
+    for bind, load_id in ((engine, "PRIMARY1"), (replica_engine, "REPLICA1")):
+        Base.metadata.drop_all(bind=bind)
+        Base.metadata.create_all(bind=bind)
+        with bind.begin() as conn:
+            conn.execute(Load.__table__.insert(), [{
+                "load_id": load_id, "origin": "Chicago, IL", "destination": "Dallas, TX",
+                "pickup_datetime": pickup, "delivery_datetime": pickup + timedelta(days=2),
+                "equipment_type": "Dry Van", "loadboard_rate": 2000.0,
+            }])
+
+    failures = 0
+
+    def check(name: str, ok: bool) -> None:
+        nonlocal failures
+        failures += 0 if ok else 1
+        print(f"[{'ok' if ok else 'FAIL'}] {name}")
+
+    headers = {"Authorization": os.environ["API_KEY"]}
+    writer = dict(headers, **{"X-Session-ID": "writer"})
+    reader = dict(headers, **{"X-Session-ID": "reader"})
+    with TestClient(app) as client:
+        def board(request_headers):
+            return [l["load_id"] for l in client.get("/api/v1/loads/", headers=request_headers).json()]
+
+        check("load detail served by replica",
+              client.get("/api/v1/loads/REPLICA1", headers=reader).status_code == 200
+              and client.get("/api/v1/loads/PRIMARY1", headers=reader).status_code == 404)
+        check("load search served by replica",
+              [l["load_id"] for l in client.get("/api/v1/loads/", headers=reader).json()] == ["REPLICA1"])
+
+        response = client.post("/api/v1/offers/log", headers=writer, json={
+            "happyrobot_run_id": "routing-check", "mc_number": "123456",
+            "call_outcome_classification": "Booked", "carrier_sentiment_classification": "Positive",
+        })
+        with engine.connect() as conn:
+            primary_logs = conn.execute(CallLog.__table__.select()).fetchall()
+        with replica_engine.connect() as conn:
+            replica_logs = conn.execute(CallLog.__table__.select()).fetchall()
+        check("call log written to primary", response.status_code == 200 and len(primary_logs) == 1 and not replica_logs)
+
+        # Search rather than load detail: detail is served from the process-wide load cache once read
+        check("writer pinned to primary after its write", board(writer) == ["PRIMARY1"])
+        check("other clients stay on replica", board(reader) == ["REPLICA1"])
+
+        # TestClient requests all share one client address, as clients behind a load balancer do
+        client.post("/api/v1/offers/log", headers=headers, json={
+            "happyrobot_run_id": "routing-check-anonymous", "mc_number": "123456",
+            "call_outcome_classification": "Booked", "carrier_sentiment_classification": "Positive",
+        })
+        check("writes without X-Session-ID pin nobody", board(headers) == ["REPLICA1"])
+
+        time.sleep(args.window + 0.1)
+        check("writer back on replica after the window", board(writer) == ["REPLICA1"])
+
+    print(f"\nRouted reads: {read_routing_stats()}")
+    if failures:
+        print(f"{failures} routing check(s) failed")
+        sys.exit(1)
+    print("Read routing behaves as configured")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Shared verification cache across worker processes
+
+Runs the sqlite verification cache from several processes at once, as
+uvicorn/gunicorn workers would, and checks that:
+
+- a verification stored by one process is a hit in every other one
+- concurrent reads and writes never fail with "database is locked"
+- entries expire after the TTL for all processes
+- the size stays within max_entries (plus the per-worker trim slack) under
+  eviction pressure
+
+It compares hit ratio, upstream calls and throughput of the same
+verify-on-miss workload against the shared cache and per-process
+in-memory caches.
+Exits non-zero if any check fails.
+
+    python -m benchmarks.check_shared_verification_cache --workers 8 --requests 20000
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from benchmarks.common import print_table
+
+from app.core.verification_cache import InMemoryVerificationCache, SQLiteVerificationCache
+
+VALUE = {"carrier_id": "0", "carrier_name": "BENCH CARRIER", "status": "ACTIVE", "mc_number": "0", "source": "fmcsa_api"}
+
+
+def open_cache(backend: str, path: str, ttl: float, max_entries: int):
+    if backend == "sqlite":
+        return SQLiteVerificationCache(path=path, ttl_seconds=ttl, max_entries=max_entries)
+    return InMemoryVerificationCache(ttl_seconds=ttl, max_entries=max_entries)
+
+
+def fill(path: str, keys: int) -> None:
+    cache = open_cache("sqlite", path, 60, keys * 2)
+    for i in range(keys):
+        cache.set(str(i), {**VALUE, "carrier_id": str(i)})
+
+
+def read_all(path: str, keys: int, results) -> None:
+    cache = open_cache("sqlite", path, 60, keys * 2)
+    results.put(sum(1 for i in range(keys) if cache.get(str(i)) is not None))
+
+
+def expect_expired(path: str, key: str, results) -> None:
+    cache = open_cache("sqlite", path, 60, 100)
+    results.put(cache.get(key) is None and cache.peek(key) is not None)
+
+
+def workload(backend: str, path: str, seed: int, requests: int, keyspace: int, max_entries: int, start, results) -> None:
+    """Verify-on-miss traffic over a skewed set of carriers, like repeat callers"""
+    cache = open_cache(backend, path, 3600, max_entries)
+    rng = random.Random(seed)
+    errors = 0
+    start.wait()
+    started = time.perf_counter()
+    for _ in range(requests):
+        key = str(int(keyspace * rng.random() ** 2))
+        try:
+            if cache.get(key) is None:
+                cache.set(key, {**VALUE, "carrier_id": key})
+        except sqlite3.OperationalError:
+            errors += 1
+    elapsed = time.perf_counter() - started
+    results.put({"elapsed": elapsed, "errors": errors, "hits": cache.hits, "misses": cache.misses})
+
+
+def run_workers(ctx, args, backend: str, path: str, max_entries: int) -> Dict[str, float]:
+    start = ctx.Barrier(args.workers)
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(target=workload, args=(backend, path, i, args.requests, args.keyspace, max_entries, start, results))
+        for i in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    outcomes: List[Dict[str, int]] = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    hits = sum(outcome["hits"] for outcome in outcomes)
+    lookups = hits + sum(outcome["misses"] for outcome in outcomes)
+    return {
+        "ops_per_sec": round(args.requests * args.workers / max(outcome["elapsed"] for outcome in outcomes)),
+        "hit_ratio": round(hits / lookups, 3) if lookups else 0.0,
+        "upstream": lookups - hits,
+        "errors": sum(outcome["errors"] for outcome in outcomes),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=20000, help="Verifications per worker")
+    parser.add_argument("--keyspace", type=int, default=5000, help="Distinct carriers in the workload")
+    parser.add_argument("--max-entries", type=int, default=10000, help="Cache capacity for the hit ratio comparison")
+    parser.add_argument("--small-max-entries", type=int, default=1000, help="Capacity for the eviction stress run")
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    workdir = tempfile.mkdtemp(prefix="shared_cache_")
+    failures = []
+
+    path = os.path.join(workdir, "visibility.db")
+    fill(path, 200)
+    results = ctx.Queue()
+    readers = [ctx.Process(target=read_all, args=(path, 200, results)) for _ in range(args.workers)]
+    for process in readers:
+        process.start()
+    seen = [results.get() for _ in readers]
+    for process in readers:
+        process.join()
+    print(f"cross-process visibility: each of {args.workers} readers hit {min(seen)}..{max(seen)} of 200 entries")
+    if min(seen) != 200:
+        failures.append("entries written by one process were not visible to all others")
+
+    path = os.path.join(workdir, "ttl.db")
+    SQLiteVerificationCache(path=path, ttl_seconds=0.5, max_entries=100).set("123456", VALUE)
+    time.sleep(0.6)
+    reader = ctx.Process(target=expect_expired, args=(path, "123456", results))
+    reader.start()
+    expired = results.get()
+    reader.join()
+    print(f"ttl expiry seen by another process: {expired}")
+    if not expired:
+        failures.append("an expired entry was still served to another process")
+
+    rows = {
+        f"sqlite, shared by {args.workers}": run_workers(ctx, args, "sqlite", os.path.join(workdir, "shared.db"), args.max_entries),
+        f"memory, per process x{args.workers}": run_workers(ctx, args, "memory", "", args.max_entries),
+    }
+
+    path = os.path.join(workdir, "evicting.db")
+    rows[f"sqlite, {args.small_max_entries} entries"] = run_workers(ctx, args, "sqlite", path, args.small_max_entries)
+    shared = SQLiteVerificationCache(path=path, ttl_seconds=3600, max_entries=args.small_max_entries)
+    entries = shared.stats()["entries"]
+    limit = args.small_max_entries + shared.trim_every * args.workers
+    print(f"evicting cache size after the run: {entries} (max_entries {args.small_max_entries}, allowed up to {limit})")
+    if entries > limit:
+        failures.append(f"shared cache grew to {entries} entries")
+    if any(row["errors"] for row in rows.values()):
+        failures.append("concurrent access raised sqlite errors")
+
+    print_table(f"{args.workers} workers x {args.requests} verifications over {args.keyspace} carriers", rows)
+
+    if failures:
+        print("\nFAILED: " + "; ".join(failures))
+        sys.exit(1)
+    print("\nAll shared cache checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import inspect
+import os
+import statistics
+import time
+from typing import Any, Callable, Dict, List
+
+
+def configure_environment(database_url: str) -> None:
+    """
+    Point the app at a benchmark database
+
+    Must run before anything under ``app`` is imported, since settings and
+    the engine are created at import time.
+    """
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("ENVIRONMENT", "benchmark")
+    os.environ.setdefault("API_KEY", "benchmark-key")
+    os.environ.setdefault("FMCSA_API_KEY", "benchmark-key")
+
+
+def query_defaults(endpoint: Callable) -> Dict[str, Any]:
+    """
+    Default values of an endpoint's ``Query(...)`` parameters
+
+    Lets benchmarks call endpoint functions directly while only spelling out
+    the parameters they care about.
+    """
+    defaults = {}
+    for name, parameter in inspect.signature(endpoint).parameters.items():
+        default = parameter.default
+        if type(default).__name__ == "Query":
+            defaults[name] = default.default
+    return defaults
+
+
+def measure(fn: Callable[[], object], repeat: int = 50, warmup: int = 3) -> Dict[str, float]:
+    """Run ``fn`` repeatedly and return latency percentiles in milliseconds"""
+    for _ in range(warmup):
+        fn()
+    samples: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Percentiles (ms) for a list of latency samples"""
+    samples = sorted(samples)
+    return {
+        "n": len(samples),
+        "p50": round(statistics.median(samples), 3),
+        "p95": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "max": round(samples[-1], 3),
+        "mean": round(statistics.fmean(samples), 3),
+    }
+
+
+def print_table(title: str, rows: Dict[str, Dict[str, float]]) -> None:
+    """Print a small aligned results table"""
+    print(f"\n{title}")
+    if not rows:
+        return
+    columns = list(next(iter(rows.values())).keys())
+    width = max(len(name) for name in rows) + 2
+    print("".ljust(width) + "".join(column.rjust(12) for column in columns))
+    for name, values in rows.items():
+        print(name.ljust(width) + "".join(str(values[column]).rjust(12) for column in columns))
@@ -0,0 +1,155 @@
+"""
+Offline evaluation of carrier-personalized load ranking
+
+Simulates carriers with home lanes, preferred equipment and a minimum rate
+per mile they accept, and a call history in which they mostly call about
+and book loads that fit. Each carrier's last --holdout bookings are held
+out; profiles are built from the rest through the real profile store. For
+every held-out booking the booked load is ranked among --candidates other
+loads with the default search order (pickup, then rate) and with the
+carrier's profile, and the script reports hit@1/5/10 and mean reciprocal
+rank for both.
+
+    python -m benchmarks.eval_carrier_ranking --carriers 300 --calls-per-carrier 40
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from benchmarks.common import configure_environment, print_table
+
+
+def simulate_carriers(loads: List, carriers: int, rng: random.Random) -> List[Dict]:
+    """Carrier preferences: two home lanes, one or two equipment types and a minimum rate per mile"""
+    lanes = sorted({(load.origin, load.destination) for load in loads})
+    equipment = sorted({load.equipment_type for load in loads})
+    rpms = sorted(load.loadboard_rate / load.miles for load in loads if load.miles)
+    return [
+        {
+            "mc_number": f"{700000 + i}",
+            "lanes": set(rng.sample(lanes, 2)),
+            "equipment": set(rng.sample(equipment, rng.randint(1, 2))),
+            "min_rpm": rpms[int(len(rpms) * rng.uniform(0.2, 0.6))],
+        }
+        for i in range(carriers)
+    ]
+
+
+def fits(carrier: Dict, load) -> bool:
+    return (
+        ((load.origin, load.destination) in carrier["lanes"] or load.equipment_type in carrier["equipment"])
+        and bool(load.miles) and load.loadboard_rate / load.miles >= carrier["min_rpm"]
+    )
+
+
+def simulate_calls(carrier: Dict, loads: List, by_lane: Dict, by_equipment: Dict, calls: int, rng: random.Random) -> List[Dict]:
+    """Mostly calls about loads on home lanes or with preferred equipment; books those that fit"""
+    history = []
+    for _ in range(calls):
+        roll = rng.random()
+        if roll < 0.4:
+            pool = by_lane.get(rng.choice(sorted(carrier["lanes"])))
+        elif roll < 0.8:
+            pool = by_equipment.get(rng.choice(sorted(carrier["equipment"])))
+        else:
+            pool = None
+        load = rng.choice(pool or loads)
+        booked = fits(carrier, load) and rng.random() < 0.8
+        history.append({"load": load, "booked": booked})
+    return history
+
+
+def seed_history(engine, carriers: List[Dict], histories: Dict[str, List[Dict]]) -> int:
+    """Insert simulated calls, oldest first, so call ids follow time"""
+    from app.models.call_log import CallLog
+
+    now = datetime.utcnow()
+    rows = []
+    for carrier in carriers:
+        history = histories[carrier["mc_number"]]
+        for i, call in enumerate(history):
+            load = call["load"]
+            rows.append({
+                "happyrobot_run_id": f"EVAL-{carrier['mc_number']}-{i}",
+                "mc_number": carrier["mc_number"],
+                "called_at": now - timedelta(hours=len(history) - i),
+                "searched_load_id": load.load_id,
+                "agreed_rate": load.loadboard_rate if call["booked"] else None,
+                "call_outcome_classification": "Booked" if call["booked"] else "Rejected - Price",
+                "carrier_sentiment_classification": "Neutral",
+            })
+    rows.sort(key=lambda row: row["called_at"])
+    with engine.begin() as conn:
+        conn.execute(CallLog.__table__.delete())
+        for offset in range(0, len(rows), 20000):
+            conn.execute(CallLog.__table__.insert(), rows[offset:offset + 20000])
+    return len(rows)
+
+
+def reciprocal_ranks(ranked_positions: List[int]) -> Dict[str, float]:
+    n = len(ranked_positions)
+    return {
+        "hit@1": round(sum(p < 1 for p in ranked_positions) / n, 3),
+        "hit@5": round(sum(p < 5 for p in ranked_positions) / n, 3),
+        "hit@10": round(sum(p < 10 for p in ranked_positions) / n, 3),
+        "mrr": round(sum(1 / (p + 1) for p in ranked_positions) / n, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///./eval_ranking.db")
+    parser.add_argument("--loads", type=int, default=20000)
+    parser.add_argument("--carriers", type=int, default=300)
+    parser.add_argument("--calls-per-carrier", type=int, default=40)
+    parser.add_argument("--holdout", type=int, default=2, help="Most recent bookings per carrier held out for evaluation")
+    parser.add_argument("--candidates", type=int, default=49, help="Other loads each held-out booking is ranked against")
+    args = parser.parse_args()
+
+    configure_environment(args.database_url)
+    from app.core.carrier_profiles import carrier_profiles, rank_loads
+    from app.database import Base, SessionLocal, add_missing_columns, engine
+    from app.models.load import Load
+    from benchmarks.bench_load_search import seed
+
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns(engine)
+    seed(engine, args.loads)
+
+    rng = random.Random(5)
+    db = SessionLocal()
+    loads = db.query(Load).all()
+    by_lane: Dict = {}
+    by_equipment: Dict = {}
+    for load in loads:
+        by_lane.setdefault((load.origin, load.destination), []).append(load)
+        by_equipment.setdefault(load.equipment_type, []).append(load)
+
+    carriers = simulate_carriers(loads, args.carriers, rng)
+    histories, holdout = {}, []
+    for carrier in carriers:
+        history = simulate_calls(carrier, loads, by_lane, by_equipment, args.calls_per_carrier, rng)
+        booked_at = [i for i, call in enumerate(history) if call["booked"]]
+        cut = booked_at[-args.holdout] if len(booked_at) > args.holdout else len(history)
+        histories[carrier["mc_number"]] = history[:cut]
+        holdout.extend((carrier["mc_number"], call["load"]) for call in history[cut:] if call["booked"])
+    calls = seed_history(engine, carriers, histories)
+    print(f"Simulated {calls} training calls for {len(carriers)} carriers, {len(holdout)} held-out bookings")
+
+    positions: Dict[str, List[int]] = {"default order": [], "personalized": []}
+    for mc_number, booked in holdout:
+        candidates = [booked] + [load for load in rng.sample(loads, args.candidates + 1) if load is not booked][:args.candidates]
+        default = sorted(candidates, key=lambda load: (load.pickup_datetime, -load.loadboard_rate))
+        positions["default order"].append(default.index(booked))
+        positions["personalized"].append(rank_loads(carrier_profiles.get(db, mc_number), default).index(booked))
+    db.close()
+
+    print_table(
+        f"Rank of the booked load among {args.candidates + 1} candidates, {len(holdout)} held-out bookings",
+        {name: reciprocal_ranks(ranked) for name, ranked in positions.items()},
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Replay captured API traffic and compare latency per endpoint
+
+Re-drives a capture file written by TrafficCaptureMiddleware
+(TRAFFIC_CAPTURE_ENABLED=true) against a running instance, preserving the
+original order and inter-arrival gaps divided by --speed (0 sends as fast
+as --concurrency allows). Redacted API keys are replaced with --api-key, and
+the fields named by --unique-field get a per-replay suffix so write
+endpoints such as offers/log do not conflict with the captured calls.
+Requests whose body was truncated at capture are skipped.
+
+Reports, per route, reference vs replayed p50/p95 latency and the number
+of responses whose status differs from the capture. The reference is the
+captured server-side latency, or with --baseline a previous replay saved
+with --save, which compares two builds client-side to client-side. Replay
+against a scratch copy of the database: write endpoints are replayed too.
+
+    python -m benchmarks.replay_traffic data/traffic_capture.jsonl --target http://127.0.0.1:8000 --api-key $API_KEY
+    python -m benchmarks.replay_traffic capture.jsonl --speed 4 --route /api/v1/loads/
+    python -m benchmarks.replay_traffic capture.jsonl --speed 0 --save before.json
+    python -m benchmarks.replay_traffic capture.jsonl --speed 0 --baseline before.json
+"""
+import argparse
+import asyncio
+import base64
+import json
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, Dict, List
+
+import httpx
+
+from benchmarks.common import configure_environment, print_table, summarize
+
+
+def with_unique_fields(value: Any, fields: List[str], suffix: str) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: f"{item}-{suffix}" if key in fields and isinstance(item, str) else with_unique_fields(item, fields, suffix)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [with_unique_fields(item, fields, suffix) for item in value]
+    return value
+
+
+def build_request(record: Dict[str, Any], api_key: str, unique_fields: List[str], suffix: str) -> Dict[str, Any]:
+    from app.core.traffic_capture import REDACTED
+
+    headers = {name: api_key if value == REDACTED else value for name, value in record["headers"].items()}
+    headers.pop("accept-encoding", None)  # Let the client negotiate what it can decode
+    query = record["query"].replace(REDACTED, api_key)
+    content = None
+    if "json" in record:
+        content = json.dumps(with_unique_fields(record["json"], unique_fields, suffix)).encode()
+    elif "text" in record:
+        content = record["text"].encode()
+    elif "b64" in record:
+        content = base64.b64decode(record["b64"])
+    return {
+        "method": record["method"],
+        "url": record["path"] + (f"?{query}" if query else ""),
+        "headers": headers,
+        "content": content,
+    }
+
+
+async def replay(records: List[Dict[str, Any]], args) -> List[Dict[str, Any]]:
+    suffix = f"replay-{uuid.uuid4().hex[:8]}"
+    limiter = asyncio.Semaphore(args.concurrency)
+    results: List[Dict[str, Any]] = []
+    t0 = records[0]["t"]
+
+    async with httpx.AsyncClient(base_url=args.target, timeout=args.timeout) as client:
+        started = time.perf_counter()
+
+        async def send(record: Dict[str, Any]) -> None:
+            request = build_request(record, args.api_key, args.unique_field, suffix)
+            async with limiter:
+                sent = time.perf_counter()
+                try:
+                    response = await client.request(**request)
+                    await response.aread()
+                    status = response.status_code
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+            results.append({
+                "route": record["route"] or record["path"],
+                "captured_ms": record["ms"],
+                "replayed_ms": (time.perf_counter() - sent) * 1000,
+                "captured_status": record["status"],
+                "status": status,
+            })
+
+        tasks = []
+        for record in records:
+            if args.speed > 0:
+                delay = (record["t"] - t0) / args.speed - (time.perf_counter() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(send(record)))
+        await asyncio.gather(*tasks)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("capture", help="Capture file (JSON Lines)")
+    parser.add_argument("--target", default="http://127.0.0.1:8000")
+    parser.add_argument("--api-key", default="", help="Substituted for redacted API keys")
+    parser.add_argument("--speed", type=float, default=1.0, help="Time scale: 1 = original pacing, 2 = twice as fast, 0 = no pacing")
+    parser.add_argument("--concurrency", type=int, default=32, help="Maximum requests in flight")
+    parser.add_argument("--route", action="append", help="Only replay these route templates (repeatable)")
+    parser.add_argument("--limit", type=int, help="Replay at most this many requests")
+    parser.add_argument("--unique-field", action="append", default=["happyrobot_run_id"],
+                        help="JSON body field made unique per replay (repeatable)")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--save", help="Write per-route replay latencies to this JSON file")
+    parser.add_argument("--baseline", help="Compare against latencies saved by an earlier --save instead of the capture")
+    args = parser.parse_args()
+
+    # Only for importing the capture format; the replay itself never touches a database
+    configure_environment("sqlite://")
+    from app.core.traffic_capture import read_capture
+
+    records = [record for record in read_capture(args.capture) if not record.get("truncated")]
+    if args.route:
+        records = [record for record in records if record["route"] in args.route]
+    if args.limit:
+        records = records[:args.limit]
+    if not records:
+        parser.error("no replayable requests in the capture")
+
+    started = time.perf_counter()
+    results = asyncio.run(replay(records, args))
+    elapsed = time.perf_counter() - started
+
+    by_route: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for result in results:
+        by_route[result["route"]].append(result)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    rows = {}
+    saved = {}
+    for route, route_results in sorted(by_route.items(), key=lambda item: -len(item[1])):
+        replayed = summarize([result["replayed_ms"] for result in route_results])
+        saved[route] = replayed
+        if baseline is not None:
+            reference = baseline.get(route)
+            if reference is None:
+                continue
+        else:
+            reference = summarize([result["captured_ms"] for result in route_results])
+        rows[route] = {
+            "n": len(route_results),
+            "ref_p50": reference["p50"],
+            "rep_p50": replayed["p50"],
+            "ref_p95": reference["p95"],
+            "rep_p95": replayed["p95"],
+            "p50_delta%": round((replayed["p50"] - reference["p50"]) / reference["p50"] * 100, 1) if reference["p50"] else "-",
+            "status_diff": sum(1 for result in route_results if result["status"] != result["captured_status"]),
+        }
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(saved, f, indent=2)
+
+    span = records[-1]["t"] - records[0]["t"]
+    print_table(
+        f"Replayed {len(results)} requests ({span:.1f}s captured) in {elapsed:.1f}s at speed {args.speed}; "
+        f"latency in ms vs {'baseline ' + args.baseline if baseline is not None else 'capture'}",
+        rows,
+    )
+    if baseline is None:
+        print("\nCaptured latency is server-side; replayed latency is client-side and includes the network hop.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""Baseline schema
+
+Creates the tables and indexes the models declared when migrations were
+introduced, plus the full-text index over load notes and commodity. The DDL
+is written out here rather than taken from the models, so later model
+changes need revisions of their own. A database the app already created on
+boot has all of this; stamp it with ``alembic stamp head`` instead of
+upgrading it.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+AVAILABLE_PREDICATE = "status = 'available'"
+
+PG_SEARCH_INDEX_DDL = [
+    """
+    CREATE INDEX ix_loads_search_document ON loads
+    USING gin (to_tsvector('english', coalesce(notes, '') || ' ' || coalesce(commodity_type, '')))
+    """,
+]
+
+SQLITE_SEARCH_INDEX_DDL = [
+    """
+    CREATE VIRTUAL TABLE loads_fts USING fts5(
+        notes, commodity_type, content='loads', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER loads_fts_insert AFTER INSERT ON loads BEGIN
+        INSERT INTO loads_fts(rowid, notes, commodity_type) VALUES (new.id, new.notes, new.commodity_type);
+    END
+    """,
+    """
+    CREATE TRIGGER loads_fts_delete AFTER DELETE ON loads BEGIN
+        INSERT INTO loads_fts(loads_fts, rowid, notes, commodity_type)
+        VALUES ('delete', old.id, old.notes, old.commodity_type);
+    END
+    """,
+    """
+    CREATE TRIGGER loads_fts_update AFTER UPDATE OF notes, commodity_type ON loads BEGIN
+        INSERT INTO loads_fts(loads_fts, rowid, notes, commodity_type)
+        VALUES ('delete', old.id, old.notes, old.commodity_type);
+        INSERT INTO loads_fts(rowid, notes, commodity_type) VALUES (new.id, new.notes, new.commodity_type);
+    END
+    """,
+]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "loads",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("load_id", sa.String(), nullable=False),
+        sa.Column("origin", sa.String(), nullable=False),
+        sa.Column("destination", sa.String(), nullable=False),
+        sa.Column("pickup_datetime", sa.DateTime(), nullable=False),
+        sa.Column("delivery_datetime", sa.DateTime(), nullable=False),
+        sa.Column("equipment_type", sa.String(), nullable=False),
+        sa.Column("loadboard_rate", sa.Float(), nullable=False),
+        sa.Column("notes", sa.Text(), nullable=True),
+        sa.Column("weight", sa.Float(), nullable=True),
+        sa.Column("commodity_type", sa.String(), nullable=True),
+        sa.Column("num_of_pieces", sa.Integer(), nullable=True),
+        sa.Column("miles", sa.Float(), nullable=True),
+        sa.Column("dimensions", sa.String(), nullable=True),
+        sa.Column("status", sa.String(), server_default="available", nullable=False),
+        sa.Column("version", sa.Integer(), server_default="1", nullable=False),
+        sa.Column("booked_by_mc", sa.String(), nullable=True),
+        sa.Column("booked_rate", sa.Float(), nullable=True),
+        sa.Column("booked_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_loads_id", "loads", ["id"], unique=False)
+    op.create_index("ix_loads_load_id", "loads", ["load_id"], unique=True)
+    op.create_index(
+        "ix_loads_available_pickup_rate",
+        "loads",
+        ["pickup_datetime", sa.text("loadboard_rate DESC")],
+        unique=False,
+        postgresql_where=sa.text(AVAILABLE_PREDICATE),
+        sqlite_where=sa.text(AVAILABLE_PREDICATE),
+    )
+    op.create_index("ix_loads_delivery", "loads", ["delivery_datetime"], unique=False)
+
+    op.create_table(
+        "call_logs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("happyrobot_run_id", sa.String(), nullable=True),
+        sa.Column("mc_number", sa.String(), nullable=True),
+        sa.Column("called_at", sa.DateTime(), nullable=True),
+        sa.Column("fmcsa_verified_eligible", sa.Boolean(), nullable=True),
+        sa.Column("searched_load_id", sa.String(), nullable=True),
+        sa.Column("initial_carrier_offer", sa.Float(), nullable=True),
+        sa.Column("negotiation_rounds", sa.Integer(), nullable=True),
+        sa.Column("agreed_rate", sa.Float(), nullable=True),
+        sa.Column("call_outcome_classification", sa.String(), nullable=True),
+        sa.Column("carrier_sentiment_classification", sa.String(), nullable=True),
+        sa.Column("raw_extracted_data_json", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_call_logs_id", "call_logs", ["id"], unique=False)
+    op.create_index("ix_call_logs_happyrobot_run_id", "call_logs", ["happyrobot_run_id"], unique=True)
+    op.create_index("ix_call_logs_mc_number", "call_logs", ["mc_number"], unique=False)
+
+    op.create_table(
+        "call_log_payloads",
+        sa.Column("call_log_id", sa.Integer(), nullable=False),
+        sa.Column("codec", sa.String(), nullable=False),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+        sa.Column("raw_size", sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint("call_log_id"),
+    )
+
+    op.create_table(
+        "call_stats_buckets",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("granularity", sa.String(), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(), nullable=False),
+        sa.Column("origin", sa.String(), nullable=False),
+        sa.Column("destination", sa.String(), nullable=False),
+        sa.Column("equipment_type", sa.String(), nullable=False),
+        sa.Column("mc_number", sa.String(), nullable=False),
+        sa.Column("call_outcome_classification", sa.String(), nullable=False),
+        sa.Column("carrier_sentiment_classification", sa.String(), nullable=False),
+        sa.Column("calls", sa.Integer(), nullable=False),
+        sa.Column("booked_calls", sa.Integer(), nullable=False),
+        sa.Column("agreed_rate_sum", sa.Float(), nullable=False),
+        sa.Column("agreed_rate_count", sa.Integer(), nullable=False),
+        sa.Column("loadboard_rate_sum", sa.Float(), nullable=False),
+        sa.Column("loadboard_rate_count", sa.Integer(), nullable=False),
+        sa.Column("negotiation_rounds_sum", sa.Integer(), nullable=False),
+        sa.Column("negotiation_rounds_count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "granularity",
+            "bucket_start",
+            "origin",
+            "destination",
+            "equipment_type",
+            "mc_number",
+            "call_outcome_classification",
+            "carrier_sentiment_classification",
+            name="uq_call_stats_bucket",
+        ),
+    )
+    op.create_index("ix_call_stats_buckets_id", "call_stats_buckets", ["id"], unique=False)
+    op.create_index("ix_call_stats_buckets_bucket_start", "call_stats_buckets", ["bucket_start"], unique=False)
+
+    op.create_table(
+        "carrier_offers",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("load_id", sa.String(), nullable=False),
+        sa.Column("mc_number", sa.String(), nullable=False),
+        sa.Column("carrier_offer", sa.Float(), nullable=False),
+        sa.Column("notes", sa.Text(), nullable=True),
+        sa.Column("offered_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_carrier_offers_id", "carrier_offers", ["id"], unique=False)
+    op.create_index("ix_carrier_offers_load_id", "carrier_offers", ["load_id"], unique=False)
+    op.create_index("ix_carrier_offers_mc_number", "carrier_offers", ["mc_number"], unique=False)
+
+    op.create_table(
+        "load_offer_stats",
+        sa.Column("load_id", sa.String(), nullable=False),
+        sa.Column("offer_count", sa.Integer(), nullable=False),
+        sa.Column("offer_sum", sa.Float(), nullable=False),
+        sa.Column("min_offer", sa.Float(), nullable=False),
+        sa.Column("max_offer", sa.Float(), nullable=False),
+        sa.Column("last_offer", sa.Float(), nullable=False),
+        sa.Column("last_mc_number", sa.String(), nullable=False),
+        sa.Column("first_offered_at", sa.DateTime(), nullable=False),
+        sa.Column("last_offered_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("load_id"),
+    )
+
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        for statement in PG_SEARCH_INDEX_DDL:
+            op.execute(statement)
+    elif dialect == "sqlite":
+        for statement in SQLITE_SEARCH_INDEX_DDL:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    # The search index and the loads_fts triggers go with the loads table
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute("DROP TABLE loads_fts")
+    op.drop_table("load_offer_stats")
+    op.drop_table("carrier_offers")
+    op.drop_table("call_stats_buckets")
+    op.drop_table("call_log_payloads")
+    op.drop_table("call_logs")
+    op.drop_table("loads")
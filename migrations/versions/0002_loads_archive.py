@@ -0,0 +1,64 @@
+"""Load archive
+
+Adds the loads_archive table the archival job moves expired and booked loads
+into, and the partial index it uses to find booked loads.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BOOKED_PREDICATE = "status = 'booked'"
+
+
+def upgrade() -> None:
+    op.create_table(
+        "loads_archive",
+        sa.Column("load_id", sa.String(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("origin", sa.String(), nullable=False),
+        sa.Column("destination", sa.String(), nullable=False),
+        sa.Column("pickup_datetime", sa.DateTime(), nullable=False),
+        sa.Column("delivery_datetime", sa.DateTime(), nullable=False),
+        sa.Column("equipment_type", sa.String(), nullable=False),
+        sa.Column("loadboard_rate", sa.Float(), nullable=False),
+        sa.Column("notes", sa.Text(), nullable=True),
+        sa.Column("weight", sa.Float(), nullable=True),
+        sa.Column("commodity_type", sa.String(), nullable=True),
+        sa.Column("num_of_pieces", sa.Integer(), nullable=True),
+        sa.Column("miles", sa.Float(), nullable=True),
+        sa.Column("dimensions", sa.String(), nullable=True),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("booked_by_mc", sa.String(), nullable=True),
+        sa.Column("booked_rate", sa.Float(), nullable=True),
+        sa.Column("booked_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("archived_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("load_id"),
+    )
+    op.create_index("ix_loads_archive_archived_at", "loads_archive", ["archived_at"], unique=False)
+    op.create_index(
+        "ix_loads_booked_at",
+        "loads",
+        ["booked_at"],
+        unique=False,
+        postgresql_where=sa.text(BOOKED_PREDICATE),
+        sqlite_where=sa.text(BOOKED_PREDICATE),
+    )
+
+
+def downgrade() -> None:
+    # Archived loads are dropped with the table
+    op.drop_index("ix_loads_booked_at", table_name="loads")
+    op.drop_table("loads_archive")
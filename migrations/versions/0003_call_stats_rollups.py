@@ -0,0 +1,126 @@
+"""Call stats rollups
+
+Narrows call_stats_buckets to the dimensions its queries group and filter by
+(equipment, outcome and sentiment) and moves per-lane and per-carrier
+statistics into call_stats_lane_buckets and call_stats_carrier_buckets.
+Dimension values are normalized (trimmed, single-spaced, lowercase) as the
+app now writes them. The new rollups are summed from the existing buckets,
+whose key held every dimension, so no call logs are rescanned.
+
+Downgrading restores the wide table empty; rebuild it with the backfill
+command of the code being downgraded to.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from typing import Dict, List, Sequence, Tuple, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MEASURE_COLUMNS = [
+    "calls",
+    "booked_calls",
+    "agreed_rate_sum",
+    "agreed_rate_count",
+    "loadboard_rate_sum",
+    "loadboard_rate_count",
+    "negotiation_rounds_sum",
+    "negotiation_rounds_count",
+]
+
+WIDE_KEY_COLUMNS = [
+    "granularity",
+    "bucket_start",
+    "origin",
+    "destination",
+    "equipment_type",
+    "mc_number",
+    "call_outcome_classification",
+    "carrier_sentiment_classification",
+]
+
+# Table, unique constraint and key columns of each rollup
+ROLLUPS = [
+    (
+        "call_stats_buckets",
+        "uq_call_stats_bucket",
+        ["granularity", "bucket_start", "equipment_type", "call_outcome_classification", "carrier_sentiment_classification"],
+    ),
+    (
+        "call_stats_lane_buckets",
+        "uq_call_stats_lane_bucket",
+        ["granularity", "origin", "destination", "bucket_start", "equipment_type", "carrier_sentiment_classification"],
+    ),
+    (
+        "call_stats_carrier_buckets",
+        "uq_call_stats_carrier_bucket",
+        ["granularity", "mc_number", "bucket_start", "carrier_sentiment_classification"],
+    ),
+]
+
+COLUMN_TYPES = {"bucket_start": sa.DateTime}
+MEASURE_TYPES = {column: sa.Float if column.endswith("_rate_sum") else sa.Integer for column in MEASURE_COLUMNS}
+
+
+def _normalize(value):
+    return " ".join((value or "").split()).lower()
+
+
+def _column(name: str) -> sa.ColumnClause:
+    return sa.column(name, (COLUMN_TYPES.get(name) or MEASURE_TYPES.get(name) or sa.String)())
+
+
+def _create_table(name: str, constraint: str, key_columns: List[str]) -> None:
+    op.create_table(
+        name,
+        sa.Column("id", sa.Integer(), nullable=False),
+        *[sa.Column(column, COLUMN_TYPES.get(column, sa.String)(), nullable=False) for column in key_columns],
+        *[sa.Column(column, MEASURE_TYPES[column](), nullable=False) for column in MEASURE_COLUMNS],
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(*key_columns, name=constraint),
+    )
+    op.create_index(f"ix_{name}_id", name, ["id"], unique=False)
+    op.create_index(f"ix_{name}_bucket_start", name, ["bucket_start"], unique=False)
+
+
+def _roll_up(bind, key_columns: List[str]) -> List[Dict]:
+    """Sum the wide buckets over ``key_columns``, merging values that only differ once normalized"""
+    wide = sa.table("call_stats_buckets", *[_column(column) for column in WIDE_KEY_COLUMNS + MEASURE_COLUMNS])
+    query = sa.select(
+        *[wide.c[column] for column in key_columns],
+        *[sa.func.sum(wide.c[column]).label(column) for column in MEASURE_COLUMNS],
+    ).group_by(*[wide.c[column] for column in key_columns])
+
+    buckets: Dict[Tuple, Dict] = {}
+    for row in bind.execute(query).mappings():
+        key = tuple(row[column] if column in ("granularity", "bucket_start") else _normalize(row[column]) for column in key_columns)
+        totals = buckets.setdefault(key, dict.fromkeys(MEASURE_COLUMNS, 0))
+        for column in MEASURE_COLUMNS:
+            totals[column] += row[column] or 0
+    return [dict(zip(key_columns, key), **totals) for key, totals in buckets.items()]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    rows = {name: _roll_up(bind, key_columns) for name, _, key_columns in ROLLUPS}
+
+    op.drop_table("call_stats_buckets")
+    for name, constraint, key_columns in ROLLUPS:
+        _create_table(name, constraint, key_columns)
+        table = sa.table(name, *[_column(column) for column in key_columns + MEASURE_COLUMNS])
+        for start in range(0, len(rows[name]), 1000):
+            op.bulk_insert(table, rows[name][start:start + 1000])
+
+
+def downgrade() -> None:
+    op.drop_table("call_stats_carrier_buckets")
+    op.drop_table("call_stats_lane_buckets")
+    op.drop_table("call_stats_buckets")
+    _create_table("call_stats_buckets", "uq_call_stats_bucket", WIDE_KEY_COLUMNS)
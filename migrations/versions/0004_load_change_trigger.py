@@ -0,0 +1,68 @@
+"""Load change trigger
+
+Adds the trigger the load change watcher LISTENs to on PostgreSQL. Each
+notification carries the operation, the load ID and, for updates and
+deletes, the row's lane, equipment, weight, rate and status before the
+change. Replaces the function and trigger the watcher used to create when it
+started. Nothing to do on other databases, where the watcher polls.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NOTIFY_FUNCTION_DDL = """
+    CREATE OR REPLACE FUNCTION notify_load_change() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            PERFORM pg_notify('load_changes', json_build_object('op', TG_OP, 'load_id', NEW.load_id)::text);
+            RETURN NEW;
+        END IF;
+        PERFORM pg_notify('load_changes', json_build_object(
+            'op', TG_OP,
+            'load_id', OLD.load_id,
+            'old', json_build_object(
+                'origin', OLD.origin,
+                'destination', OLD.destination,
+                'equipment_type', OLD.equipment_type,
+                'weight', OLD.weight,
+                'loadboard_rate', OLD.loadboard_rate,
+                'status', OLD.status
+            )
+        )::text);
+        IF TG_OP = 'DELETE' THEN
+            RETURN OLD;
+        END IF;
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute(NOTIFY_FUNCTION_DDL)
+    op.execute("DROP TRIGGER IF EXISTS loads_notify_change ON loads")
+    op.execute(
+        """
+        CREATE TRIGGER loads_notify_change
+        AFTER INSERT OR UPDATE OR DELETE ON loads
+        FOR EACH ROW EXECUTE FUNCTION notify_load_change()
+        """
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("DROP TRIGGER IF EXISTS loads_notify_change ON loads")
+    op.execute("DROP FUNCTION IF EXISTS notify_load_change()")